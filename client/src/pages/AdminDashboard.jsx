@@ -120,7 +120,7 @@ const AdminDashboard = () => {
   const [clinics, setClinics] = useState([]);
   const [articles, setArticles] = useState([]);
   const [users, setUsers] = useState([]);
-  const [appointments, setAppointments] = useState([]);
+  const [summary, setSummary] = useState(null);
   const [reports, setReports] = useState([]);
   const [filter, setFilter] = useState("all");
   const [editArticle, setEditArticle] = useState(null);
@@ -143,19 +143,19 @@ const AdminDashboard = () => {
           }
         };
 
-        const [clinicsData, articlesData, usersData, reportsData, appointmentsData] = await Promise.all([
+        const [clinicsData, articlesData, usersData, reportsData, summaryData] = await Promise.all([
           fetchWithCatch("https://afya-ke.onrender.com/clinics"),
           fetchWithCatch("https://afya-ke.onrender.com/articles"),
           fetchWithCatch("https://afya-ke.onrender.com/users"),
           fetchWithCatch("https://afya-ke.onrender.com/reports"),
-          fetchWithCatch("https://afya-ke.onrender.com/appointments"),
+          fetchWithCatch("https://afya-ke.onrender.com/admin/summary"),
         ]);
 
         setClinics(clinicsData);
         setArticles(articlesData);
         setUsers(usersData);
         setReports(reportsData);
-        setAppointments(appointmentsData);
+        setSummary(Array.isArray(summaryData) ? null : summaryData);
       } catch (err) {
         console.error("Dashboard load error:", err);
       } finally {
@@ -243,10 +243,10 @@ const AdminDashboard = () => {
       {/* --- Top Stats --- */}
       <section className="mb-10">
         <div className="grid grid-cols-2 md:grid-cols-4 gap-4 lg:gap-6">
-          <AdminStatCard title="Total Users" value={users.length} icon={Users} color="green" trendValue={`${users.filter(u => u.role==="patient").length} patients`} />
-          <AdminStatCard title="Registered Clinics" value={clinics.filter(c => c.status==="approved").length} icon={BriefcaseMedical} color="blue" trendValue={`${clinics.filter(c=>c.status==="pending").length} pending`} />
-          <AdminStatCard title="Appointments" value={appointments.length} icon={Calendar} color="dark-green" trendValue="Today" />
-          <AdminStatCard title="Published Articles" value={articles.filter(a => a.published).length} icon={ClipboardList} color="light-blue" trendValue="Latest" />
+          <AdminStatCard title="Total Users" value={summary?.users.total ?? 0} icon={Users} color="green" trendValue={`${summary?.users.byRole.patient ?? 0} patients`} />
+          <AdminStatCard title="Registered Clinics" value={summary?.clinics.byStatus.approved ?? 0} icon={BriefcaseMedical} color="blue" trendValue={`${summary?.clinics.byStatus.pending ?? 0} pending`} />
+          <AdminStatCard title="Appointments" value={summary?.appointments.total ?? 0} icon={Calendar} color="dark-green" trendValue="Today" />
+          <AdminStatCard title="Published Articles" value={summary?.articles.published ?? 0} icon={ClipboardList} color="light-blue" trendValue="Latest" />
         </div>
       </section>
 
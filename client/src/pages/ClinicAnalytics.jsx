@@ -39,43 +39,30 @@ const ClinicAnalytics = () => {
 
       try {
         const token = localStorage.getItem("authToken");
-        const res = await fetch(`${API_URL}/appointments?clinicId=${clinicId}`, {
-          headers: { Authorization: `Bearer ${token}` },
-        });
-
-        if (!res.ok) throw new Error(`Failed to fetch appointments: ${res.status}`);
+        const year = new Date().getFullYear();
+        const res = await fetch(
+          `${API_URL}/clinics/${clinicId}/analytics?from=${year}-01-01&to=${year}-12-31&granularity=month`,
+          { headers: { Authorization: `Bearer ${token}` } }
+        );
 
-        const appts = await res.json();
+        if (!res.ok) throw new Error(`Failed to fetch analytics: ${res.status}`);
 
-        if (!Array.isArray(appts)) {
-          throw new Error("Invalid appointments data from server");
-        }
+        const { totals, series } = await res.json();
 
-        const monthly = Array(12).fill(0);
+        const monthly = series.map((p) => p.total);
         const services = {};
+        Object.entries(totals.byService).forEach(([name, value]) => {
+          const serviceName = name === "Unspecified" ? "General Checkup" : name;
+          services[serviceName] = (services[serviceName] || 0) + value;
+        });
         const statusCount = {
           Completed: 0,
           Pending: 0,
           Confirmed: 0,
           Cancelled: 0,
+          ...totals.byStatus,
         };
 
-        appts.forEach((a) => {
-          const date = new Date(a.date);
-          const month = date.getMonth();
-          monthly[month]++;
-
-          const serviceName =
-            a.service && typeof a.service === "string" && a.service.trim()
-              ? a.service.trim()
-              : "General Checkup";
-
-          services[serviceName] = (services[serviceName] || 0) + 1;
-
-          const status = a.status || "Pending";
-          statusCount[status] = (statusCount[status] || 0) + 1;
-        });
-
         const monthNames = [
           "Jan", "Feb", "Mar", "Apr", "May", "Jun",
           "Jul", "Aug", "Sep", "Oct", "Nov", "Dec",
@@ -98,7 +85,7 @@ const ClinicAnalytics = () => {
           monthly: monthly.map((v, i) => ({ month: monthNames[i], appts: v })),
           services: serviceData,
           statusBreakdown: statusData,
-          totalAppts: appts.length,
+          totalAppts: totals.appointments,
           completedAppts: statusCount.Completed || 0,
           cancelledAppts: statusCount.Cancelled || 0,
           loading: false,
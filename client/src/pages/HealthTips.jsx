@@ -132,8 +132,17 @@ export default function HealthTips() {
     });
   }, [articles, searchTerm, selectedCategory]);
 
-  const handleArticleClick = (article) => {
+  // The list omits article bodies, so load the full article on open
+  const handleArticleClick = async (article) => {
     setSelectedArticle(article);
+    try {
+      const res = await fetch(
+        `https://afya-ke.onrender.com/articles/${article.id}`
+      );
+      if (res.ok) setSelectedArticle(await res.json());
+    } catch (err) {
+      console.error("HealthTips article fetch error:", err);
+    }
   };
 
   const handleBack = () => {
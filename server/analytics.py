@@ -0,0 +1,198 @@
+# server/analytics.py
+from collections import Counter
+from datetime import date, datetime, timedelta
+from sqlalchemy import Date, delete, event, func, inspect, select, text
+from sqlalchemy.dialects.postgresql import insert
+from extensions import db
+from models import Appointment, ClinicDailyStat
+from utils import QueryParamError
+
+GRANULARITIES = ("day", "week", "month")
+UNSPECIFIED = "Unspecified"
+# Appointment columns the rollup is broken down by
+DIMENSIONS = ("status", "service", "doctor")
+MAX_RANGE_DAYS = 3660
+
+
+def appointment_day(date_value, created_at):
+    """Calendar day an appointment counts towards.
+
+    ``date`` is free text from the client (seed.py assigns date objects);
+    anything that isn't an ISO date falls back to the booking day.
+    """
+    try:
+        return date.fromisoformat(str(date_value or "")[:10])
+    except ValueError:
+        return (created_at or datetime.utcnow()).date()
+
+
+def _label(dimension, value):
+    value = (value or "").strip()
+    if dimension == "status":
+        return value or "Pending"
+    return value[:255] or UNSPECIFIED
+
+
+def apply_deltas(connection, deltas):
+    """Add ``deltas`` {(clinic_id, day, dimension, value): n} to the rollup."""
+    rows = [
+        {"clinic_id": c, "day": d, "dimension": dim, "value": v, "count": n}
+        for (c, d, dim, v), n in sorted(deltas.items())
+        if n
+    ]
+    if not rows:
+        return
+    table = ClinicDailyStat.__table__
+    stmt = insert(table).values(rows)
+    connection.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[table.c.clinic_id, table.c.day, table.c.dimension, table.c.value],
+            set_={"count": table.c.count + stmt.excluded.count},
+        )
+    )
+
+
+_TRACKED_ATTRS = ("clinic_id", "date", "created_at", *DIMENSIONS)
+
+
+def _old_and_new(appt):
+    state = inspect(appt)
+    old, new = {}, {}
+    for attr in _TRACKED_ATTRS:
+        history = state.attrs[attr].history
+        new[attr] = getattr(appt, attr)
+        old[attr] = history.deleted[0] if history.deleted else new[attr]
+    return old, new
+
+
+def _keys(values):
+    """Rollup rows an appointment (or a row of its columns) counts towards."""
+    day = appointment_day(values["date"], values["created_at"])
+    return [
+        (values["clinic_id"], day, dimension, _label(dimension, values[dimension]))
+        for dimension in DIMENSIONS
+    ]
+
+
+@event.listens_for(db.session, "after_flush")
+def _roll_up_appointments(session, flush_context):
+    deltas = Counter()
+    for appt in session.new:
+        if isinstance(appt, Appointment):
+            deltas.update(_keys(_old_and_new(appt)[1]))
+    for appt in session.dirty:
+        if isinstance(appt, Appointment) and session.is_modified(appt):
+            old, new = _old_and_new(appt)
+            if old != new:
+                deltas.subtract(_keys(old))
+                deltas.update(_keys(new))
+    for appt in session.deleted:
+        if isinstance(appt, Appointment):
+            deltas.subtract(_keys(_old_and_new(appt)[0]))
+    apply_deltas(session.connection(), deltas)
+
+
+def rebuild_clinic_stats(connection, clinic_id=None, batch_size=5000):
+    """Recompute the rollup from the appointments table.
+
+    The table lock makes concurrent appointment writes wait for the
+    rebuild, so none is counted twice or lost. Returns appointments read.
+    """
+    table = ClinicDailyStat.__table__
+    connection.execute(text("LOCK TABLE clinic_daily_stats IN SHARE ROW EXCLUSIVE MODE"))
+    cleared = delete(table)
+    query = select(
+        Appointment.clinic_id, Appointment.date, Appointment.created_at,
+        *[getattr(Appointment, dimension) for dimension in DIMENSIONS],
+    )
+    if clinic_id is not None:
+        cleared = cleared.where(table.c.clinic_id == clinic_id)
+        query = query.where(Appointment.clinic_id == clinic_id)
+    connection.execute(cleared)
+
+    counts = Counter()
+    seen = 0
+    result = connection.execute(
+        query, execution_options={"stream_results": True, "yield_per": batch_size}
+    )
+    for row in result.mappings():
+        counts.update(_keys(row))
+        seen += 1
+    items = list(counts.items())
+    for i in range(0, len(items), batch_size):
+        apply_deltas(connection, dict(items[i:i + batch_size]))
+    return seen
+
+
+def parse_range(args, today=None):
+    """(start, end, granularity) from ?from=&to=&granularity= (last 30 days)."""
+    today = today or date.today()
+    try:
+        end = date.fromisoformat(args["to"]) if args.get("to") else today
+        start = date.fromisoformat(args["from"]) if args.get("from") else end - timedelta(days=29)
+    except ValueError:
+        raise QueryParamError("from and to must be YYYY-MM-DD dates")
+    granularity = args.get("granularity", "day")
+    if granularity not in GRANULARITIES:
+        raise QueryParamError(f"granularity must be one of: {', '.join(GRANULARITIES)}")
+    if start > end:
+        raise QueryParamError("from must not be after to")
+    if (end - start).days > MAX_RANGE_DAYS:
+        raise QueryParamError(f"Date range is limited to {MAX_RANGE_DAYS} days")
+    return start, end, granularity
+
+
+def period_start(day, granularity):
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+def _periods(start, end, granularity):
+    current = period_start(start, granularity)
+    while current <= end:
+        yield current
+        if granularity == "month":
+            current = (current.replace(day=28) + timedelta(days=4)).replace(day=1)
+        else:
+            current += timedelta(days=7 if granularity == "week" else 1)
+
+
+def clinic_analytics(clinic_id, start, end, granularity):
+    """Totals and a gap-free series per period, read from the rollup only."""
+    period = func.date_trunc(granularity, ClinicDailyStat.day).cast(Date)
+    rows = db.session.execute(
+        select(period, ClinicDailyStat.dimension, ClinicDailyStat.value, func.sum(ClinicDailyStat.count))
+        .where(
+            ClinicDailyStat.clinic_id == clinic_id,
+            ClinicDailyStat.day.between(start, end),
+        )
+        .group_by(period, ClinicDailyStat.dimension, ClinicDailyStat.value)
+    ).all()
+
+    keys = {"status": "byStatus", "service": "byService", "doctor": "byDoctor"}
+    series = {
+        p: {"period": p.isoformat(), "total": 0, **{k: {} for k in keys.values()}}
+        for p in _periods(start, end, granularity)
+    }
+    totals = {"appointments": 0, **{k: {} for k in keys.values()}}
+    for p, dimension, value, count in rows:
+        if not count:
+            continue
+        bucket = series[p]
+        bucket[keys[dimension]][value] = int(count)
+        totals[keys[dimension]][value] = totals[keys[dimension]].get(value, 0) + int(count)
+        if dimension == "status":
+            bucket["total"] += int(count)
+            totals["appointments"] += int(count)
+
+    return {
+        "clinicId": clinic_id,
+        "from": start.isoformat(),
+        "to": end.isoformat(),
+        "granularity": granularity,
+        "totals": totals,
+        "series": list(series.values()),
+    }
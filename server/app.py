@@ -2,6 +2,15 @@ from flask import Flask, jsonify, request
 from flask_cors import CORS
 from config import Config
 from extensions import db, ma, jwt, migrate
+from utils import QueryParamError
+from cache import response_cache
+from exports import export_workers
+from passwords import password_hasher, HasherBusy
+from identity import identity_cache, AccountBlocked
+from commands import register_commands
+from database import engine_options, instrument_engine, listen_dsn
+from instrumentation import request_metrics
+from querywatch import query_watch
 
 # Blueprints
 from routes.auth import bp as auth_bp
@@ -11,26 +20,56 @@ from routes.appointments import bp as appointments_bp
 from routes.users import bp as users_bp
 from routes.misc import bp as misc_bp
 from routes.reports import bp as reports_bp
+from routes.events import bp as events_bp
+from routes.exports import bp as exports_bp
+from routes.admin import bp as admin_bp
 
 
 def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
+    app.config.setdefault("SQLALCHEMY_ENGINE_OPTIONS", engine_options(app.config))
+    app.config.setdefault("EVENTS_DSN", listen_dsn(app.config))
 
     # Allow CORS from specific origins
-    CORS(app, resources={r"/*": {"origins": "*"}})
+    CORS(
+        app,
+        resources={r"/*": {"origins": "*"}},
+        expose_headers=["X-Next-Cursor", "X-Total-Count", "Link", "Server-Timing"],
+    )
 
     # Initialize extensions
     db.init_app(app)
     ma.init_app(app)
     jwt.init_app(app)
     migrate.init_app(app, db)
+    with app.app_context():
+        instrument_engine(db.engine, app.config)
+    request_metrics.init_app(app)
+    query_watch.init_app(app)
+    response_cache.init_app(app)
+    export_workers.init_app(app)
+    password_hasher.init_app(app)
+    identity_cache.configure(app.config["IDENTITY_CACHE_SIZE"], app.config["IDENTITY_CACHE_TTL"])
+    register_commands(app)
 
     @app.before_request
     def handle_preflight():
         if request.method == "OPTIONS":
             return jsonify(success=True), 200
 
+    @app.errorhandler(QueryParamError)
+    def handle_query_param_error(e):
+        return jsonify({"msg": str(e)}), 400
+
+    @app.errorhandler(AccountBlocked)
+    def handle_account_blocked(e):
+        return jsonify({"msg": "Account blocked"}), 403
+
+    @app.errorhandler(HasherBusy)
+    def handle_hasher_busy(e):
+        return jsonify({"msg": "Too many sign-in attempts, try again shortly"}), 503, {"Retry-After": "1"}
+
     # Register blueprints
     app.register_blueprint(auth_bp)
     app.register_blueprint(clinics_bp)
@@ -39,6 +78,9 @@ def create_app():
     app.register_blueprint(users_bp)
     app.register_blueprint(misc_bp)
     app.register_blueprint(reports_bp)
+    app.register_blueprint(events_bp)
+    app.register_blueprint(exports_bp)
+    app.register_blueprint(admin_bp)
 
     @app.route("/")
     def index():
@@ -0,0 +1,46 @@
+"""Setup for the pytest-benchmark microbenchmarks in this directory.
+
+They time pure-Python code on in-memory objects, so the app runs against
+an in-memory SQLite database and no server or Postgres is needed. Results
+are saved to and compared against bench/baselines/:
+
+    python -m pytest bench --benchmark-save=baseline
+    python -m pytest bench --benchmark-compare --benchmark-compare-fail=mean:15%
+"""
+import os
+import sys
+
+import pytest
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SERVER_DIR = os.path.dirname(BENCH_DIR)
+BASELINE_DIR = os.path.join(BENCH_DIR, "baselines")
+DEFAULT_STORAGE = "file://./.benchmarks"
+
+# Config reads these at import time
+os.environ["DATABASE_URL"] = "sqlite://"
+os.environ.setdefault("CACHE_DISABLED", "1")
+os.environ.setdefault("PASSWORD_HASH_WORKERS", "0")
+os.environ.setdefault("EXPORT_WORKERS", "0")
+os.environ.setdefault("QUERY_WATCH", "off")
+sys.path.insert(0, SERVER_DIR)
+
+
+def pytest_configure(config):
+    # Keep baselines next to the benchmarks unless told otherwise; runs
+    # before pytest-benchmark opens its storage
+    if config.getoption("benchmark_storage", None) == DEFAULT_STORAGE:
+        config.option.benchmark_storage = f"file://{BASELINE_DIR}"
+
+
+@pytest.fixture(scope="session")
+def app():
+    from app import create_app
+
+    return create_app()
+
+
+@pytest.fixture
+def app_context(app):
+    with app.app_context():
+        yield
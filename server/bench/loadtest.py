@@ -0,0 +1,433 @@
+# server/bench/loadtest.py
+"""HTTP load test replaying a realistic AfyaLink traffic mix.
+
+Virtual users run concurrently against a live server seeded with seed.py:
+
+    browser  anonymous clinic browsing: lists, search, nearby, details,
+             reviews and articles, with think time between pages
+    patient  logs in once, then polls its dashboard (appointments +
+             profile) every --poll-interval seconds
+    staff    clinic account listing its appointments and updating one's
+             status
+    admin    admin dashboard loads: summary, users, reports, pending clinics
+    logins   a burst of --burst-size concurrent logins every --burst-every
+             seconds
+
+Like a browser, each virtual user keeps the ETag and body of every GET it
+made and revalidates with If-None-Match, so unchanged pages come back as
+304s (counted under their status like any other response).
+
+Each endpoint (method + route template) gets throughput, p50/p95/p99 and
+4xx/5xx counts;
+--output writes the same as JSON, and `compare` diffs two result files,
+so two builds can be measured against the same seeded dataset:
+
+    python seed.py && gunicorn 'app:create_app()' &
+    python bench/loadtest.py run --duration 120 --output before.json
+    # ...switch builds, reseed, restart...
+    python bench/loadtest.py run --duration 120 --output after.json
+    python bench/loadtest.py compare before.json after.json
+"""
+import argparse
+import http.client
+import json
+import platform
+import random
+import subprocess
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from urllib.parse import urlencode, urlsplit
+
+# Accounts created by seed.py
+DEFAULT_PATIENTS = [
+    "john.doe@example.com:123",
+    "faith.wanjiku@example.com:123",
+    "alice.mwende@example.com:123",
+    "bob.otieno@example.com:123",
+]
+DEFAULT_STAFF = ["mombasa@health.go.ke:clinic123", "info@nairobiwellness.co.ke:clinic123"]
+DEFAULT_ADMINS = ["admin@example.com:admin123"]
+SEARCH_TERMS = ["clinic", "health", "nairobi", "mombasa", "dental", "lab"]
+# Around Nairobi, Mombasa and Kisumu
+LOCATIONS = [(-1.2921, 36.8219), (-4.0435, 39.6682), (-0.0917, 34.7680)]
+STATUSES = ["Confirmed", "Completed", "Pending"]
+
+
+class Recorder:
+    """Latency samples per endpoint; samples before ``warmup_until`` are dropped."""
+
+    def __init__(self, warmup_until):
+        self.warmup_until = warmup_until
+        self.samples = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self._lock = threading.Lock()
+
+    def add(self, name, status, seconds):
+        if time.monotonic() < self.warmup_until:
+            return
+        with self._lock:
+            self.samples[name].append(seconds)
+            self.statuses[name][status] += 1
+
+
+class Client:
+    """One keep-alive connection and HTTP cache per virtual user, like a browser tab."""
+
+    def __init__(self, base_url, recorder, timeout=30):
+        parts = urlsplit(base_url)
+        self.host = parts.netloc
+        self.https = parts.scheme == "https"
+        self.recorder = recorder
+        self.timeout = timeout
+        self.token = None
+        self._conn = None
+        # path -> (ETag, parsed body) of the last 200 GET
+        self._etags = {}
+
+    def _connection(self):
+        if self._conn is None:
+            cls = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+            self._conn = cls(self.host, timeout=self.timeout)
+        return self._conn
+
+    def call(self, name, method, path, body=None, params=None):
+        """Send a request, record it under ``name`` and return (status, json)."""
+        if params:
+            path = f"{path}?{urlencode(params)}"
+        headers = {"Accept": "application/json"}
+        data = None
+        if body is not None:
+            data = json.dumps(body).encode()
+            headers["Content-Type"] = "application/json"
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        cached = self._etags.get(path) if method == "GET" else None
+        if cached:
+            headers["If-None-Match"] = cached[0]
+
+        started = time.perf_counter()
+        try:
+            conn = self._connection()
+            conn.request(method, path, body=data, headers=headers)
+            resp = conn.getresponse()
+            raw = resp.read()
+            status = resp.status
+            etag = resp.getheader("ETag")
+        except (OSError, http.client.HTTPException):
+            # Dropped connection: count it and reconnect next time
+            self.close()
+            self.recorder.add(name, 0, time.perf_counter() - started)
+            return 0, None
+        self.recorder.add(name, status, time.perf_counter() - started)
+        if status == 304 and cached:
+            return status, cached[1]
+        try:
+            payload = json.loads(raw) if raw else None
+        except ValueError:
+            payload = None
+        if method == "GET" and status == 200 and etag:
+            self._etags[path] = (etag, payload)
+        return status, payload
+
+    def login(self, name, path, credentials):
+        email, _, password = credentials.partition(":")
+        status, payload = self.call(name, "POST", path, {"email": email, "password": password})
+        if status == 200 and payload:
+            self.token = payload.get("access_token") or payload.get("token")
+            # ETags are per caller; another account's validators never match
+            self._etags.clear()
+        return self.token is not None
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+def _ids(payload):
+    return [row["id"] for row in payload or [] if isinstance(row, dict) and "id" in row]
+
+
+def discover(base_url):
+    """Clinic and article ids to browse, read once before the run."""
+    client = Client(base_url, Recorder(float("inf")))
+    _, clinics = client.call("discover", "GET", "/clinics/", params={"limit": 200})
+    _, articles = client.call("discover", "GET", "/articles/", params={"limit": 200})
+    client.close()
+    if not _ids(clinics):
+        raise SystemExit(f"No clinics at {base_url}/clinics/ - is the server up and seeded?")
+    return {"clinics": _ids(clinics), "articles": _ids(articles) or [1]}
+
+
+def browser(client, ids, args, stop, rng):
+    while not stop.is_set():
+        client.call("GET /clinics/", "GET", "/clinics/", params=rng.choice(
+            [{}, {"status": "approved"}, {"filter": "open_now"}, {"filter": "highest_rated"}]
+        ))
+        page = rng.random()
+        if page < 0.3:
+            client.call("GET /clinics/search", "GET", "/clinics/search",
+                        params={"q": rng.choice(SEARCH_TERMS)})
+        elif page < 0.5:
+            lat, lng = rng.choice(LOCATIONS)
+            client.call("GET /clinics/nearby", "GET", "/clinics/nearby",
+                        params={"lat": lat, "lng": lng, "radius": 25})
+        clinic_id = rng.choice(ids["clinics"])
+        client.call("GET /clinics/<id>", "GET", f"/clinics/{clinic_id}")
+        client.call("GET /clinics/<id>/reviews", "GET", f"/clinics/{clinic_id}/reviews")
+        if rng.random() < 0.4:
+            client.call("GET /articles/", "GET", "/articles/")
+            client.call("GET /articles/<id>", "GET", f"/articles/{rng.choice(ids['articles'])}")
+        stop.wait(rng.uniform(*args.think_time))
+
+
+def patient(client, ids, args, stop, rng, credentials):
+    if not client.login("POST /auth/login", "/auth/login", credentials):
+        return
+    # Spread the first polls so patients don't move in lockstep
+    stop.wait(rng.uniform(0, args.poll_interval))
+    while not stop.is_set():
+        client.call("GET /appointments/ (patient)", "GET", "/appointments/")
+        client.call("GET /auth/profile", "GET", "/auth/profile")
+        stop.wait(args.poll_interval)
+
+
+def staff(client, ids, args, stop, rng, credentials):
+    # Clinic accounts sign in through /auth/login, as the web client does
+    if not client.login("POST /auth/login", "/auth/login", credentials):
+        return
+    while not stop.is_set():
+        _, appointments = client.call("GET /appointments/ (clinic)", "GET", "/appointments/")
+        appt_ids = _ids(appointments)
+        if appt_ids:
+            appt_id = rng.choice(appt_ids)
+            client.call("GET /appointments/<id>", "GET", f"/appointments/{appt_id}")
+            client.call("PATCH /appointments/<id>", "PATCH", f"/appointments/{appt_id}",
+                        {"status": rng.choice(STATUSES)})
+        client.call("GET /users/ (clinic)", "GET", "/users/")
+        stop.wait(rng.uniform(*args.think_time))
+
+
+def admin(client, ids, args, stop, rng, credentials):
+    if not client.login("POST /auth/login", "/auth/login", credentials):
+        return
+    while not stop.is_set():
+        client.call("GET /admin/summary", "GET", "/admin/summary")
+        client.call("GET /users/ (admin)", "GET", "/users/")
+        client.call("GET /reports/", "GET", "/reports/")
+        client.call("GET /clinics/ (pending)", "GET", "/clinics/", params={"status": "pending"})
+        stop.wait(rng.uniform(*args.think_time) * 3)
+
+
+def burst_login(base_url, recorder, credentials):
+    client = Client(base_url, recorder)
+    try:
+        client.login("POST /auth/login (burst)", "/auth/login", credentials)
+    finally:
+        client.close()
+
+
+def login_bursts(base_url, recorder, args, stop, accounts):
+    while not stop.wait(args.burst_every):
+        threads = [
+            threading.Thread(
+                target=burst_login, args=(base_url, recorder, accounts[i % len(accounts)])
+            )
+            for i in range(args.burst_size)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+
+def percentile(samples, q):
+    if not samples:
+        return float("nan")
+    return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+def summarize(recorder, measured_seconds):
+    endpoints = {}
+    for name in sorted(recorder.samples):
+        latencies = sorted(recorder.samples[name])
+        statuses = recorder.statuses[name]
+        errors = sum(n for status, n in statuses.items() if status == 0 or status >= 500)
+        rejected = sum(n for status, n in statuses.items() if 400 <= status < 500)
+        endpoints[name] = {
+            "requests": len(latencies),
+            "rps": len(latencies) / measured_seconds,
+            "p50_ms": percentile(latencies, 0.50) * 1000,
+            "p95_ms": percentile(latencies, 0.95) * 1000,
+            "p99_ms": percentile(latencies, 0.99) * 1000,
+            "max_ms": latencies[-1] * 1000,
+            "errors": errors,
+            "rejected": rejected,
+            "statuses": {str(k): v for k, v in sorted(statuses.items())},
+        }
+    total = sum(e["requests"] for e in endpoints.values())
+    return {
+        "requests": total,
+        "rps": total / measured_seconds,
+        "errors": sum(e["errors"] for e in endpoints.values()),
+        "rejected": sum(e["rejected"] for e in endpoints.values()),
+        "endpoints": endpoints,
+    }
+
+
+def print_table(summary):
+    print(f"{'endpoint':<32} {'n':>7} {'rps':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'4xx':>5} {'err':>5}")
+    for name, e in summary["endpoints"].items():
+        print(
+            f"{name:<32} {e['requests']:>7} {e['rps']:>7.1f} {e['p50_ms']:>7.1f}ms "
+            f"{e['p95_ms']:>7.1f}ms {e['p99_ms']:>7.1f}ms {e['rejected']:>5} {e['errors']:>5}"
+        )
+    print(
+        f"{'total':<32} {summary['requests']:>7} {summary['rps']:>7.1f} {'':>29} "
+        f"{summary['rejected']:>5} {summary['errors']:>5}"
+    )
+    print("err counts 5xx and dropped connections")
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    ids = discover(args.base_url)
+    stop = threading.Event()
+    recorder = Recorder(time.monotonic() + args.warmup)
+    rng = random.Random(args.seed)
+    threads = []
+
+    def spawn(target, *extra):
+        client = Client(args.base_url, recorder)
+        user_rng = random.Random(rng.random())
+        t = threading.Thread(target=target, args=(client, ids, args, stop, user_rng, *extra), daemon=True)
+        threads.append((t, client))
+
+    for _ in range(args.browsers):
+        spawn(browser)
+    for i in range(args.patients):
+        spawn(patient, args.patient[i % len(args.patient)])
+    for i in range(args.staff):
+        spawn(staff, args.staff_account[i % len(args.staff_account)])
+    for i in range(args.admins):
+        spawn(admin, args.admin[i % len(args.admin)])
+    if args.burst_size:
+        burst = threading.Thread(
+            target=login_bursts, args=(args.base_url, recorder, args, stop, args.patient), daemon=True
+        )
+        threads.append((burst, None))
+
+    started = time.monotonic()
+    for t, _ in threads:
+        t.start()
+    stop.wait(args.warmup + args.duration)
+    stop.set()
+    for t, client in threads:
+        t.join(timeout=30)
+        if client:
+            client.close()
+    measured = max(time.monotonic() - started - args.warmup, 1e-9)
+
+    summary = summarize(recorder, measured)
+    print_table(summary)
+    if args.output:
+        result = {
+            "label": args.label,
+            "revision": git_revision(),
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "base_url": args.base_url,
+            "host": platform.node(),
+            "config": {
+                k: getattr(args, k)
+                for k in ("duration", "warmup", "browsers", "patients", "staff", "admins",
+                          "poll_interval", "think_time", "burst_size", "burst_every", "seed")
+            },
+            "measured_seconds": measured,
+            **summary,
+        }
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"\nwrote {args.output}")
+
+
+def compare(args):
+    with open(args.baseline) as f:
+        before = json.load(f)
+    with open(args.candidate) as f:
+        after = json.load(f)
+    print(f"{before.get('label') or before.get('revision')} -> {after.get('label') or after.get('revision')}")
+    print(f"{'endpoint':<32} {'rps':>16} {'p50':>18} {'p95':>18} {'p99':>18}")
+
+    def delta(a, b, fmt):
+        change = (b - a) / a * 100 if a else float("nan")
+        return f"{fmt.format(b)} ({change:+5.0f}%)"
+
+    rows = [("total", before, after)] + [
+        (name, before["endpoints"][name], after["endpoints"][name])
+        for name in sorted(set(before["endpoints"]) & set(after["endpoints"]))
+    ]
+    for name, a, b in rows:
+        line = f"{name:<32} {delta(a['rps'], b['rps'], '{:7.1f}'):>16}"
+        if name != "total":
+            for key in ("p50_ms", "p95_ms", "p99_ms"):
+                line += f" {delta(a[key], b[key], '{:7.1f}ms'):>18}"
+        print(line)
+    missing = set(before["endpoints"]) ^ set(after["endpoints"])
+    if missing:
+        print(f"\nonly in one run: {', '.join(sorted(missing))}")
+
+
+def _range(value):
+    low, _, high = value.partition(",")
+    return float(low), float(high or low)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("run", help="drive load against a live server")
+    p.add_argument("--base-url", default="http://127.0.0.1:8000")
+    p.add_argument("--duration", type=float, default=60.0, help="measured seconds")
+    p.add_argument("--warmup", type=float, default=10.0, help="seconds excluded from results")
+    p.add_argument("--browsers", type=int, default=20)
+    p.add_argument("--patients", type=int, default=50)
+    p.add_argument("--staff", type=int, default=4)
+    p.add_argument("--admins", type=int, default=1)
+    p.add_argument("--poll-interval", type=float, default=30.0)
+    p.add_argument("--think-time", type=_range, default=(1.0, 3.0), help="min,max seconds")
+    p.add_argument("--burst-size", type=int, default=20, help="0 disables login bursts")
+    p.add_argument("--burst-every", type=float, default=20.0)
+    p.add_argument("--patient", action="append", help="email:password (repeatable)")
+    p.add_argument("--staff-account", action="append", help="clinic email:password (repeatable)")
+    p.add_argument("--admin", action="append", help="email:password (repeatable)")
+    p.add_argument("--seed", type=int, default=1, help="random seed for the traffic mix")
+    p.add_argument("--label", help="name stored in the results, e.g. a branch")
+    p.add_argument("--output", help="write results as JSON")
+    p.set_defaults(func=run)
+
+    c = sub.add_parser("compare", help="diff two --output files")
+    c.add_argument("baseline")
+    c.add_argument("candidate")
+    c.set_defaults(func=compare)
+
+    args = parser.parse_args()
+    if args.command == "run":
+        args.patient = args.patient or DEFAULT_PATIENTS
+        args.staff_account = args.staff_account or DEFAULT_STAFF
+        args.admin = args.admin or DEFAULT_ADMINS
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# server/bench/login_storm.py
+"""Latency of a non-auth endpoint before and during a login storm.
+
+Run against a live server, e.g. once with the default pool and once with
+PASSWORD_HASH_WORKERS=0 to compare:
+
+    gunicorn 'app:create_app()' &
+    python bench/login_storm.py --base-url http://127.0.0.1:8000 \\
+        --email john.doe@example.com --password password123
+
+p99 of the probe endpoint should stay close to its baseline while logins
+saturate the hashing pool.
+"""
+import argparse
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def request(url, body=None):
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=60) as resp:
+            resp.read()
+            status = resp.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    return status, time.perf_counter() - started
+
+
+def percentile(samples, q):
+    if not samples:
+        return float("nan")
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+def hammer(fn, concurrency, stop):
+    results = []
+    lock = threading.Lock()
+
+    def loop():
+        while not stop.is_set():
+            result = fn()
+            with lock:
+                results.append(result)
+
+    pool = ThreadPoolExecutor(max_workers=concurrency)
+    for _ in range(concurrency):
+        pool.submit(loop)
+    return pool, results
+
+
+def phase(args, storm):
+    stop = threading.Event()
+    probe_url = args.base_url + args.probe_path
+    login_url = args.base_url + "/auth/login"
+    credentials = {"email": args.email, "password": args.password}
+    pools = []
+    probe_pool, probes = hammer(lambda: request(probe_url), args.probe_concurrency, stop)
+    pools.append(probe_pool)
+    logins = []
+    if storm:
+        login_pool, logins = hammer(lambda: request(login_url, credentials), args.storm_concurrency, stop)
+        pools.append(login_pool)
+    time.sleep(args.duration)
+    stop.set()
+    for pool in pools:
+        pool.shutdown(wait=True)
+    return probes, logins
+
+
+def summarize(name, results, duration):
+    latencies = [t for status, t in results if status < 500]
+    errors = sum(1 for status, _ in results if status >= 500)
+    print(
+        f"{name:<18} n={len(results):<6} rps={len(results) / duration:7.1f} "
+        f"p50={percentile(latencies, 0.50) * 1000:8.1f}ms "
+        f"p99={percentile(latencies, 0.99) * 1000:8.1f}ms 5xx={errors}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--probe-path", default="/health")
+    parser.add_argument("--probe-concurrency", type=int, default=4)
+    parser.add_argument("--storm-concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    baseline, _ = phase(args, storm=False)
+    summarize("probe (baseline)", baseline, args.duration)
+    probes, logins = phase(args, storm=True)
+    summarize("probe (storm)", probes, args.duration)
+    summarize("login (storm)", logins, args.duration)
+
+
+if __name__ == "__main__":
+    main()
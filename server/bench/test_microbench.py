@@ -0,0 +1,230 @@
+"""Microbenchmarks for serializers and the helpers list routes call per row.
+
+Inputs are built once per module from a fixed seed, shaped like seed.py's
+data, so runs on the same machine are comparable. See conftest.py for
+saving and comparing baselines.
+"""
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from hours import compile_operating_hours, is_always_open, is_open_now
+
+ROWS = 10_000
+NOW = datetime(2025, 6, 4, 10, 30)  # a Wednesday morning
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+SERVICES = [
+    "General Checkup", "Vaccination", "Blood Test", "Follow-up Visit", "Maternity",
+    "Dental Care", "X-Ray", "Physiotherapy", "Emergency", "Pharmacy",
+]
+SPECIALTIES = ["General Practitioner", "Pediatrician", "Gynecologist", "Dentist", "Surgeon"]
+STATUSES = ["Pending", "Confirmed", "Completed", "Cancelled"]
+
+
+def operating_hours(rng):
+    """Weekly hours: mostly weekday clinics, some 24/7, some open overnight."""
+    kind = rng.random()
+    if kind < 0.1:
+        return [{"day": d, "open": "00:00", "close": "23:59", "closed": False} for d in DAYS]
+    hours = []
+    for day in DAYS:
+        if day == "Sunday" and kind < 0.7:
+            hours.append({"day": day, "open": None, "close": None, "closed": True})
+        elif kind > 0.9:
+            hours.append({"day": day, "open": "18:00", "close": "06:00", "closed": False})
+        else:
+            close = "13:00" if day == "Saturday" else rng.choice(["17:00", "18:00", "20:00"])
+            hours.append({"day": day, "open": rng.choice(["07:00", "08:00"]), "close": close,
+                          "closed": False})
+    return hours
+
+
+@pytest.fixture(scope="module")
+def clinics(app):
+    from models import Clinic
+
+    rng = random.Random(1)
+    rows = []
+    for i in range(1, ROWS + 1):
+        hours = operating_hours(rng)
+        intervals = compile_operating_hours(hours)
+        rows.append(
+            Clinic(
+                id=i,
+                name=f"Clinic {i}",
+                location=f"Town {i % 50}, County {i % 47}",
+                phone=f"+2547{i:08d}",
+                email=f"clinic{i}@example.com",
+                coordinates={"lat": rng.uniform(-4.7, 4.6), "lng": rng.uniform(33.9, 41.9)},
+                services=rng.sample(SERVICES, rng.randint(2, 6)),
+                operating_hours=hours,
+                open_intervals=intervals,
+                is_24_7=is_always_open(intervals),
+                doctors=[
+                    {"name": f"Dr. {rng.randint(1, 5000)}", "specialty": rng.choice(SPECIALTIES)}
+                    for _ in range(rng.randint(1, 5))
+                ],
+                rating=rng.uniform(0, 5),
+                reviews=rng.randint(0, 400),
+                rating_histogram={str(s): rng.randint(0, 80) for s in range(1, 6)},
+                verified=True,
+                status="approved",
+                created_at=NOW - timedelta(minutes=i),
+            )
+        )
+    return rows
+
+
+@pytest.fixture(scope="module")
+def users(app):
+    from models import User
+
+    return [
+        User(
+            id=i,
+            full_name=f"Patient {i}",
+            email=f"user{i}@example.com",
+            phone_number=f"+2547{i:08d}",
+            role="patient",
+            profile={"gender": "female" if i % 2 else "male", "dob": "1990-01-01"},
+            saved_clinics=[i % 97, i % 89],
+            blocked=False,
+            created_at=NOW - timedelta(minutes=i),
+        )
+        for i in range(1, ROWS + 1)
+    ]
+
+
+@pytest.fixture(scope="module")
+def appointments(app):
+    from models import Appointment
+
+    rng = random.Random(2)
+    return [
+        Appointment(
+            id=i,
+            patient_id=1 + i % 2000,
+            clinic_id=1 + i % 200,
+            clinic_name=f"Clinic {1 + i % 200}",
+            doctor=f"Dr. {i % 40}",
+            service=rng.choice(SERVICES),
+            date=(NOW + timedelta(days=i % 60)).date().isoformat(),
+            time=f"{8 + i % 9:02d}:00",
+            status=rng.choice(STATUSES),
+            notes="Follow-up after lab results" if i % 3 == 0 else None,
+            created_at=NOW - timedelta(minutes=i),
+        )
+        for i in range(1, ROWS + 1)
+    ]
+
+
+def test_clinic_schema_dump(benchmark, clinics):
+    from schemas import ClinicSchema
+
+    result = benchmark(ClinicSchema(many=True).dump, clinics)
+    assert len(result) == ROWS
+
+
+def test_appointment_schema_dump(benchmark, app_context, appointments):
+    from flask import g
+    from loaders import PatientNameLoader
+    from schemas import AppointmentSchema
+
+    # Names already batch-loaded, as after the route's single IN query;
+    # any SQL here would fail as the benchmark DB has no tables
+    loader = PatientNameLoader()
+    loader._names = {a.patient_id: f"Patient {a.patient_id}" for a in appointments}
+    g.patient_name_loader = loader
+
+    result = benchmark(AppointmentSchema(many=True).dump, appointments)
+    assert result[0]["patientName"] == f"Patient {appointments[0].patient_id}"
+
+
+def test_user_schema_dump(benchmark, users):
+    from schemas import UserSchema
+
+    result = benchmark(UserSchema(many=True).dump, users)
+    assert len(result) == ROWS
+
+
+def test_is_open_now(benchmark, clinics):
+    intervals = [c.open_intervals for c in clinics]
+
+    def run():
+        return sum(is_open_now(i, NOW) for i in intervals)
+
+    assert benchmark(run) > 0
+
+
+def test_list_clinics_row_loop(benchmark, clinics):
+    # The per-row annotation in routes.clinics.list_clinics; 24/7 detection
+    # itself happens at write time, see test_compile_operating_hours
+    from schemas import ClinicSchema
+
+    result = ClinicSchema(many=True).dump(clinics)
+
+    def run():
+        for c, clinic in zip(result, clinics):
+            c["is_open_now"] = is_open_now(clinic.open_intervals, NOW)
+            c["is_24_7"] = bool(clinic.is_24_7)
+
+    benchmark(run)
+    assert any(c["is_24_7"] for c in result)
+
+
+def test_compile_operating_hours(benchmark, clinics):
+    hours = [c.operating_hours for c in clinics]
+
+    def run():
+        return sum(is_always_open(compile_operating_hours(h)) for h in hours)
+
+    assert benchmark(run) > 0
+
+
+@pytest.fixture(scope="module")
+def appointment_table(app):
+    # Only appointments: the other tables use Postgres-only column types
+    from extensions import db
+    from models import Appointment
+
+    with app.app_context():
+        Appointment.__table__.create(db.engine)
+        db.session.execute(
+            Appointment.__table__.insert(),
+            [
+                {"patient_id": 1 + i % 2000, "clinic_id": 1 + i % 200, "status": "Pending",
+                 "date": "2025-06-01", "created_at": NOW - timedelta(minutes=i)}
+                for i in range(ROWS)
+            ],
+        )
+        db.session.commit()
+    yield
+    with app.app_context():
+        db.session.remove()
+        Appointment.__table__.drop(db.engine)
+
+
+@pytest.mark.parametrize("page", [1, 400])
+def test_paginate_query(benchmark, app_context, appointment_table, page):
+    from models import Appointment
+    from utils import paginate_query
+
+    query = Appointment.query.order_by(Appointment.created_at.desc(), Appointment.id.desc())
+    result = benchmark(paginate_query, query, page, 20)
+    assert len(result["items"]) == 20 and result["total"] == ROWS
+
+
+def test_keyset_paginate(benchmark, app_context, appointment_table):
+    # What the list routes use in place of paginate_query
+    from models import Appointment
+    from utils import keyset_paginate
+
+    columns = (Appointment.created_at, Appointment.id)
+    first = keyset_paginate(Appointment.query, columns, limit=20, cursor="", with_count=False)
+    result = benchmark(
+        keyset_paginate, Appointment.query, columns, limit=20, cursor=first["next"],
+        with_count=False,
+    )
+    assert len(result["items"]) == 20
@@ -0,0 +1,206 @@
+# server/cache.py
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import request, g, make_response, current_app
+from sqlalchemy import event
+from extensions import db
+
+# Response headers worth replaying from a cached entry
+_REPLAYED_HEADERS = ("Content-Type", "X-Next-Cursor", "X-Total-Count", "Link")
+
+_PENDING = "pending_invalidations"
+
+
+class LocalBackend:
+    """In-process LRU bounded by entry count and total bytes, with TTLs."""
+
+    def __init__(self, max_entries=2048, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            value, expires = item
+            if expires < time.monotonic():
+                self._evict(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            if key in self._entries:
+                self._evict(key)
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._bytes += len(value)
+            while self._entries and (
+                len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                self._evict(next(iter(self._entries)))
+
+    def _evict(self, key):
+        value, _ = self._entries.pop(key)
+        self._bytes -= len(value)
+
+    def get_counters(self, names):
+        with self._lock:
+            return [self._counters.get(n, 0) for n in names]
+
+    def incr(self, name):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + 1
+
+    def info(self):
+        with self._lock:
+            return {"backend": "local", "entries": len(self._entries), "bytes": self._bytes}
+
+
+class RedisBackend:
+    """Shared backend for multi-worker deployments (any Redis-protocol server)."""
+
+    def __init__(self, url):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("CACHE_URL is set but the 'redis' package is not installed")
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        return self._client.get(key)
+
+    def set(self, key, value, ttl):
+        self._client.set(key, value, ex=max(1, int(ttl)))
+
+    def get_counters(self, names):
+        return [int(v or 0) for v in self._client.mget([f"tag:{n}" for n in names])]
+
+    def incr(self, name):
+        self._client.incr(f"tag:{name}")
+
+    def info(self):
+        return {"backend": "redis", "entries": self._client.dbsize()}
+
+
+class ResponseCache:
+    """Read-through cache for public GET responses with tag invalidation.
+
+    Entries are keyed by endpoint, normalized query args and the current
+    version of every tag the view declares. Invalidating a tag bumps its
+    version, so all entries built under the old one become unreachable and
+    age out; that works the same for the local LRU and a shared backend.
+    """
+
+    def __init__(self):
+        self.backend = None
+        self.default_ttl = 60
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "invalidations": 0}
+        self._stats_lock = threading.Lock()
+
+    def init_app(self, app):
+        url = app.config.get("CACHE_URL")
+        if url:
+            self.backend = RedisBackend(url)
+        else:
+            self.backend = LocalBackend(
+                max_entries=app.config.get("CACHE_MAX_ENTRIES", 2048),
+                max_bytes=app.config.get("CACHE_MAX_BYTES", 64 * 1024 * 1024),
+            )
+        self.default_ttl = app.config.get("CACHE_DEFAULT_TTL", 60)
+        app.extensions["response_cache"] = self
+
+    def _count(self, stat, n=1):
+        with self._stats_lock:
+            self._stats[stat] += n
+
+    def stats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = round(stats["hits"] / lookups, 4) if lookups else None
+        stats.update(self.backend.info())
+        return stats
+
+    def _key(self, tags):
+        args = sorted((k, sorted(request.args.getlist(k))) for k in request.args)
+        versions = self.backend.get_counters(tags)
+        # Collection stamp from versions.conditional keeps ETag and body in step
+        raw = json.dumps(
+            [request.endpoint, request.view_args, args, tags, versions, g.get("collection_stamp")],
+            sort_keys=True, default=str,
+        )
+        return "resp:" + hashlib.sha1(raw.encode()).hexdigest()
+
+    def cached(self, *tags, ttl=None):
+        """Cache a view's 200 responses under ``tags``.
+
+        A tag may be a string or a callable taking the view kwargs, e.g.
+        ``lambda clinic_id: f"clinic:{clinic_id}"``.
+        """
+
+        def decorator(fn):
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                if current_app.config.get("CACHE_DISABLED"):
+                    return fn(*args, **kwargs)
+                names = [t(**kwargs) if callable(t) else t for t in tags]
+                key = self._key(names)
+                hit = self.backend.get(key)
+                if hit is not None:
+                    self._count("hits")
+                    entry = json.loads(hit)
+                    resp = make_response(entry["body"], entry["status"])
+                    resp.headers.update(entry["headers"])
+                    resp.headers["X-Cache"] = "HIT"
+                    return resp
+
+                self._count("misses")
+                resp = make_response(fn(*args, **kwargs))
+                if resp.status_code == 200 and not resp.is_streamed:
+                    entry = {
+                        "body": resp.get_data(as_text=True),
+                        "status": resp.status_code,
+                        "headers": {h: resp.headers[h] for h in _REPLAYED_HEADERS if h in resp.headers},
+                    }
+                    self.backend.set(key, json.dumps(entry).encode(), ttl or self.default_ttl)
+                    self._count("stores")
+                resp.headers["X-Cache"] = "MISS"
+                return resp
+
+            return wrapper
+
+        return decorator
+
+    def invalidate(self, *tags):
+        for tag in tags:
+            self.backend.incr(tag)
+        self._count("invalidations", len(tags))
+
+    def invalidate_on_commit(self, *tags):
+        """Invalidate ``tags`` once the current transaction commits."""
+        db.session.info.setdefault(_PENDING, set()).update(tags)
+
+
+response_cache = ResponseCache()
+
+
+@event.listens_for(db.session, "after_commit")
+def _invalidate_committed(session):
+    tags = session.info.pop(_PENDING, None)
+    if tags:
+        response_cache.invalidate(*tags)
+
+
+@event.listens_for(db.session, "after_soft_rollback")
+def _drop_pending(session, previous_transaction):
+    session.info.pop(_PENDING, None)
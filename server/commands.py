@@ -0,0 +1,61 @@
+# server/commands.py
+import time
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from extensions import db
+from ratings import rebuild_rating_aggregates
+from versions import bump_versions
+from cache import response_cache
+from exports import claim_next, run_job
+from analytics import rebuild_clinic_stats
+
+ratings_cli = AppGroup("ratings", help="Clinic rating aggregates.")
+exports_cli = AppGroup("exports", help="Bulk export jobs.")
+analytics_cli = AppGroup("analytics", help="Clinic analytics rollups.")
+
+
+@ratings_cli.command("rebuild")
+@click.option("--clinic-id", type=int, default=None, help="Only rebuild this clinic.")
+def rebuild_ratings(clinic_id):
+    """Recompute rating aggregates from the reviews table."""
+    conn = db.session.connection()
+    updated = rebuild_rating_aggregates(conn, clinic_id)
+    bump_versions(conn, {"clinics"})
+    response_cache.invalidate_on_commit("clinics")
+    db.session.commit()
+    click.echo(f"Rebuilt rating aggregates for {updated} clinic(s).")
+
+
+@exports_cli.command("worker")
+@click.option("--poll", type=float, default=5.0, help="Seconds between queue polls.")
+@click.option("--once", is_flag=True, help="Drain the queue and exit.")
+def export_worker(poll, once):
+    """Process queued export jobs outside the web workers."""
+    app = current_app
+    while True:
+        job_id = claim_next(app.config["EXPORT_STALE_AFTER"])
+        if job_id is not None:
+            click.echo(f"Running export job {job_id}")
+            run_job(job_id, app.config["EXPORT_DIR"], app.config["EXPORT_HEARTBEAT_INTERVAL"])
+            continue
+        if once:
+            return
+        time.sleep(poll)
+
+
+@analytics_cli.command("backfill")
+@click.option("--clinic-id", type=int, default=None, help="Only rebuild this clinic.")
+def backfill_analytics(clinic_id):
+    """Rebuild clinic_daily_stats from the appointments table."""
+    conn = db.session.connection()
+    seen = rebuild_clinic_stats(conn, clinic_id)
+    bump_versions(conn, {"appointments"})
+    db.session.commit()
+    click.echo(f"Rolled up {seen} appointment(s).")
+
+
+def register_commands(app):
+    app.cli.add_command(ratings_cli)
+    app.cli.add_command(exports_cli)
+    app.cli.add_command(analytics_cli)
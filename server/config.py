@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 # Load environment variables from .env (only used locally)
@@ -23,8 +24,92 @@ class Config:
     SQLALCHEMY_DATABASE_URI = DATABASE_URL
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # --- Connection pool (per gunicorn worker) ---
+    # workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW) must stay under the
+    # server's (or PgBouncer's) connection limit
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 5))
+    DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", 10))
+    # Reconnect before the managed host's idle reaper can close the socket
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+    DB_CONNECT_TIMEOUT = int(os.getenv("DB_CONNECT_TIMEOUT", 10))
+    DB_TCP_KEEPALIVES_IDLE = int(os.getenv("DB_TCP_KEEPALIVES_IDLE", 60))
+    # 0 disables; `flask` commands (migrations included) inherit it too
+    DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", 0))
+    # Set when DATABASE_URL points at PgBouncer in transaction pooling mode
+    DB_PGBOUNCER = os.getenv("DB_PGBOUNCER", "").lower() in ("1", "true", "yes")
+    # Direct-to-Postgres URL for the /events/stream LISTEN connection.
+    # Required with DB_PGBOUNCER: LISTEN through transaction pooling never
+    # receives a notification. Defaults to DATABASE_URL otherwise
+    EVENTS_DATABASE_URL = os.getenv("EVENTS_DATABASE_URL", "").replace(
+        "postgres://", "postgresql://", 1
+    )
+
     # --- Pagination ---
     ITEMS_PER_PAGE = int(os.getenv("ITEMS_PER_PAGE", 12))
+    # Page size for ?cursor= requests without ?limit=; lists are unpaged
+    # unless the client asks
+    DEFAULT_PAGE_LIMIT = int(os.getenv("DEFAULT_PAGE_LIMIT", 100))
+    MAX_PAGE_LIMIT = int(os.getenv("MAX_PAGE_LIMIT", 500))
+    STREAM_CHUNK_SIZE = int(os.getenv("STREAM_CHUNK_SIZE", 500))
+
+    # --- Clinic search ---
+    NEARBY_MAX_RADIUS_KM = float(os.getenv("NEARBY_MAX_RADIUS_KM", 200))
+
+    # --- Response cache ---
+    # Set CACHE_URL (redis://...) to share the cache between workers
+    CACHE_URL = os.getenv("CACHE_URL", "")
+    CACHE_DEFAULT_TTL = int(os.getenv("CACHE_DEFAULT_TTL", 60))
+    CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", 2048))
+    CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", 64 * 1024 * 1024))
+    CACHE_DISABLED = os.getenv("CACHE_DISABLED", "").lower() in ("1", "true", "yes")
+
+    # --- Instrumentation ---
+    # Server-Timing reveals DB time and query counts to every client, so it
+    # is opt-in (development, staging)
+    SERVER_TIMING = os.getenv("SERVER_TIMING", "").lower() in ("1", "true", "yes")
+    # /metrics answers admins, or scrapers sending "Bearer <METRICS_TOKEN>"
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+    # --- Query watch (N+1 / slow query detector) ---
+    # "off", "log" (warn with the call site) or "raise" (fail the request)
+    QUERY_WATCH = os.getenv("QUERY_WATCH", "off").lower()
+    QUERY_WATCH_SAMPLE_RATE = float(os.getenv("QUERY_WATCH_SAMPLE_RATE", 1.0))
+    QUERY_WATCH_REPEAT_THRESHOLD = int(os.getenv("QUERY_WATCH_REPEAT_THRESHOLD", 5))
+    QUERY_WATCH_SLOW_MS = float(os.getenv("QUERY_WATCH_SLOW_MS", 250))
+    QUERY_WATCH_STACK_DEPTH = int(os.getenv("QUERY_WATCH_STACK_DEPTH", 8))
+
+    # --- Event stream ---
+    EVENT_STREAM_HEARTBEAT = int(os.getenv("EVENT_STREAM_HEARTBEAT", 15))
+
+    # --- Identity cache ---
+    # How long another worker may keep serving a user's old role/blocked flag
+    IDENTITY_CACHE_TTL = int(os.getenv("IDENTITY_CACHE_TTL", 30))
+    IDENTITY_CACHE_SIZE = int(os.getenv("IDENTITY_CACHE_SIZE", 10000))
+    IDENTITY_CACHE_DISABLED = os.getenv("IDENTITY_CACHE_DISABLED", "").lower() in ("1", "true", "yes")
+
+    # --- Password hashing ---
+    # e.g. "scrypt:32768:8:1", "pbkdf2:sha256:600000" or "bcrypt:12"; hashes
+    # made with anything else are upgraded on the next successful login
+    PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+    # 0 hashes on the request thread (tests, one-off scripts)
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 2))
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", 32))
+    PASSWORD_HASH_QUEUE_TIMEOUT = float(os.getenv("PASSWORD_HASH_QUEUE_TIMEOUT", 5))
+
+    # --- Bulk exports ---
+    # Jobs run in `flask exports worker` by default; EXPORT_WORKERS > 0 also
+    # drains the queue from web processes (threaded workers only: under
+    # gevent, compressing an export blocks the worker's event loop)
+    EXPORT_DIR = os.getenv(
+        "EXPORT_DIR", os.path.join(tempfile.gettempdir(), "afyalink-exports")
+    )
+    EXPORT_WORKERS = int(os.getenv("EXPORT_WORKERS", 0))
+    # Running jobs refresh heartbeat_at this often; one that has gone
+    # EXPORT_STALE_AFTER seconds without a beat is presumed dead and re-queued
+    EXPORT_HEARTBEAT_INTERVAL = int(os.getenv("EXPORT_HEARTBEAT_INTERVAL", 30))
+    EXPORT_STALE_AFTER = int(os.getenv("EXPORT_STALE_AFTER", 300))
 
     # --- Third-party Integrations ---
     SENDGRID_API_KEY = os.getenv("SENDGRID_API_KEY", "")
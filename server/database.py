@@ -0,0 +1,158 @@
+# server/database.py
+# Engine/pool options built from config, plus pool instrumentation exported
+# through /metrics.
+import time
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+from metrics import Counter, Gauge, Histogram, REGISTRY
+
+POOL_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+CONNECTION_AGE_BUCKETS = (1, 10, 60, 300, 900, 1800, 3600, 7200, 21600)
+
+pool_checked_out = Gauge("db_pool_checked_out", "Connections currently lent to requests")
+pool_idle = Gauge("db_pool_idle", "Open connections waiting in the pool")
+pool_overflow = Gauge("db_pool_overflow", "Connections open beyond pool_size")
+pool_size = Gauge("db_pool_size", "Configured pool_size")
+pool_wait = Histogram(
+    "db_pool_wait_seconds", "Time spent checking out a connection",
+    buckets=POOL_WAIT_BUCKETS,
+)
+pool_timeouts = Counter("db_pool_timeouts_total", "Checkouts that gave up after pool_timeout")
+connections_opened = Counter("db_connections_opened_total", "New DBAPI connections")
+connections_closed = Counter("db_connections_closed_total", "DBAPI connections closed")
+connections_invalidated = Counter(
+    "db_connections_invalidated_total",
+    "Connections discarded as broken (failed pre-ping, dropped by the server)",
+)
+connection_age = Histogram(
+    "db_connection_age_seconds", "Lifetime of DBAPI connections when closed",
+    buckets=CONNECTION_AGE_BUCKETS,
+)
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout took.
+
+    Covers waiting for a free slot, opening a new connection and the
+    pre-ping, i.e. everything a request waits on before its first query.
+    """
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except PoolTimeout:
+            pool_timeouts.inc()
+            raise
+        finally:
+            pool_wait.observe(time.perf_counter() - start)
+
+
+def engine_options(config):
+    """SQLALCHEMY_ENGINE_OPTIONS for the DB_* settings in ``config``.
+
+    With DB_PGBOUNCER the statement timeout is sent as SET LOCAL at the
+    start of each transaction, because transaction-pooling PgBouncer rejects
+    startup options and would leak a session-level SET to other clients.
+    Prepared statements are turned off for drivers that use them (psycopg
+    3); psycopg2 never prepares server-side.
+    """
+    url = make_url(config["SQLALCHEMY_DATABASE_URI"])
+    if not url.get_backend_name().startswith("postgresql"):
+        return {}
+
+    connect_args = {
+        "connect_timeout": config["DB_CONNECT_TIMEOUT"],
+        # Notice a dead peer instead of hanging on a recycled connection
+        "keepalives": 1,
+        "keepalives_idle": config["DB_TCP_KEEPALIVES_IDLE"],
+    }
+    timeout = config["DB_STATEMENT_TIMEOUT_MS"]
+    if config["DB_PGBOUNCER"]:
+        if url.get_driver_name() == "psycopg":
+            connect_args["prepare_threshold"] = None
+    elif timeout:
+        connect_args["options"] = f"-c statement_timeout={int(timeout)}"
+
+    return {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": config["DB_POOL_SIZE"],
+        "max_overflow": config["DB_MAX_OVERFLOW"],
+        "pool_timeout": config["DB_POOL_TIMEOUT"],
+        "pool_recycle": config["DB_POOL_RECYCLE"],
+        "pool_pre_ping": config["DB_POOL_PRE_PING"],
+        "connect_args": connect_args,
+    }
+
+
+def listen_dsn(config):
+    """libpq DSN for the LISTEN connection behind /events/stream.
+
+    LISTEN is session state, which transaction-pooling PgBouncer doesn't
+    keep: the listener would connect fine and never hear a NOTIFY. So with
+    DB_PGBOUNCER an EVENTS_DATABASE_URL straight to Postgres is required,
+    and its absence fails at startup instead of silently.
+    """
+    url = config["EVENTS_DATABASE_URL"]
+    if not url:
+        if config["DB_PGBOUNCER"]:
+            raise RuntimeError(
+                "DB_PGBOUNCER is set but EVENTS_DATABASE_URL is not: /events/stream "
+                "needs a direct Postgres URL, LISTEN doesn't work through PgBouncer"
+            )
+        url = config["SQLALCHEMY_DATABASE_URI"]
+    url = make_url(url)
+    if not url.get_backend_name().startswith("postgresql"):
+        return None
+    return url.set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+def _set_local_timeout(timeout):
+    def begin(conn):
+        # Straight on the DBAPI connection: psycopg2 opens the transaction
+        # implicitly, and going through ``conn`` would re-enter begin()
+        with conn.connection.dbapi_connection.cursor() as cur:
+            cur.execute(f"SET LOCAL statement_timeout = {int(timeout)}")
+
+    return begin
+
+
+def instrument_engine(engine, config):
+    """Hook pool events and /metrics gauges onto ``engine``."""
+    if config["DB_PGBOUNCER"] and config["DB_STATEMENT_TIMEOUT_MS"]:
+        event.listen(engine, "begin", _set_local_timeout(config["DB_STATEMENT_TIMEOUT_MS"]))
+
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return
+
+    @event.listens_for(pool, "connect")
+    def _opened(dbapi_connection, record):
+        record.info["opened_at"] = time.monotonic()
+        connections_opened.inc()
+
+    @event.listens_for(pool, "close")
+    def _closed(dbapi_connection, record):
+        connections_closed.inc()
+        opened = record.info.get("opened_at")
+        if opened is not None:
+            connection_age.observe(time.monotonic() - opened)
+
+    @event.listens_for(pool, "close_detached")
+    def _closed_detached(dbapi_connection):
+        connections_closed.inc()
+
+    @event.listens_for(pool, "invalidate")
+    def _invalidated(dbapi_connection, record, exception):
+        connections_invalidated.inc()
+
+    def collect():
+        pool_size.set(pool.size())
+        pool_checked_out.set(pool.checkedout())
+        pool_idle.set(pool.checkedin())
+        pool_overflow.set(max(pool.overflow(), 0))
+
+    REGISTRY.add_collector(collect)
+
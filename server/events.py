@@ -0,0 +1,137 @@
+# server/events.py
+import json
+import logging
+import queue
+import select
+import threading
+import time
+import psycopg2
+from sqlalchemy import event, func
+from extensions import db
+
+log = logging.getLogger(__name__)
+
+CHANNEL = "afyalink_events"
+# NOTIFY payloads are capped at 8000 bytes by Postgres
+MAX_PAYLOAD = 7900
+
+_PENDING = "pending_events"
+
+
+def publish(kind, serialize, clinic_id=None, patient_id=None):
+    """Queue a change event on the current transaction.
+
+    ``serialize`` is called at commit time (after the flush, so generated
+    ids are available) and the event goes out through ``pg_notify`` in the
+    same transaction: listeners in every worker see it exactly when the
+    change becomes visible, and never for rolled-back writes.
+    """
+    db.session.info.setdefault(_PENDING, []).append(
+        (kind, serialize, clinic_id, patient_id)
+    )
+
+
+@event.listens_for(db.session, "before_commit")
+def _notify_pending(session):
+    pending = session.info.pop(_PENDING, None)
+    if not pending:
+        return
+    session.flush()
+    for kind, serialize, clinic_id, patient_id in pending:
+        data = serialize()
+        message = json.dumps(
+            {"event": kind, "data": data, "clinic_id": clinic_id, "patient_id": patient_id},
+            default=str,
+        )
+        if len(message) > MAX_PAYLOAD:
+            message = json.dumps(
+                {"event": kind, "data": {"id": data.get("id")},
+                 "clinic_id": clinic_id, "patient_id": patient_id}
+            )
+        session.execute(func.pg_notify(CHANNEL, message).select())
+
+
+@event.listens_for(db.session, "after_soft_rollback")
+def _drop_pending(session, previous_transaction):
+    session.info.pop(_PENDING, None)
+
+
+class Subscription:
+    def __init__(self, accept, maxsize=100):
+        self.accept = accept
+        self.queue = queue.Queue(maxsize=maxsize)
+
+    def get(self, timeout):
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class EventBroker:
+    """Per-process fan-out of NOTIFY messages to stream subscribers.
+
+    One LISTEN connection per worker feeds every open stream, so idle
+    streams cost a queue each and hold no database connection.
+    """
+
+    def __init__(self):
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._listener = None
+
+    def subscribe(self, accept, dsn):
+        sub = Subscription(accept)
+        with self._lock:
+            self._subscribers.add(sub)
+            if self._listener is None or not self._listener.is_alive():
+                self._listener = threading.Thread(
+                    target=self._listen, args=(dsn,), name="event-listener", daemon=True
+                )
+                self._listener.start()
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            self._subscribers.discard(sub)
+
+    def dispatch(self, message):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for sub in subscribers:
+            if not sub.accept(message):
+                continue
+            try:
+                sub.queue.put_nowait(message)
+            except queue.Full:
+                # A stalled client only loses its own events
+                pass
+
+    def _listen(self, dsn):
+        backoff = 1
+        while True:
+            conn = None
+            try:
+                conn = psycopg2.connect(dsn)
+                conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                conn.cursor().execute(f"LISTEN {CHANNEL}")
+                backoff = 1
+                while True:
+                    if select.select([conn], [], [], 30) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        note = conn.notifies.pop(0)
+                        try:
+                            self.dispatch(json.loads(note.payload))
+                        except ValueError:
+                            log.warning("Dropping malformed event payload")
+            except psycopg2.Error as e:
+                log.warning("Event listener disconnected: %s", e)
+                if conn is not None:
+                    conn.close()
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+
+
+broker = EventBroker()
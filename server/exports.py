@@ -0,0 +1,299 @@
+# server/exports.py
+import csv
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from sqlalchemy import select, text, types
+from extensions import db
+from models import Appointment, ExportJob, SymptomHistory, User
+
+log = logging.getLogger(__name__)
+
+FORMATS = {"csv": ".csv.gz", "parquet": ".parquet"}
+
+# Exported columns per dataset; password hashes never leave the database
+DATASETS = {
+    "appointments": select(
+        Appointment.id, Appointment.patient_id, Appointment.clinic_id,
+        Appointment.clinic_name, Appointment.doctor, Appointment.service,
+        Appointment.date, Appointment.time, Appointment.status,
+        Appointment.notes, Appointment.created_at,
+    ).order_by(Appointment.id),
+    "users": select(
+        User.id, User.full_name, User.email, User.phone_number, User.role,
+        User.clinic_id, User.blocked, User.profile, User.saved_clinics,
+        User.created_at,
+    ).order_by(User.id),
+    "symptom_history": select(
+        SymptomHistory.id, SymptomHistory.user_id, SymptomHistory.symptoms,
+        SymptomHistory.result, SymptomHistory.timestamp, SymptomHistory.created_at,
+    ).order_by(SymptomHistory.id),
+}
+
+# Oldest queued job first; jobs left "running" by a dead worker are
+# picked up again once their heartbeat is older than the stale timeout.
+# A live worker keeps beating however long the export takes
+CLAIM_SQL = """
+UPDATE export_jobs SET status = 'running', started_at = :now, heartbeat_at = :now,
+    error = NULL
+WHERE id = (
+    SELECT id FROM export_jobs
+    WHERE status = 'queued'
+       OR (status = 'running' AND coalesce(heartbeat_at, started_at) < :stale_before)
+    ORDER BY id
+    LIMIT 1
+    FOR UPDATE SKIP LOCKED
+)
+RETURNING id
+"""
+
+
+def parquet_available():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def claim_next(stale_after):
+    now = datetime.utcnow()
+    job_id = db.session.execute(
+        text(CLAIM_SQL),
+        {"now": now, "stale_before": now - timedelta(seconds=stale_after)},
+    ).scalar()
+    db.session.commit()
+    return job_id
+
+
+class Heartbeat:
+    """Marks a running job alive; call it between batches.
+
+    Writes ``heartbeat_at`` at most every ``interval`` seconds, in its own
+    transaction so it is visible while the export's read is still open.
+    """
+
+    def __init__(self, job_id, interval):
+        self.job_id = job_id
+        self.interval = interval
+        self._last = time.monotonic()
+
+    def __call__(self):
+        now = time.monotonic()
+        if now - self._last < self.interval:
+            return
+        self._last = now
+        with db.engine.begin() as conn:
+            conn.execute(
+                text("UPDATE export_jobs SET heartbeat_at = :now WHERE id = :id"),
+                {"now": datetime.utcnow(), "id": self.job_id},
+            )
+
+
+class _BeatingFile:
+    """File wrapper that beats on every write (COPY has no batches)."""
+
+    def __init__(self, out, beat):
+        self._out = out
+        self._beat = beat
+
+    def write(self, data):
+        self._beat()
+        return self._out.write(data)
+
+
+def _green_connections():
+    """True once psycogreen (gunicorn's gevent post_fork) patched psycopg2.
+
+    Connections opened under a wait callback are asynchronous, and
+    ``copy_expert`` refuses to run on them.
+    """
+    from psycopg2.extensions import get_wait_callback
+
+    return get_wait_callback() is not None
+
+
+def run_job(job_id, export_dir, heartbeat_interval=30):
+    job = db.session.get(ExportJob, job_id)
+    beat = Heartbeat(job_id, heartbeat_interval)
+    os.makedirs(export_dir, exist_ok=True)
+    path = os.path.join(export_dir, f"{job.dataset}-{job.id}{FORMATS[job.format]}")
+    partial = path + ".part"
+    stmt = DATASETS[job.dataset]
+    try:
+        if job.format == "parquet":
+            rows = _write_parquet(stmt, partial, beat)
+        elif db.engine.dialect.name == "postgresql" and not _green_connections():
+            rows = _copy_csv(stmt, partial, beat)
+        else:
+            rows = _write_csv(stmt, partial, beat)
+        os.replace(partial, path)
+    except Exception as e:
+        log.exception("Export job %s failed", job_id)
+        db.session.rollback()
+        if os.path.exists(partial):
+            os.remove(partial)
+        job = db.session.get(ExportJob, job_id)
+        job.status = "failed"
+        job.error = str(e)[:500]
+    else:
+        job.status = "done"
+        job.row_count = rows
+        job.file_path = path
+        job.size_bytes = os.path.getsize(path)
+    job.finished_at = datetime.utcnow()
+    db.session.commit()
+
+
+def _copy_csv(stmt, path, beat):
+    """Stream ``COPY (...) TO STDOUT`` straight into a gzip file."""
+    sql = str(stmt.compile(db.engine, compile_kwargs={"literal_binds": True}))
+    raw = db.engine.raw_connection()
+    try:
+        with raw.cursor() as cur, gzip.open(path, "wb") as out:
+            # Exports are expected to outlive DB_STATEMENT_TIMEOUT_MS
+            cur.execute("SET LOCAL statement_timeout = 0")
+            cur.copy_expert(
+                f"COPY ({sql}) TO STDOUT WITH (FORMAT csv, HEADER)", _BeatingFile(out, beat)
+            )
+            rows = cur.rowcount
+        raw.commit()
+        return rows
+    finally:
+        raw.close()
+
+
+def _iter_batches(stmt, batch_size):
+    with db.engine.connect() as conn:
+        if conn.dialect.name == "postgresql":
+            conn.exec_driver_sql("SET LOCAL statement_timeout = 0")
+        result = conn.execute(
+            stmt, execution_options={"stream_results": True, "yield_per": batch_size}
+        )
+        yield list(result.keys())
+        for batch in result.partitions():
+            yield batch
+
+
+def _write_csv(stmt, path, beat, batch_size=5000):
+    rows = 0
+    batches = _iter_batches(stmt, batch_size)
+    with gzip.open(path, "wt", newline="") as out:
+        writer = csv.writer(out)
+        writer.writerow(next(batches))
+        for batch in batches:
+            writer.writerows(batch)
+            rows += len(batch)
+            beat()
+    return rows
+
+
+def _arrow_type(sql_type):
+    import pyarrow as pa
+
+    # BigInteger before Integer: it is a subclass
+    for sql, arrow in (
+        (types.Boolean, pa.bool_),
+        (types.BigInteger, pa.int64),
+        (types.Integer, pa.int32),
+        (types.Float, pa.float64),
+        (types.Numeric, pa.float64),
+        (types.DateTime, lambda: pa.timestamp("us")),
+        (types.Date, pa.date32),
+    ):
+        if isinstance(sql_type, sql):
+            return arrow()
+    # Strings, text, and JSON (written as JSON text)
+    return pa.string()
+
+
+def parquet_schema(stmt):
+    """Arrow schema from the SQL types of ``stmt``'s columns.
+
+    Inferring it from the first batch types an all-NULL column as ``null``,
+    and the first later batch with a value in it can't be written.
+    """
+    import pyarrow as pa
+
+    return pa.schema(
+        [pa.field(c.name, _arrow_type(c.type), nullable=True) for c in stmt.selected_columns]
+    )
+
+
+def _write_parquet(stmt, path, beat, batch_size=50000):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    rows = 0
+    schema = parquet_schema(stmt)
+    batches = _iter_batches(stmt, batch_size)
+    columns = next(batches)
+    with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+        for batch in batches:
+            records = [
+                {
+                    name: json.dumps(v) if isinstance(v, (dict, list)) else v
+                    for name, v in zip(columns, row)
+                }
+                for row in batch
+            ]
+            writer.write_table(pa.Table.from_pylist(records, schema=schema))
+            rows += len(batch)
+            beat()
+    return rows
+
+
+class ExportWorkers:
+    """Bounded pool that drains the export_jobs queue in the background.
+
+    Jobs are claimed with ``FOR UPDATE SKIP LOCKED``, so any number of web
+    processes and ``flask exports worker`` instances can share the queue.
+    On the CSV path rows never become Python objects: ``COPY`` output is
+    compressed as it arrives, so memory stays flat whatever the row count.
+
+    Off by default: inside a gevent web worker the pool threads are
+    greenlets, so compression would stall every other request on the
+    worker. Run ``flask exports worker`` (Procfile ``worker``) instead.
+    """
+
+    def __init__(self):
+        self._app = None
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self._app = app
+        app.extensions["export_workers"] = self
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._app.config["EXPORT_WORKERS"],
+                    thread_name_prefix="export",
+                )
+            return self._executor
+
+    def notify(self):
+        """Wake a pooled worker after a job was queued."""
+        if self._app.config["EXPORT_WORKERS"] > 0:
+            self._pool().submit(self.drain)
+
+    def drain(self):
+        with self._app.app_context():
+            while True:
+                job_id = claim_next(self._app.config["EXPORT_STALE_AFTER"])
+                if job_id is None:
+                    return
+                run_job(
+                    job_id, self._app.config["EXPORT_DIR"],
+                    self._app.config["EXPORT_HEARTBEAT_INTERVAL"],
+                )
+
+
+export_workers = ExportWorkers()
@@ -0,0 +1,57 @@
+# server/geo.py
+import math
+from sqlalchemy import func
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def coordinates_to_lat_lng(coordinates):
+    """Extract typed (lat, lng) from the free-form coordinates JSON.
+
+    Accepts {"lat": .., "lng": ..} and [lat, lng] (as in client/src/db.json),
+    with numbers or numeric strings. Missing, malformed, out-of-range and the
+    {0, 0} placeholder all map to (None, None) so they never show up in
+    proximity searches.
+    """
+    if isinstance(coordinates, dict):
+        values = coordinates.get("lat"), coordinates.get("lng")
+    elif isinstance(coordinates, (list, tuple)) and len(coordinates) == 2:
+        values = coordinates
+    else:
+        return None, None
+    if any(isinstance(v, bool) for v in values):
+        return None, None
+    try:
+        lat, lng = (float(v) for v in values)
+    except (TypeError, ValueError):
+        return None, None
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180) or (lat == 0 and lng == 0):
+        return None, None
+    return lat, lng
+
+
+def bounding_box(lat, lng, radius_km):
+    """(min_lat, max_lat, min_lng, max_lng) enclosing a circle of radius_km.
+
+    The longitude range is None when the box would wrap the antimeridian or
+    reach a pole; callers then only prefilter on latitude.
+    """
+    dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    min_lat, max_lat = lat - dlat, lat + dlat
+    if min_lat <= -90 or max_lat >= 90:
+        return max(min_lat, -90), min(max_lat, 90), None, None
+    dlng = math.degrees(radius_km / (EARTH_RADIUS_KM * math.cos(math.radians(lat))))
+    min_lng, max_lng = lng - dlng, lng + dlng
+    if min_lng < -180 or max_lng > 180:
+        return min_lat, max_lat, None, None
+    return min_lat, max_lat, min_lng, max_lng
+
+
+def haversine_sql(lat_col, lng_col, lat, lng):
+    """SQL expression for the great-circle distance in km to (lat, lng)."""
+    p1 = math.radians(lat)
+    p2 = func.radians(lat_col)
+    a = func.power(func.sin((p2 - p1) / 2), 2) + math.cos(p1) * func.cos(p2) * func.power(
+        func.sin((func.radians(lng_col) - math.radians(lng)) / 2), 2
+    )
+    return 2 * EARTH_RADIUS_KM * func.asin(func.least(1.0, func.sqrt(a)))
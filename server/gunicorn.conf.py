@@ -0,0 +1,28 @@
+# server/gunicorn.conf.py
+# Picked up automatically by `gunicorn 'app:create_app()'` (see Procfile).
+import os
+
+# gevent workers keep thousands of idle /events/stream connections open
+# without a thread per client
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gevent")
+workers = int(os.getenv("WEB_CONCURRENCY", 2))
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", 2000))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 30))
+keepalive = 5
+
+
+def post_fork(server, worker):
+    if worker_class == "gevent":
+        # Make psycopg2 yield to other greenlets while waiting on Postgres
+        from psycogreen.gevent import patch_psycopg
+
+        patch_psycopg()
+
+
+def post_worker_init(worker):
+    # Once the app is loaded, so the pool is sized from its config; under
+    # gevent this is a native thread pool, not processes forked off here
+    from passwords import password_hasher
+
+    if password_hasher.workers:
+        password_hasher.start()
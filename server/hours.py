@@ -0,0 +1,84 @@
+# server/hours.py
+from bisect import bisect_right
+from datetime import datetime
+from sqlalchemy import cast, func, literal
+from sqlalchemy.dialects.postgresql import JSONPATH
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+_OPEN_AT_PATH = "strict $[*] ? (@[0] <= $m && @[1] > $m)"
+
+
+def _parse_minute(value):
+    hours, minutes = str(value).split(":")[:2]
+    minute = int(hours) * 60 + int(minutes)
+    if not 0 <= minute < MINUTES_PER_DAY:
+        raise ValueError(value)
+    return minute
+
+
+def compile_operating_hours(operating_hours):
+    """Compile ``operating_hours`` JSON into sorted weekly minute intervals.
+
+    Each interval is a half-open ``[start, end)`` pair of minutes since
+    Monday 00:00. A closing time of 23:59 means "until midnight", ranges that
+    close before they open run past midnight into the next day, and touching
+    ranges are merged, so a clinic open around the clock compiles to
+    ``[[0, 10080]]``. Malformed days are skipped.
+    """
+    intervals = []
+    for day_info in operating_hours or []:
+        if not isinstance(day_info, dict) or day_info.get("closed"):
+            continue
+        try:
+            day = DAYS.index(day_info.get("day"))
+            start = _parse_minute(day_info["open"])
+            end = _parse_minute(day_info["close"])
+        except (KeyError, ValueError, TypeError):
+            continue
+        if end == MINUTES_PER_DAY - 1:
+            end = MINUTES_PER_DAY
+        if end <= start:
+            end += MINUTES_PER_DAY
+        offset = day * MINUTES_PER_DAY
+        start, end = offset + start, offset + end
+        if end > MINUTES_PER_WEEK:
+            intervals.append([0, end - MINUTES_PER_WEEK])
+            end = MINUTES_PER_WEEK
+        intervals.append([start, end])
+
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def is_always_open(intervals):
+    return intervals == [[0, MINUTES_PER_WEEK]]
+
+
+def minute_of_week(when):
+    return when.weekday() * MINUTES_PER_DAY + when.hour * 60 + when.minute
+
+
+def is_open_now(intervals, now=None):
+    """Check a compiled interval list against ``now`` (server local time)."""
+    if not intervals:
+        return False
+    minute = minute_of_week(now or datetime.now())
+    i = bisect_right(intervals, [minute, MINUTES_PER_WEEK + 1]) - 1
+    return i >= 0 and intervals[i][0] <= minute < intervals[i][1]
+
+
+def open_at_filter(column, when):
+    """SQL predicate: the compiled interval ``column`` covers ``when``."""
+    return func.jsonb_path_exists(
+        column,
+        cast(literal(_OPEN_AT_PATH), JSONPATH),
+        func.jsonb_build_object("m", minute_of_week(when)),
+    )
@@ -0,0 +1,137 @@
+# server/identity.py
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+from flask import current_app, g
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import event, select
+from extensions import db
+from models import User
+
+_CHANGED = "changed_user_ids"
+_MISSING = object()
+
+
+class AccountBlocked(Exception):
+    """The token is valid but its user has been blocked."""
+
+
+class Principal(NamedTuple):
+    """The columns authenticated handlers need about their caller."""
+
+    id: int
+    role: str
+    clinic_id: Optional[int]
+    full_name: str
+    email: str
+    blocked: bool
+
+
+class IdentityCache:
+    """Per-process LRU of user id -> Principal (or None) with a TTL.
+
+    Writes to a user evict it here on commit; other workers pick the change
+    up within IDENTITY_CACHE_TTL seconds.
+    """
+
+    def __init__(self, max_entries=10000, ttl=30):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def configure(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clear()
+
+    def get(self, user_id):
+        with self._lock:
+            item = self._entries.get(user_id)
+            if item is None:
+                return _MISSING
+            value, expires = item
+            if expires < time.monotonic():
+                del self._entries[user_id]
+                return _MISSING
+            self._entries.move_to_end(user_id)
+            return value
+
+    def set(self, user_id, value):
+        with self._lock:
+            self._entries[user_id] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *user_ids):
+        with self._lock:
+            for user_id in user_ids:
+                self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+identity_cache = IdentityCache()
+
+
+def jwt_user_id():
+    identity = get_jwt_identity()
+    # Tokens from the old clinic login carry {"id", "role"} as the identity
+    if isinstance(identity, dict):
+        identity = identity.get("id")
+    return int(identity)
+
+
+def load_principal(user_id):
+    row = db.session.execute(
+        select(User.id, User.role, User.clinic_id, User.full_name, User.email, User.blocked)
+        .where(User.id == user_id)
+    ).first()
+    return Principal(*row[:5], bool(row.blocked)) if row else None
+
+
+def get_current_user():
+    """Principal for the verified JWT, or None if the user no longer exists.
+
+    Resolved once per request and served from the identity cache, so most
+    authenticated requests don't query the users table at all. Raises
+    AccountBlocked for blocked users.
+    """
+    if "current_principal" not in g:
+        user_id = jwt_user_id()
+        principal = identity_cache.get(user_id)
+        if principal is _MISSING:
+            principal = load_principal(user_id)
+            if not current_app.config.get("IDENTITY_CACHE_DISABLED"):
+                identity_cache.set(user_id, principal)
+        g.current_principal = principal
+    principal = g.current_principal
+    if principal is not None and principal.blocked:
+        raise AccountBlocked()
+    return principal
+
+
+@event.listens_for(db.session, "after_flush")
+def _collect_changed_users(session, flush_context):
+    ids = {
+        obj.id for obj in (*session.dirty, *session.deleted)
+        if isinstance(obj, User) and obj.id is not None
+    }
+    if ids:
+        session.info.setdefault(_CHANGED, set()).update(ids)
+
+
+@event.listens_for(db.session, "after_commit")
+def _evict_committed(session):
+    ids = session.info.pop(_CHANGED, None)
+    if ids:
+        identity_cache.invalidate(*ids)
+
+
+@event.listens_for(db.session, "after_soft_rollback")
+def _drop_changed(session, previous_transaction):
+    session.info.pop(_CHANGED, None)
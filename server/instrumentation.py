@@ -0,0 +1,171 @@
+# server/instrumentation.py
+# Per-request performance counters: latency, SQL count/time, serialization
+# time and response size per endpoint, exported on /metrics and summarised
+# in a Server-Timing header.
+import time
+from flask import current_app, g, has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+from marshmallow import post_dump, pre_dump
+from sqlalchemy import event
+from extensions import db
+from metrics import Gauge, Histogram
+
+LABELS = ("blueprint", "rule", "method")
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+request_latency = Histogram(
+    "http_request_duration_seconds", "Time from routing to response", LABELS + ("status",)
+)
+request_queries = Histogram(
+    "http_request_sql_queries", "SQL statements run per request", LABELS,
+    buckets=QUERY_COUNT_BUCKETS,
+)
+request_sql_time = Histogram("http_request_sql_seconds", "SQL time per request", LABELS)
+request_serialize_time = Histogram(
+    "http_request_serialization_seconds",
+    "Schema dump and JSON encoding time per request, excluding SQL it triggers",
+    LABELS,
+)
+response_size = Histogram(
+    "http_response_size_bytes", "Response body size (unstreamed responses)", LABELS,
+    buckets=SIZE_BUCKETS,
+)
+requests_in_flight = Gauge("http_requests_in_flight", "Requests being handled")
+
+
+class RequestStats:
+    """Counters for the request being handled, kept on ``g``."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.serialize_seconds = 0.0
+        self._serialize_depth = 0
+        self._serialize_mark = None
+
+    def add_query(self, statement, seconds):
+        self.queries += 1
+        self.sql_seconds += seconds
+
+    def start_serialize(self):
+        # Nested schemas and jsonify inside a dump count once
+        if self._serialize_depth == 0:
+            self._serialize_mark = (time.perf_counter(), self.sql_seconds)
+        self._serialize_depth += 1
+
+    def stop_serialize(self):
+        self._serialize_depth -= 1
+        if self._serialize_depth == 0 and self._serialize_mark:
+            started, sql_before = self._serialize_mark
+            # Lazy loads and Method fields that query are SQL time, not ours
+            elapsed = time.perf_counter() - started - (self.sql_seconds - sql_before)
+            self.serialize_seconds += max(elapsed, 0.0)
+            self._serialize_mark = None
+
+    def server_timing(self, total):
+        return ", ".join(
+            [
+                f'db;dur={self.sql_seconds * 1000:.1f};desc="{self.queries} queries"',
+                f"ser;dur={self.serialize_seconds * 1000:.1f}",
+                f"total;dur={total * 1000:.1f}",
+            ]
+        )
+
+
+def current_stats():
+    return g.get("request_stats") if has_request_context() else None
+
+
+class DumpTimingMixin:
+    """Count a marshmallow schema's dump() as serialization time."""
+
+    @pre_dump(pass_many=True)
+    def _start_dump_timer(self, data, many, **kwargs):
+        stats = current_stats()
+        if stats is not None:
+            stats.start_serialize()
+        return data
+
+    @post_dump(pass_many=True)
+    def _stop_dump_timer(self, data, many, **kwargs):
+        stats = current_stats()
+        if stats is not None:
+            stats.stop_serialize()
+        return data
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    def dumps(self, obj, **kwargs):
+        stats = current_stats()
+        if stats is None:
+            return super().dumps(obj, **kwargs)
+        stats.start_serialize()
+        try:
+            return super().dumps(obj, **kwargs)
+        finally:
+            stats.stop_serialize()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_query_started", None)
+    stats = current_stats()
+    if started is not None and stats is not None:
+        stats.add_query(statement, time.perf_counter() - started)
+
+
+class RequestMetrics:
+    """Observes RequestStats per endpoint once the response is built.
+
+    SQL that runs while a streamed body is being sent comes too late to be
+    counted.
+    """
+
+    def init_app(self, app):
+        app.json = TimedJSONProvider(app)
+        with app.app_context():
+            event.listen(db.engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(db.engine, "after_cursor_execute", _after_cursor_execute)
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        app.teardown_request(self._teardown)
+        app.extensions["request_metrics"] = self
+
+    def _start(self):
+        g.request_stats = RequestStats()
+        requests_in_flight.inc()
+
+    def _finish(self, response):
+        stats = current_stats()
+        if stats is None:
+            return response
+        total = time.perf_counter() - stats.started
+        labels = {
+            "blueprint": request.blueprint or "",
+            # Unrouted requests share one label so 404 probes can't blow up
+            # the series count
+            "rule": request.url_rule.rule if request.url_rule else "<unmatched>",
+            "method": request.method,
+        }
+        request_latency.observe(total, status=str(response.status_code), **labels)
+        request_queries.observe(stats.queries, **labels)
+        request_sql_time.observe(stats.sql_seconds, **labels)
+        request_serialize_time.observe(stats.serialize_seconds, **labels)
+        if not response.is_streamed and response.content_length is not None:
+            response_size.observe(response.content_length, **labels)
+        if current_app.config.get("SERVER_TIMING"):
+            response.headers["Server-Timing"] = stats.server_timing(total)
+        return response
+
+    def _teardown(self, exc):
+        if g.pop("request_stats", None) is not None:
+            requests_in_flight.dec()
+
+
+request_metrics = RequestMetrics()
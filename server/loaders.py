@@ -0,0 +1,40 @@
+# server/loaders.py
+from flask import g, has_app_context
+from extensions import db
+from models import User
+
+
+class PatientNameLoader:
+    """Request-scoped batch loader for patient display names.
+
+    Ids are collected with ``prime`` and resolved with a single ``IN`` query,
+    so serializing N appointments costs one lookup instead of N.
+    """
+
+    def __init__(self):
+        self._names = {}
+
+    def prime(self, patient_ids):
+        missing = {pid for pid in patient_ids if pid is not None} - self._names.keys()
+        if not missing:
+            return
+        rows = db.session.query(User.id, User.full_name).filter(User.id.in_(missing))
+        for uid, full_name in rows:
+            self._names[uid] = full_name
+        # Remember misses too, so unknown ids are not queried again
+        for pid in missing:
+            self._names.setdefault(pid, None)
+
+    def load(self, patient_id):
+        if patient_id not in self._names:
+            self.prime([patient_id])
+        return self._names.get(patient_id) or "Unknown"
+
+
+def patient_names():
+    """Return the loader for the current request (a fresh one outside requests)."""
+    if not has_app_context():
+        return PatientNameLoader()
+    if "patient_name_loader" not in g:
+        g.patient_name_loader = PatientNameLoader()
+    return g.patient_name_loader
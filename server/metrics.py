@@ -0,0 +1,140 @@
+# server/metrics.py
+# Minimal in-process metrics with Prometheus text exposition. Values are
+# per process: with several gunicorn workers each scrape sees the worker
+# that answered it, so every sample carries a pid label.
+import os
+import threading
+from bisect import bisect_left
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", r"\\").replace('"', r'\"').replace("\n", r"\n")
+
+
+def _labels(names, values):
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=(), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        (registry or REGISTRY).register(self)
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        return tuple(labels[n] for n in self.labelnames)
+
+    def header(self):
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [(self.name, self.labelnames, key, v) for key, v in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS, registry=None):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[bisect_left(self.buckets, value)] += 1
+            self._values[key] = (counts, total + value)
+
+    def snapshot(self, **labels):
+        """(count, sum) observed for ``labels``."""
+        with self._lock:
+            counts, total = self._values.get(self._key(labels), ([0], 0.0))
+            return sum(counts), total
+
+    def samples(self):
+        with self._lock:
+            items = [(key, list(counts), total) for key, (counts, total) in self._values.items()]
+        names = self.labelnames + ("le",)
+        out = []
+        for key, counts, total in items:
+            running = 0
+            for bound, n in zip(self.buckets, counts):
+                running += n
+                out.append((f"{self.name}_bucket", names, key + (repr(bound),), running))
+            running += counts[-1]
+            out.append((f"{self.name}_bucket", names, key + ("+Inf",), running))
+            out.append((f"{self.name}_count", self.labelnames, key, running))
+            out.append((f"{self.name}_sum", self.labelnames, key, total))
+        return out
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} already registered")
+            self._metrics[metric.name] = metric
+
+    def add_collector(self, fn):
+        """Call ``fn()`` before every render, e.g. to refresh gauges."""
+        self._collectors.append(fn)
+
+    def render(self):
+        for fn in self._collectors:
+            fn()
+        with self._lock:
+            metrics = list(self._metrics.values())
+        pid = str(os.getpid())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.header())
+            for name, labelnames, values, value in metric.samples():
+                label_str = _labels(("pid",) + labelnames, (pid,) + tuple(values))
+                lines.append(f"{name}{label_str} {value}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
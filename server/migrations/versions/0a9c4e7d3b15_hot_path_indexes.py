@@ -0,0 +1,50 @@
+"""hot path indexes
+
+Revision ID: 0a9c4e7d3b15
+Revises: f17d4b2e8c63
+Create Date: 2026-10-18 19:02:44.118305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0a9c4e7d3b15'
+down_revision = 'f17d4b2e8c63'
+branch_labels = None
+depends_on = None
+
+# Keyset-paginated lists filter on the leading column and page on the
+# trailing (created_at, id), so one index serves both the predicate and
+# the ORDER BY ... LIMIT
+INDEXES = [
+    ('ix_appointments_patient_id', 'appointments', ['patient_id', 'created_at', 'id']),
+    ('ix_appointments_clinic_id', 'appointments', ['clinic_id', 'created_at', 'id']),
+    ('ix_appointments_clinic_date', 'appointments', ['clinic_id', 'date']),
+    ('ix_appointments_created_at', 'appointments', ['created_at', 'id']),
+    ('ix_reviews_clinic_id', 'reviews', ['clinic_id']),
+    ('ix_clinics_status', 'clinics', ['status', 'created_at', 'id']),
+    ('ix_clinics_rating', 'clinics', ['rating', 'id']),
+    ('ix_users_role', 'users', ['role', 'created_at', 'id']),
+    ('ix_users_clinic_id', 'users', ['clinic_id']),
+    ('ix_users_email_lower', 'users', [sa.text('lower(email)')]),
+    ('ix_articles_created_at', 'articles', ['created_at', 'id']),
+]
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction, and doesn't
+    # block writes to the table while it builds
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name, table, columns, unique=False,
+                postgresql_concurrently=True, if_not_exists=True,
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
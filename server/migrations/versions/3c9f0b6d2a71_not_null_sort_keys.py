@@ -0,0 +1,57 @@
+"""not null sort keys
+
+Revision ID: 3c9f0b6d2a71
+Revises: b7e3d91a4c58
+Create Date: 2026-10-18 21:40:27.864410
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c9f0b6d2a71'
+down_revision = 'b7e3d91a4c58'
+branch_labels = None
+depends_on = None
+
+# Columns keyset pagination sorts on. A NULL never satisfies the cursor's
+# row comparison, so such rows were skipped or stalled the cursor.
+# Timestamps the rows never had are backfilled with the oldest one in the
+# table, so those rows stay at the end of newest-first lists
+TIMESTAMPS = [
+    ('users', 'created_at'),
+    ('clinics', 'created_at'),
+    ('appointments', 'created_at'),
+    ('articles', 'created_at'),
+    ('reports', 'date'),
+    ('export_jobs', 'created_at'),
+]
+
+
+def upgrade():
+    for table, column in TIMESTAMPS:
+        op.execute(
+            f"UPDATE {table} SET {column} = coalesce("
+            f"(SELECT min({column}) FROM {table}), timezone('utc', now())) "
+            f"WHERE {column} IS NULL"
+        )
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.alter_column(column, existing_type=sa.DateTime(), nullable=False)
+
+    # What the rating rebuild computes for these clinics
+    op.execute(
+        "UPDATE clinics SET rating = CASE WHEN reviews > 0 "
+        "THEN coalesce(rating_sum, 0) / reviews ELSE 0 END WHERE rating IS NULL"
+    )
+    with op.batch_alter_table('clinics', schema=None) as batch_op:
+        batch_op.alter_column('rating', existing_type=sa.Float(), nullable=False)
+
+
+def downgrade():
+    with op.batch_alter_table('clinics', schema=None) as batch_op:
+        batch_op.alter_column('rating', existing_type=sa.Float(), nullable=True)
+
+    for table, column in reversed(TIMESTAMPS):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.alter_column(column, existing_type=sa.DateTime(), nullable=True)
@@ -0,0 +1,92 @@
+"""compiled operating hours
+
+Revision ID: 5f1e2a7c9b30
+Revises: c842ab6f6a38
+Create Date: 2026-10-18 09:12:44.118203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '5f1e2a7c9b30'
+down_revision = 'c842ab6f6a38'
+branch_labels = None
+depends_on = None
+
+# hours.compile_operating_hours as of this revision, copied so later
+# changes to the app can't change what this migration writes
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+
+def _parse_minute(value):
+    hours, minutes = str(value).split(":")[:2]
+    minute = int(hours) * 60 + int(minutes)
+    if not 0 <= minute < MINUTES_PER_DAY:
+        raise ValueError(value)
+    return minute
+
+
+def _compile(operating_hours):
+    intervals = []
+    for day_info in operating_hours or []:
+        if not isinstance(day_info, dict) or day_info.get("closed"):
+            continue
+        try:
+            day = DAYS.index(day_info.get("day"))
+            start = _parse_minute(day_info["open"])
+            end = _parse_minute(day_info["close"])
+        except (KeyError, ValueError, TypeError):
+            continue
+        if end == MINUTES_PER_DAY - 1:
+            end = MINUTES_PER_DAY
+        if end <= start:
+            end += MINUTES_PER_DAY
+        offset = day * MINUTES_PER_DAY
+        start, end = offset + start, offset + end
+        if end > MINUTES_PER_WEEK:
+            intervals.append([0, end - MINUTES_PER_WEEK])
+            end = MINUTES_PER_WEEK
+        intervals.append([start, end])
+
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def upgrade():
+    with op.batch_alter_table('clinics', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('open_intervals', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+        batch_op.add_column(sa.Column('is_24_7', sa.Boolean(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_clinics_is_24_7'), ['is_24_7'], unique=False)
+
+    # Backfill the compiled index for existing clinics
+    clinics = sa.table(
+        'clinics',
+        sa.column('id', sa.Integer),
+        sa.column('operating_hours', postgresql.JSONB),
+        sa.column('open_intervals', postgresql.JSONB),
+        sa.column('is_24_7', sa.Boolean),
+    )
+    conn = op.get_bind()
+    for clinic_id, hours in conn.execute(sa.select(clinics.c.id, clinics.c.operating_hours)):
+        intervals = _compile(hours)
+        conn.execute(
+            clinics.update()
+            .where(clinics.c.id == clinic_id)
+            .values(open_intervals=intervals, is_24_7=intervals == [[0, MINUTES_PER_WEEK]])
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('clinics', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_clinics_is_24_7'))
+        batch_op.drop_column('is_24_7')
+        batch_op.drop_column('open_intervals')
@@ -0,0 +1,68 @@
+"""clinic lat/lng index
+
+Revision ID: 8b3d4e6f0a12
+Revises: 5f1e2a7c9b30
+Create Date: 2026-10-18 11:40:05.502917
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '8b3d4e6f0a12'
+down_revision = '5f1e2a7c9b30'
+branch_labels = None
+depends_on = None
+
+
+def _lat_lng(coordinates):
+    # geo.coordinates_to_lat_lng as of this revision, copied so later
+    # changes to the app can't change what this migration writes
+    if isinstance(coordinates, dict):
+        values = coordinates.get("lat"), coordinates.get("lng")
+    elif isinstance(coordinates, (list, tuple)) and len(coordinates) == 2:
+        values = coordinates
+    else:
+        return None, None
+    if any(isinstance(v, bool) for v in values):
+        return None, None
+    try:
+        lat, lng = (float(v) for v in values)
+    except (TypeError, ValueError):
+        return None, None
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180) or (lat == 0 and lng == 0):
+        return None, None
+    return lat, lng
+
+
+def upgrade():
+    with op.batch_alter_table('clinics', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('latitude', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('longitude', sa.Float(), nullable=True))
+        batch_op.create_index('ix_clinics_lat_lng', ['latitude', 'longitude'], unique=False)
+
+    # Backfill with the conversion the model ran on every write at the time
+    clinics = sa.table(
+        'clinics',
+        sa.column('id', sa.Integer),
+        sa.column('coordinates', postgresql.JSONB),
+        sa.column('latitude', sa.Float),
+        sa.column('longitude', sa.Float),
+    )
+    conn = op.get_bind()
+    for clinic_id, coordinates in conn.execute(sa.select(clinics.c.id, clinics.c.coordinates)):
+        lat, lng = _lat_lng(coordinates)
+        if lat is not None:
+            conn.execute(
+                clinics.update()
+                .where(clinics.c.id == clinic_id)
+                .values(latitude=lat, longitude=lng)
+            )
+
+
+def downgrade():
+    with op.batch_alter_table('clinics', schema=None) as batch_op:
+        batch_op.drop_index('ix_clinics_lat_lng')
+        batch_op.drop_column('longitude')
+        batch_op.drop_column('latitude')
@@ -0,0 +1,43 @@
+"""clinic search vector
+
+Revision ID: a47c1d9e2b56
+Revises: 8b3d4e6f0a12
+Create Date: 2026-10-18 13:02:31.774510
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'a47c1d9e2b56'
+down_revision = '8b3d4e6f0a12'
+branch_labels = None
+depends_on = None
+
+# search.CLINIC_SEARCH_DOCUMENT as of this revision
+CLINIC_SEARCH_DOCUMENT = (
+    "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(location, '')), 'B') || "
+    "setweight(jsonb_to_tsvector('english', coalesce(services, '[]'::jsonb), "
+    "'[\"string\"]'), 'B') || "
+    "setweight(jsonb_to_tsvector('english', jsonb_path_query_array("
+    "coalesce(doctors, '[]'::jsonb), '$[*].specialty'), '[\"string\"]'), 'C')"
+)
+
+
+def upgrade():
+    with op.batch_alter_table('clinics', schema=None) as batch_op:
+        batch_op.add_column(sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed(CLINIC_SEARCH_DOCUMENT, persisted=True),
+            nullable=True,
+        ))
+        batch_op.create_index('ix_clinics_search_vector', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade():
+    with op.batch_alter_table('clinics', schema=None) as batch_op:
+        batch_op.drop_index('ix_clinics_search_vector', postgresql_using='gin')
+        batch_op.drop_column('search_vector')
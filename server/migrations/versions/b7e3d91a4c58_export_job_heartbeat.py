@@ -0,0 +1,26 @@
+"""export job heartbeat
+
+Revision ID: b7e3d91a4c58
+Revises: 0a9c4e7d3b15
+Create Date: 2026-10-18 21:14:09.530127
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e3d91a4c58'
+down_revision = '0a9c4e7d3b15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('export_jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('export_jobs', schema=None) as batch_op:
+        batch_op.drop_column('heartbeat_at')
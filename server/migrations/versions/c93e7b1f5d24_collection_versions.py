@@ -0,0 +1,29 @@
+"""collection versions
+
+Revision ID: c93e7b1f5d24
+Revises: a47c1d9e2b56
+Create Date: 2026-10-18 14:26:09.381755
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c93e7b1f5d24'
+down_revision = 'a47c1d9e2b56'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('collection_versions',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('collection_versions')
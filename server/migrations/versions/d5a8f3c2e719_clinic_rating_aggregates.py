@@ -0,0 +1,56 @@
+"""clinic rating aggregates
+
+Revision ID: d5a8f3c2e719
+Revises: c93e7b1f5d24
+Create Date: 2026-10-18 15:48:52.930166
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'd5a8f3c2e719'
+down_revision = 'c93e7b1f5d24'
+branch_labels = None
+depends_on = None
+
+# ratings.REBUILD_SQL for every clinic, as of this revision
+REBUILD_SQL = """
+UPDATE clinics AS c
+SET reviews = s.review_count,
+    rating_sum = s.rating_sum,
+    rating = CASE WHEN s.review_count > 0 THEN s.rating_sum / s.review_count ELSE 0 END,
+    rating_histogram = s.histogram
+FROM (
+    SELECT cl.id,
+           count(r.id) AS review_count,
+           coalesce(sum(r.rating), 0) AS rating_sum,
+           jsonb_build_object(
+               '1', count(r.id) FILTER (WHERE least(5, greatest(1, floor(r.rating + 0.5))) = 1),
+               '2', count(r.id) FILTER (WHERE least(5, greatest(1, floor(r.rating + 0.5))) = 2),
+               '3', count(r.id) FILTER (WHERE least(5, greatest(1, floor(r.rating + 0.5))) = 3),
+               '4', count(r.id) FILTER (WHERE least(5, greatest(1, floor(r.rating + 0.5))) = 4),
+               '5', count(r.id) FILTER (WHERE least(5, greatest(1, floor(r.rating + 0.5))) = 5)
+           ) AS histogram
+    FROM clinics cl
+    LEFT JOIN reviews r ON r.clinic_id = cl.id
+    GROUP BY cl.id
+) AS s
+WHERE c.id = s.id
+"""
+
+
+def upgrade():
+    with op.batch_alter_table('clinics', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('rating_sum', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('rating_histogram', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+
+    # rating/reviews were never maintained; derive everything from reviews
+    op.execute(REBUILD_SQL)
+
+
+def downgrade():
+    with op.batch_alter_table('clinics', schema=None) as batch_op:
+        batch_op.drop_column('rating_histogram')
+        batch_op.drop_column('rating_sum')
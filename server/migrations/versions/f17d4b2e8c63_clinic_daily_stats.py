@@ -0,0 +1,84 @@
+"""clinic daily stats
+
+Revision ID: f17d4b2e8c63
+Revises: e2c6b9a4f081
+Create Date: 2026-10-18 17:41:05.602913
+
+"""
+from collections import Counter
+from datetime import date, datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'f17d4b2e8c63'
+down_revision = 'e2c6b9a4f081'
+branch_labels = None
+depends_on = None
+
+# The rollup keys of analytics.py as of this revision, copied so later
+# changes to the app can't change what this migration writes
+DIMENSIONS = ("status", "service", "doctor")
+
+
+def _day(date_value, created_at):
+    try:
+        return date.fromisoformat(str(date_value or "")[:10])
+    except ValueError:
+        return (created_at or datetime.utcnow()).date()
+
+
+def _label(dimension, value):
+    value = (value or "").strip()
+    if dimension == "status":
+        return value or "Pending"
+    return value[:255] or "Unspecified"
+
+
+def upgrade():
+    op.create_table('clinic_daily_stats',
+    sa.Column('clinic_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('dimension', sa.String(length=20), nullable=False),
+    sa.Column('value', sa.String(length=255), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('clinic_id', 'day', 'dimension', 'value')
+    )
+
+    appointments = sa.table(
+        'appointments',
+        sa.column('clinic_id', sa.Integer),
+        sa.column('date', sa.String),
+        sa.column('created_at', sa.DateTime),
+        *[sa.column(dimension, sa.String) for dimension in DIMENSIONS],
+    )
+    stats = sa.table(
+        'clinic_daily_stats',
+        sa.column('clinic_id', sa.Integer),
+        sa.column('day', sa.Date),
+        sa.column('dimension', sa.String),
+        sa.column('value', sa.String),
+        sa.column('count', sa.Integer),
+    )
+    conn = op.get_bind()
+    counts = Counter()
+    result = conn.execute(
+        sa.select(appointments), execution_options={"stream_results": True, "yield_per": 5000}
+    )
+    for row in result.mappings():
+        day = _day(row['date'], row['created_at'])
+        counts.update(
+            (row['clinic_id'], day, dimension, _label(dimension, row[dimension]))
+            for dimension in DIMENSIONS
+        )
+    rows = [
+        {"clinic_id": c, "day": d, "dimension": dim, "value": v, "count": n}
+        for (c, d, dim, v), n in sorted(counts.items())
+    ]
+    for i in range(0, len(rows), 5000):
+        conn.execute(stats.insert(), rows[i:i + 5000])
+
+
+def downgrade():
+    op.drop_table('clinic_daily_stats')
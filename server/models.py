@@ -1,7 +1,12 @@
 from datetime import datetime
 from extensions import db
-from sqlalchemy.dialects.postgresql import JSONB
-from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy import event
+from sqlalchemy.orm import deferred
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
+from hours import compile_operating_hours, is_always_open
+from geo import coordinates_to_lat_lng
+from search import CLINIC_SEARCH_DOCUMENT
+from passwords import password_hasher
 from datetime import datetime, UTC
 
 
@@ -24,13 +29,30 @@ class User(db.Model):
     clinic_id = db.Column(db.Integer, nullable=True)
     saved_clinics = db.Column(JSONB, default=[])
     blocked = db.Column(db.Boolean, default=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        db.Index("ix_users_role", "role", "created_at", "id"),
+        db.Index("ix_users_clinic_id", "clinic_id"),
+        # Case-insensitive login/registration lookups
+        db.Index("ix_users_email_lower", db.text("lower(email)")),
+    )
+
+    @classmethod
+    def by_email(cls, email):
+        """Case-insensitive email lookup, served by ix_users_email_lower."""
+        return cls.query.filter(db.func.lower(cls.email) == email.lower())
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        """Verify ``password``, upgrading an outdated hash in place."""
+        if not password_hasher.verify(self.password_hash, password):
+            return False
+        if password_hasher.needs_rehash(self.password_hash):
+            self.set_password(password)
+        return True
 
 
 class Clinic(db.Model):
@@ -44,14 +66,48 @@ class Clinic(db.Model):
     opening_time = db.Column(db.String)
     closing_time = db.Column(db.String)
     coordinates = db.Column(JSONB, default=lambda: {"lat": 0.0, "lng": 0.0})
+    # Typed copy of coordinates for the (latitude, longitude) B-tree
+    latitude = db.Column(db.Float)
+    longitude = db.Column(db.Float)
     services = db.Column(JSONB, default=[])
     operating_hours = db.Column(JSONB, default=[])
+    # Compiled from operating_hours on every write, see hours.py
+    open_intervals = db.Column(JSONB, default=[])
+    is_24_7 = db.Column(db.Boolean, default=False, index=True)
     doctors = db.Column(JSONB, default=[])
-    rating = db.Column(db.Float, default=0.0)
+    # Review aggregates, maintained by ratings.record_review
+    rating = db.Column(db.Float, default=0.0, nullable=False)
     reviews = db.Column(db.Integer, default=0)
+    rating_sum = db.Column(db.Float, default=0.0)
+    rating_histogram = db.Column(
+        JSONB, default=lambda: {"1": 0, "2": 0, "3": 0, "4": 0, "5": 0}
+    )
     verified = db.Column(db.Boolean, default=False)
     status = db.Column(db.String(50), default="pending")
-    created_at = db.Column(db.DateTime, default=datetime.now(UTC))
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(UTC), nullable=False)
+    search_vector = deferred(
+        db.Column(TSVECTOR, db.Computed(CLINIC_SEARCH_DOCUMENT, persisted=True))
+    )
+
+    __table_args__ = (
+        db.Index("ix_clinics_lat_lng", "latitude", "longitude"),
+        db.Index("ix_clinics_search_vector", "search_vector", postgresql_using="gin"),
+        db.Index("ix_clinics_status", "status", "created_at", "id"),
+        db.Index("ix_clinics_rating", "rating", "id"),
+    )
+
+
+@event.listens_for(Clinic, "before_insert")
+@event.listens_for(Clinic, "before_update")
+def compile_clinic_hours(mapper, connection, clinic):
+    clinic.open_intervals = compile_operating_hours(clinic.operating_hours)
+    clinic.is_24_7 = is_always_open(clinic.open_intervals)
+
+
+@event.listens_for(Clinic, "before_insert")
+@event.listens_for(Clinic, "before_update")
+def sync_clinic_lat_lng(mapper, connection, clinic):
+    clinic.latitude, clinic.longitude = coordinates_to_lat_lng(clinic.coordinates)
 
 
 # hashed password ideally
@@ -69,7 +125,30 @@ class Appointment(db.Model):
     time = db.Column(db.String(50))
     status = db.Column(db.String(50))
     notes = db.Column(db.Text)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        db.Index("ix_appointments_patient_id", "patient_id", "created_at", "id"),
+        db.Index("ix_appointments_clinic_id", "clinic_id", "created_at", "id"),
+        db.Index("ix_appointments_clinic_date", "clinic_id", "date"),
+        db.Index("ix_appointments_created_at", "created_at", "id"),
+    )
+
+
+class ClinicDailyStat(db.Model):
+    """Appointments per clinic and day, by status, service and doctor.
+
+    Maintained from appointment flushes by analytics.py; one row per
+    (clinic, day, dimension, value).
+    """
+
+    __tablename__ = "clinic_daily_stats"
+
+    clinic_id = db.Column(db.Integer, primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    dimension = db.Column(db.String(20), primary_key=True)
+    value = db.Column(db.String(255), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
 
 
 class Article(db.Model):
@@ -85,7 +164,9 @@ class Article(db.Model):
     content = db.Column(db.Text)
     published = db.Column(db.Boolean, default=True)
     is_trending = db.Column(db.Boolean, default=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (db.Index("ix_articles_created_at", "created_at", "id"),)
 
 
 class Image(db.Model):
@@ -120,6 +201,8 @@ class Review(db.Model):
     comment = db.Column(db.Text, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (db.Index("ix_reviews_clinic_id", "clinic_id"),)
+
 class Report(db.Model):
     __tablename__ = "reports"
 
@@ -129,7 +212,7 @@ class Report(db.Model):
     summary = db.Column(db.Text)
     content = db.Column(db.Text)
     author = db.Column(db.String(100))
-    date = db.Column(db.DateTime, default=datetime.utcnow)
+    date = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     status = db.Column(db.String(50), default="Pending")
 
     # Foreign keys
@@ -142,3 +225,34 @@ class Report(db.Model):
 
     def __repr__(self):
         return f"<Report {self.title}>"
+
+
+class CollectionVersion(db.Model):
+    """Write counter per collection, bumped in the writing transaction."""
+
+    __tablename__ = "collection_versions"
+
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+
+class ExportJob(db.Model):
+    """Bulk export request, processed by exports.ExportWorkers."""
+
+    __tablename__ = "export_jobs"
+
+    id = db.Column(db.Integer, primary_key=True)
+    dataset = db.Column(db.String(50), nullable=False)
+    format = db.Column(db.String(20), nullable=False, default="csv")
+    status = db.Column(db.String(20), nullable=False, default="queued", index=True)
+    requested_by = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=True)
+    row_count = db.Column(db.BigInteger)
+    size_bytes = db.Column(db.BigInteger)
+    file_path = db.Column(db.String(500))
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    started_at = db.Column(db.DateTime)
+    # Refreshed by the worker while the job runs; see exports.CLAIM_SQL
+    heartbeat_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
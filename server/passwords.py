@@ -0,0 +1,178 @@
+# server/passwords.py
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from werkzeug.security import (
+    DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash,
+)
+from metrics import Counter, Gauge, Histogram
+
+# PASSWORD_HASH_METHOD accepts werkzeug methods ("scrypt:32768:8:1",
+# "pbkdf2:sha256:600000") and "bcrypt:<rounds>"
+DEFAULT_METHOD = "scrypt:32768:8:1"
+
+HASH_QUEUE_SECONDS = Histogram(
+    "password_hash_queue_seconds", "Time a hashing job waited for a pool process.", ["op"]
+)
+HASH_SECONDS = Histogram(
+    "password_hash_seconds", "Time spent computing a password hash.", ["op"]
+)
+HASH_IN_FLIGHT = Gauge(
+    "password_hash_in_flight", "Hashing jobs submitted to the pool and not finished."
+)
+HASH_REJECTED = Counter(
+    "password_hash_rejected_total", "Hashing jobs refused because the pool was saturated."
+)
+
+
+class HasherBusy(Exception):
+    """Raised when the hashing pool stays saturated past the queue timeout."""
+
+
+def hash_password(password, method=DEFAULT_METHOD):
+    if method.startswith("bcrypt"):
+        import bcrypt
+
+        rounds = int(method.partition(":")[2] or 12)
+        return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds)).decode()
+    return generate_password_hash(password, method=method)
+
+
+def verify_password(pwhash, password):
+    if not pwhash:
+        return False
+    if pwhash.startswith("$2"):
+        import bcrypt
+
+        return bcrypt.checkpw(password.encode(), pwhash.encode())
+    return check_password_hash(pwhash, password)
+
+
+def hash_prefix(pwhash):
+    """Algorithm and cost parameters recorded in a stored hash."""
+    if pwhash.startswith("$2"):
+        # $2b$12$<salt+hash>
+        return "bcrypt:" + str(int(pwhash.split("$")[2]))
+    return pwhash.partition("$")[0]
+
+
+def method_prefix(method):
+    """The hash_prefix() of hashes made with ``method``.
+
+    A bare method name gets the defaults bcrypt and werkzeug fill in.
+    """
+    name, *args = method.split(":")
+    if name == "bcrypt":
+        return "bcrypt:" + str(int(args[0]) if args else 12)
+    if name == "scrypt":
+        n, r, p = map(int, args) if args else (2**15, 8, 1)
+        return f"scrypt:{n}:{r}:{p}"
+    if name == "pbkdf2":
+        hash_name = args[0] if args else "sha256"
+        iterations = int(args[1]) if len(args) > 1 else DEFAULT_PBKDF2_ITERATIONS
+        return f"pbkdf2:{hash_name}:{iterations}"
+    return method
+
+
+def _green_threads():
+    """True in a gevent worker, where gunicorn monkey-patched threading."""
+    try:
+        from gevent import monkey
+    except ImportError:
+        return False
+    return monkey.is_module_patched("threading")
+
+
+def _timed(fn, *args):
+    # Runs in the pool process; the start time gives the queue wait
+    started = time.time()
+    result = fn(*args)
+    return started, time.time(), result
+
+
+class PasswordHasher:
+    """Runs password hashing in a bounded pool.
+
+    Hashing is deliberately slow CPU work; in a pool it no longer holds up
+    the worker, and the semaphore caps how many requests can wait on it at
+    once so a login storm gets 503s instead of starving everything else.
+
+    In a gevent worker the pool is gevent's native thread pool: hashlib and
+    bcrypt release the GIL, and waiting on a result parks only the calling
+    greenlet. Elsewhere it is a process pool whose children are spawned
+    fresh rather than forked from a worker holding sockets and locks.
+    """
+
+    def __init__(self):
+        self.method = DEFAULT_METHOD
+        self.workers = 0
+        self.max_pending = 0
+        self.queue_timeout = 0
+        self._pool = None
+        self._pool_pid = None
+        self._slots = threading.BoundedSemaphore(32)
+        self._lock = threading.Lock()
+        self._prefix = method_prefix(self.method)
+
+    def init_app(self, app):
+        self.method = app.config.get("PASSWORD_HASH_METHOD") or DEFAULT_METHOD
+        self.workers = app.config.get("PASSWORD_HASH_WORKERS", 2)
+        self.max_pending = app.config.get("PASSWORD_HASH_MAX_PENDING", 32)
+        self.queue_timeout = app.config.get("PASSWORD_HASH_QUEUE_TIMEOUT", 5.0)
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._prefix = method_prefix(self.method)
+        app.extensions["password_hasher"] = self
+
+    def start(self):
+        """Start this process's pool; gunicorn's post_worker_init calls it.
+
+        Also called on first use outside gunicorn (``flask run``, shells).
+        """
+        with self._lock:
+            if self._pool is None or self._pool_pid != os.getpid():
+                if _green_threads():
+                    from gevent.threadpool import ThreadPoolExecutor
+
+                    self._pool = ThreadPoolExecutor(max_workers=self.workers)
+                else:
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+                self._pool_pid = os.getpid()
+            return self._pool
+
+    def _run(self, op, fn, *args):
+        if not self.workers:
+            started = time.time()
+            result = fn(*args)
+            HASH_SECONDS.observe(time.time() - started, op=op)
+            return result
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            HASH_REJECTED.inc()
+            raise HasherBusy()
+        HASH_IN_FLIGHT.inc()
+        try:
+            submitted = time.time()
+            started, finished, result = self.start().submit(_timed, fn, *args).result()
+        finally:
+            HASH_IN_FLIGHT.dec()
+            self._slots.release()
+        HASH_QUEUE_SECONDS.observe(max(0.0, started - submitted), op=op)
+        HASH_SECONDS.observe(finished - started, op=op)
+        return result
+
+    def hash(self, password):
+        return self._run("hash", hash_password, password, self.method)
+
+    def verify(self, pwhash, password):
+        return self._run("verify", verify_password, pwhash, password)
+
+    def needs_rehash(self, pwhash):
+        """True when ``pwhash`` was made with another algorithm or cost."""
+        return hash_prefix(pwhash) != self._prefix
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,125 @@
+# server/querywatch.py
+# Opt-in N+1 and slow-query detector. Sampled requests group their SQL by
+# normalized statement; a statement repeated more than
+# QUERY_WATCH_REPEAT_THRESHOLD times, or slower than QUERY_WATCH_SLOW_MS,
+# is logged with its call site (QUERY_WATCH=log) or raises (QUERY_WATCH=raise).
+import os
+import random
+import re
+import time
+import traceback
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from extensions import db
+from metrics import Counter
+
+MODES = ("off", "log", "raise")
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_PARAM = re.compile(r"%\(\w+\)s|%s|\?|\$\d+")
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_SPACE = re.compile(r"\s+")
+
+violations = Counter(
+    "query_watch_violations_total", "Repeated or slow statements seen by the query watch",
+    ("kind", "rule"),
+)
+
+
+class QueryWatchError(RuntimeError):
+    """Raised in QUERY_WATCH=raise mode at the offending statement."""
+
+
+def normalize(statement):
+    """Statement shape: literals and bind params as ?, IN lists collapsed."""
+    sql = _PARAM.sub("?", statement)
+    sql = _LITERAL.sub("?", sql)
+    sql = _LIST.sub("(?)", sql)
+    return _SPACE.sub(" ", sql).strip()
+
+
+def call_site(limit):
+    """The innermost ``limit`` frames of application code, outermost first."""
+    frames = [
+        f for f in traceback.extract_stack()
+        if f.filename.startswith(APP_DIR)
+        and "site-packages" not in f.filename
+        and f.filename != __file__
+    ]
+    return "".join(traceback.format_list(frames[-limit:]))
+
+
+class RequestWatch:
+    """Statement counts for one sampled request."""
+
+    def __init__(self, config):
+        self.mode = config["QUERY_WATCH"]
+        self.repeat_threshold = config["QUERY_WATCH_REPEAT_THRESHOLD"]
+        self.slow_seconds = config["QUERY_WATCH_SLOW_MS"] / 1000.0
+        self.stack_depth = config["QUERY_WATCH_STACK_DEPTH"]
+        self.counts = {}
+
+    def observe(self, statement, seconds):
+        shape = normalize(statement)
+        n = self.counts.get(shape, 0) + 1
+        self.counts[shape] = n
+        # Report each shape once, when it first crosses the threshold
+        if n == self.repeat_threshold + 1:
+            self.report("repeat", f"ran more than {self.repeat_threshold} times", shape)
+        if seconds > self.slow_seconds:
+            self.report("slow", f"took {seconds * 1000:.0f}ms", shape)
+
+    def report(self, kind, what, shape):
+        rule = request.url_rule.rule if request.url_rule else "<unmatched>"
+        violations.inc(kind=kind, rule=rule)
+        message = (
+            f"{kind} query in {request.method} {rule}: statement {what}\n"
+            f"  {shape[:500]}\n{call_site(self.stack_depth)}"
+        )
+        if self.mode == "raise":
+            raise QueryWatchError(message)
+        current_app.logger.warning(message)
+
+
+def _current_watch():
+    return g.get("query_watch") if has_request_context() else None
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _current_watch() is not None:
+        context._watch_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_watch_started", None)
+    if started is None:
+        return
+    watch = _current_watch()
+    if watch is not None:
+        watch.observe(statement, time.perf_counter() - started)
+
+
+class QueryWatch:
+    """Samples QUERY_WATCH_SAMPLE_RATE of requests; the rest pay one
+    random() call and a ``g`` lookup per statement."""
+
+    def init_app(self, app):
+        mode = app.config.get("QUERY_WATCH", "off")
+        if mode not in MODES:
+            raise ValueError(f"QUERY_WATCH must be one of {', '.join(MODES)}, not {mode!r}")
+        app.extensions["query_watch"] = self
+        if mode == "off":
+            return
+        with app.app_context():
+            event.listen(db.engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(db.engine, "after_cursor_execute", _after_cursor_execute)
+        app.before_request(self._start)
+
+    def _start(self):
+        config = current_app.config
+        if random.random() < config["QUERY_WATCH_SAMPLE_RATE"]:
+            g.query_watch = RequestWatch(config)
+
+
+query_watch = QueryWatch()
@@ -0,0 +1,70 @@
+# server/ratings.py
+import math
+from sqlalchemy import Integer, func, literal, text, update
+from sqlalchemy.dialects.postgresql import JSONB, array
+from models import Clinic
+
+
+def star_bucket(rating):
+    # Half-up rounding, as floor(rating + 0.5) in REBUILD_SQL; Postgres
+    # round() on double precision rounds half to even
+    return str(min(5, max(1, math.floor(rating + 0.5))))
+
+
+def record_review(session, clinic_id, rating):
+    """Fold one review into the clinic's rating aggregates.
+
+    A single UPDATE computes every aggregate from the row's current values,
+    so concurrent reviews serialize on the clinic row lock and none are
+    lost. Returns False when the clinic does not exist.
+    """
+    star = star_bucket(rating)
+    count = func.coalesce(Clinic.reviews, 0)
+    total = func.coalesce(Clinic.rating_sum, 0)
+    histogram = func.coalesce(Clinic.rating_histogram, literal({}, JSONB))
+    stars = func.coalesce(histogram.op("->>")(star).cast(Integer), 0)
+    result = session.execute(
+        update(Clinic)
+        .where(Clinic.id == clinic_id)
+        .values(
+            reviews=count + 1,
+            rating_sum=total + rating,
+            rating=(total + rating) / (count + 1),
+            rating_histogram=func.jsonb_set(histogram, array([star]), func.to_jsonb(stars + 1)),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
+
+
+# Recomputes the aggregates from the reviews table; clinics without
+# reviews are reset to zero
+REBUILD_SQL = """
+UPDATE clinics AS c
+SET reviews = s.review_count,
+    rating_sum = s.rating_sum,
+    rating = CASE WHEN s.review_count > 0 THEN s.rating_sum / s.review_count ELSE 0 END,
+    rating_histogram = s.histogram
+FROM (
+    SELECT cl.id,
+           count(r.id) AS review_count,
+           coalesce(sum(r.rating), 0) AS rating_sum,
+           jsonb_build_object(
+               '1', count(r.id) FILTER (WHERE least(5, greatest(1, floor(r.rating + 0.5))) = 1),
+               '2', count(r.id) FILTER (WHERE least(5, greatest(1, floor(r.rating + 0.5))) = 2),
+               '3', count(r.id) FILTER (WHERE least(5, greatest(1, floor(r.rating + 0.5))) = 3),
+               '4', count(r.id) FILTER (WHERE least(5, greatest(1, floor(r.rating + 0.5))) = 4),
+               '5', count(r.id) FILTER (WHERE least(5, greatest(1, floor(r.rating + 0.5))) = 5)
+           ) AS histogram
+    FROM clinics cl
+    LEFT JOIN reviews r ON r.clinic_id = cl.id
+    WHERE :clinic_id IS NULL OR cl.id = :clinic_id
+    GROUP BY cl.id
+) AS s
+WHERE c.id = s.id
+"""
+
+
+def rebuild_rating_aggregates(connection, clinic_id=None):
+    """Recompute aggregates for one clinic (or all); returns rows updated."""
+    return connection.execute(text(REBUILD_SQL), {"clinic_id": clinic_id}).rowcount
@@ -0,0 +1,63 @@
+# server/routes/admin.py
+from flask import Blueprint, jsonify
+from sqlalchemy import case, func, literal, select, union_all
+from extensions import db
+from models import Appointment, Article, Clinic, User
+from versions import conditional
+from cache import response_cache
+from authz import rbac_required
+
+bp = Blueprint("admin", __name__, url_prefix="/admin")
+
+_COLLECTIONS = ("users", "clinics", "articles", "appointments")
+
+
+def _grouped(name, model, key):
+    key = key.label("key")
+    return select(literal(name).label("collection"), key, func.count().label("n")).select_from(
+        model
+    ).group_by(key)
+
+
+def dashboard_counts():
+    """Every admin-dashboard count from one UNION ALL of grouped COUNTs."""
+    stmt = union_all(
+        _grouped("users", User, func.coalesce(User.role, "unknown")),
+        _grouped("clinics", Clinic, func.coalesce(Clinic.status, "pending")),
+        _grouped(
+            "articles", Article,
+            case((Article.published.is_(True), "published"), else_="draft"),
+        ),
+        _grouped("appointments", Appointment, func.coalesce(Appointment.status, "Pending")),
+    )
+    counts = {name: {} for name in _COLLECTIONS}
+    for collection, key, n in db.session.execute(stmt):
+        counts[collection][key] = n
+    return counts
+
+
+# Counts for the admin landing page
+@bp.route("/summary", methods=["GET"])
+@rbac_required("admin:read")
+@conditional(*_COLLECTIONS)
+@response_cache.cached("admin:summary")
+def summary():
+    counts = dashboard_counts()
+    return jsonify(
+        {
+            "users": {"total": sum(counts["users"].values()), "byRole": counts["users"]},
+            "clinics": {
+                "total": sum(counts["clinics"].values()),
+                "byStatus": counts["clinics"],
+            },
+            "articles": {
+                "total": sum(counts["articles"].values()),
+                "published": counts["articles"].get("published", 0),
+                "drafts": counts["articles"].get("draft", 0),
+            },
+            "appointments": {
+                "total": sum(counts["appointments"].values()),
+                "byStatus": counts["appointments"],
+            },
+        }
+    )
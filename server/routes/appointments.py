@@ -1,57 +1,53 @@
 # routes/appointments.py
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
 from extensions import db
-from models import Appointment, User, Role, Clinic
+from models import Appointment, Clinic
 from schemas import AppointmentSchema
+from versions import conditional
+from events import publish
+from authz import rbac_required, current_caller, scope_filter
+from utils import keyset_paginate, paginated_response, stream_format, streamed_response
 
 bp = Blueprint("appointments", __name__, url_prefix="/appointments")
 appt_schema = AppointmentSchema()
 appts_schema = AppointmentSchema(many=True)
 
 
+def _scoped(permission):
+    # Rows outside the caller's clinic/own scope are filtered in SQL
+    return Appointment.query.filter(
+        scope_filter(
+            permission,
+            clinic_column=Appointment.clinic_id,
+            owner_column=Appointment.patient_id,
+        )
+    )
+
+
 # List Appointments
 @bp.route("/", methods=["GET"])
-@jwt_required()
+@rbac_required("appointments:read")
+@conditional("appointments", "users", streams=True)
 def list_appointments():
-    user_id = int(get_jwt_identity())
-    current_user = User.query.get(user_id)
-    if not current_user:
-        return jsonify({"msg": "User not found"}), 404
-
+    query = _scoped("appointments:read")
     patient_q = request.args.get("patientId", type=int)
-    query = Appointment.query
-
-    if current_user.role in [Role.ADMIN, Role.MANAGER]:
-        if patient_q:
-            query = query.filter_by(patient_id=patient_q)
-    elif current_user.role == Role.CLINIC:
-        if not current_user.clinic_id:
-            return jsonify({"msg": "Clinic not linked to user"}), 400
-        query = query.filter_by(clinic_id=current_user.clinic_id)
-        if patient_q:
-            query = query.filter_by(patient_id=patient_q)
-    else:  # Patient
-        if patient_q and patient_q != current_user.id:
-            return jsonify({"msg": "Not authorized"}), 403
-        query = query.filter_by(patient_id=current_user.id)
-
-    appts = query.all()
-    results = []
-    for appt in appts:
-        patient = User.query.get(appt.patient_id)
-        appt_dict = appt_schema.dump(appt)
-        appt_dict["patientName"] = patient.full_name if patient else "Unknown"
-        results.append(appt_dict)
-
-    return jsonify(results)
+    if patient_q:
+        query = query.filter_by(patient_id=patient_q)
+
+    order = (Appointment.created_at, Appointment.id)
+    fmt = stream_format()
+    if fmt:
+        return streamed_response(query, order, appts_schema, fmt)
+
+    page = keyset_paginate(query, order)
+    return paginated_response(appts_schema.dump(page["items"]), page)
 
 
 # Create Appointment
 @bp.route("/", methods=["POST"])
-@jwt_required()
+@rbac_required("appointments:create")
 def create_appointment():
-    user_id = int(get_jwt_identity())  # ← int
+    user_id = current_caller().id
     data = request.get_json() or {}
     required = ["clinicId", "date", "time"]
     for r in required:
@@ -78,58 +74,33 @@ def create_appointment():
         notes=data.get("notes"),
     )
     db.session.add(appt)
+    publish(
+        "appointment.created", lambda: appt_schema.dump(appt),
+        clinic_id=appt.clinic_id, patient_id=appt.patient_id,
+    )
     try:
         db.session.commit()
     except Exception as e:
         db.session.rollback()
         return jsonify({"msg": "Failed to save appointment"}), 500
 
-    appt_dict = appt_schema.dump(appt)
-    patient = User.query.get(appt.patient_id)
-    appt_dict["patientName"] = patient.full_name if patient else "Unknown"
-
-    return jsonify(appt_dict), 201
+    return jsonify(appt_schema.dump(appt)), 201
 
 
 # Get Single Appointment
 @bp.route("/<int:appt_id>", methods=["GET"])
-@jwt_required()
+@rbac_required("appointments:read")
+@conditional("appointments", "users")
 def get_appointment(appt_id):
-    user_id = int(get_jwt_identity())
-    current_user = User.query.get(user_id)
-    appt = Appointment.query.get_or_404(appt_id)
-
-    if current_user.role in [Role.ADMIN, Role.MANAGER]:
-        pass
-    elif current_user.role == Role.CLINIC:
-        if appt.clinic_id != current_user.clinic_id:
-            return jsonify({"msg": "Not authorized"}), 403
-    else:
-        if appt.patient_id != current_user.id:
-            return jsonify({"msg": "Not authorized"}), 403
-
-    appt_dict = appt_schema.dump(appt)
-    patient = User.query.get(appt.patient_id)
-    appt_dict["patientName"] = patient.full_name if patient else "Unknown"
-
-    return jsonify(appt_dict)
+    appt = _scoped("appointments:read").filter(Appointment.id == appt_id).first_or_404()
+    return jsonify(appt_schema.dump(appt))
 
 
 # Update Appointment Status
 @bp.route("/<int:appt_id>", methods=["PATCH"])
-@jwt_required()
+@rbac_required("appointments:write")
 def update_appointment(appt_id):
-    user_id = int(get_jwt_identity())
-    current_user = User.query.get(user_id)
-    if not current_user:
-        return jsonify({"msg": "User not found"}), 404
-
-    appt = Appointment.query.get_or_404(appt_id)
-
-    if current_user.role not in [Role.ADMIN, Role.MANAGER, Role.CLINIC]:
-        return jsonify({"msg": "Not authorized"}), 403
-    if current_user.role == Role.CLINIC and appt.clinic_id != current_user.clinic_id:
-        return jsonify({"msg": "Not authorized"}), 403
+    appt = _scoped("appointments:write").filter(Appointment.id == appt_id).first_or_404()
 
     data = request.get_json() or {}
     status = data.get("status")
@@ -141,10 +112,10 @@ def update_appointment(appt_id):
         return jsonify({"msg": f"Invalid status '{status}'"}), 400
 
     appt.status = status
+    publish(
+        "appointment.updated", lambda: appt_schema.dump(appt),
+        clinic_id=appt.clinic_id, patient_id=appt.patient_id,
+    )
     db.session.commit()
 
-    appt_dict = appt_schema.dump(appt)
-    patient = User.query.get(appt.patient_id)
-    appt_dict["patientName"] = patient.full_name if patient else "Unknown"
-
-    return jsonify(appt_dict), 200
+    return jsonify(appt_schema.dump(appt)), 200
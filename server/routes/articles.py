@@ -1,35 +1,52 @@
 from flask import Blueprint, jsonify, request
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from identity import get_current_user
+from authz import rbac_required
 from extensions import db
-from models import Article, User
+from models import Article
 from schemas import ArticleSchema
+from versions import conditional
+from cache import response_cache
+from sqlalchemy.orm import load_only
+from utils import keyset_paginate, paginated_response, sparse_fieldset, projected_schema
 
 bp = Blueprint("articles", __name__, url_prefix="/articles")
 article_schema = ArticleSchema()
 articles_schema = ArticleSchema(many=True)
 
 @bp.route("/", methods=["GET"])
+@conditional("articles")
+@response_cache.cached("articles")
 def get_articles():
-    q = Article.query.order_by(Article.created_at.desc())
-    return jsonify(articles_schema.dump(q.all()))
+    # List pages only show title/summary; content is opt-in via ?fields=
+    only, columns = sparse_fieldset(
+        ArticleSchema, Article, default_exclude=("content",),
+        required=(Article.created_at, Article.id),
+    )
+    q = Article.query.options(load_only(*columns))
+    page = keyset_paginate(q, (Article.created_at, Article.id))
+    return paginated_response(projected_schema(ArticleSchema, only).dump(page["items"]), page)
+
+@bp.route("/<int:article_id>", methods=["GET"])
+@conditional("articles")
+@response_cache.cached(lambda article_id: f"article:{article_id}")
+def get_article(article_id):
+    article = Article.query.get_or_404(article_id)
+    return jsonify(article_schema.dump(article))
 
 @bp.route("/", methods=["POST"])
-@jwt_required()
+@rbac_required("articles:write")
 def create_article():
-    user_id = int(get_jwt_identity())
-    role    = get_jwt().get("role")
-    current_user = User.query.get(user_id)
-    if not current_user:
-        return jsonify({"msg": "User not found"}), 404
-
-    if current_user.role not in ["admin", "manager", "clinic"]:
-        return jsonify({"msg": "Not authorized to create articles"}), 403
-
     payload = request.get_json() or {}
+    author = payload.get("author")
+    if not author:
+        current_user = get_current_user()
+        if not current_user:
+            return jsonify({"msg": "User not found"}), 404
+        author = current_user.full_name or current_user.email
     article = Article(
         title=payload.get("title"),
         category=payload.get("category"),
-        author=payload.get("author") or getattr(current_user, "full_name", current_user.email),
+        author=author,
         date=payload.get("date"),
         read_time=payload.get("readTime"),
         image=payload.get("image"),
@@ -39,35 +56,22 @@ def create_article():
         is_trending=payload.get("isTrending", False),
     )
     db.session.add(article)
+    response_cache.invalidate_on_commit("articles")
     db.session.commit()
     return jsonify(article_schema.dump(article)), 201
 
 
 @bp.route("/<int:article_id>", methods=["DELETE"])
-@jwt_required()
+@rbac_required("articles:delete")
 def delete_article(article_id):
-    current_user = User.query.get(get_jwt_identity())
-    if not current_user or current_user.role != "admin":
-        return jsonify({"msg": "Admin only"}), 403
-
     article = Article.query.get_or_404(article_id)
     db.session.delete(article)
+    response_cache.invalidate_on_commit("articles", f"article:{article_id}")
     db.session.commit()
     return jsonify({"msg": "Article deleted"}), 200
 @bp.route("/<int:article_id>", methods=["PATCH"])
-@jwt_required()
+@rbac_required("articles:write")
 def update_article(article_id):
-    user_id = int(get_jwt_identity())
-    role    = get_jwt().get("role")
-    current_user = User.query.get(user_id)
-
-    if not current_user:
-        return jsonify({"msg": "User not found"}), 404
-
-    # only admin clinic can edit
-    if current_user.role not in ["admin", "manager", "clinic"]:
-        return jsonify({"msg": "Not authorized"}), 403
-
     article = Article.query.get_or_404(article_id)
     payload = request.get_json() or {}
 
@@ -76,5 +80,6 @@ def update_article(article_id):
         if field in payload:
             setattr(article, field, payload[field])
 
+    response_cache.invalidate_on_commit("articles", f"article:{article_id}")
     db.session.commit()
     return jsonify(article_schema.dump(article))
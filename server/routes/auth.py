@@ -4,9 +4,9 @@ from flask_cors import cross_origin
 from extensions import db
 from models import User, Role, Clinic
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
-from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import timedelta
 from schemas import UserSchema
+from cache import response_cache
 
 bp = Blueprint("auth", __name__, url_prefix="/auth")
 user_schema = UserSchema() 
@@ -26,17 +26,16 @@ def register():
     if not all([full_name, email, password]):
         return jsonify({"error": "Missing required fields"}), 400
 
-    if User.query.filter_by(email=email).first():
+    if User.by_email(email).first():
         return jsonify({"error": "Email already exists"}), 409
 
-    hashed_password = generate_password_hash(password)
     user = User(
         full_name=full_name,
         email=email,
         phone_number=phone_number,
-        password_hash=hashed_password,
         role=role,
     )
+    user.set_password(password)
 
     if role == Role.CLINIC:
         clinic_name = data.get("clinic_name") or full_name
@@ -45,18 +44,19 @@ def register():
             location=data.get("location", ""),
             phone=data.get("phone", phone_number or ""),
             email=email,
-            password=password,
+            password=user.password_hash,
         )
         db.session.add(clinic)
         db.session.flush()
         user.clinic_id = clinic.id
+        response_cache.invalidate_on_commit("clinics")
 
     db.session.add(user)
     db.session.commit()
 
     access_token = create_access_token(
         identity=str(user.id),
-        additional_claims={"role": user.role},
+        additional_claims={"role": user.role, "clinic_id": user.clinic_id},
         expires_delta=timedelta(days=1),
     )
 
@@ -83,17 +83,23 @@ def login():
     if not email or not password:
         return jsonify({"error": "Email and password required"}), 400
 
-    user = User.query.filter_by(email=email).first()
+    user = User.by_email(email).first()
 
-    if not user or not check_password_hash(user.password_hash, password):
+    if not user or not user.check_password(password):
         return jsonify({"error": "Invalid credentials"}), 401
+    if db.session.is_modified(user):
+        # Hash was upgraded to the current method
+        db.session.commit()
+
+    if user.blocked:
+        return jsonify({"error": "Account blocked"}), 403
 
     if user.role == Role.CLINIC and not user.clinic_id:
         return jsonify({"error": "Clinic not found. Please log in as a clinic."}), 401
 
     access_token = create_access_token(
         identity=str(user.id),
-        additional_claims={"role": user.role},
+        additional_claims={"role": user.role, "clinic_id": user.clinic_id},
         expires_delta=timedelta(days=1),
     )
 
@@ -1,9 +1,28 @@
 # server/routes/clinics.py
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, request, current_app
 from models import Clinic, User, Review
 from schemas import ClinicSchema
 from extensions import db
+from utils import (
+    keyset_paginate,
+    paginated_response,
+    page_limit,
+    sparse_fieldset,
+    projected_schema,
+)
+from hours import is_open_now, open_at_filter
+from versions import conditional, bump_versions
+from ratings import record_review
+from events import publish
+from cache import response_cache
+from geo import bounding_box, haversine_sql
+from search import prefix_tsquery
+from analytics import clinic_analytics, parse_range
+from sqlalchemy import cast, func
+from sqlalchemy.dialects.postgresql import DOUBLE_PRECISION
+from sqlalchemy.orm import load_only
 from flask_jwt_extended import create_access_token
+from authz import rbac_required, can_access_clinic
 from datetime import datetime
 
 bp = Blueprint("clinics", __name__, url_prefix="/clinics")
@@ -12,74 +31,145 @@ clinic_schema = ClinicSchema()
 clinics_schema = ClinicSchema(many=True)
 
 
-# Helper: check if clinic is open now
-def is_open_now(operating_hours):
-    if not operating_hours:
-        return False
-    now = datetime.now()
-    today = now.strftime("%A")
-    for day_info in operating_hours:
-        if day_info.get("day") == today:
-            if day_info.get("closed"):
-                return False
-            try:
-                open_time = datetime.strptime(day_info["open"], "%H:%M").time()
-                close_time = datetime.strptime(day_info["close"], "%H:%M").time()
-                return open_time <= now.time() <= close_time
-            except:
-                return False
-    return False
-
-
 # List all clinics with optional filters
 @bp.route("/", methods=["GET"])
+@conditional("clinics", clock=True)
+@response_cache.cached("clinics")
 def list_clinics():
     q = Clinic.query
-    limit = request.args.get("_limit", type=int)
+    now = datetime.now()
     filter_type = request.args.get("filter")
     status = request.args.get("status")
 
     if status:
         q = q.filter_by(status=status)
 
-    if limit:
-        items = q.limit(limit).all()
-    else:
-        items = q.all()
+    # Hours filters run in SQL against the compiled interval index
+    open_at = request.args.get("open_at")
+    if open_at:
+        try:
+            open_at = datetime.fromisoformat(open_at)
+        except ValueError:
+            return jsonify({"error": "Invalid open_at, expected ISO datetime"}), 400
+        q = q.filter(open_at_filter(Clinic.open_intervals, open_at))
+    if filter_type == "open_now":
+        q = q.filter(open_at_filter(Clinic.open_intervals, now))
+    elif filter_type == "24_7":
+        q = q.filter(Clinic.is_24_7.is_(True))
 
-    result = clinics_schema.dump(items)
+    only, columns = sparse_fieldset(
+        ClinicSchema, Clinic,
+        required=(Clinic.created_at, Clinic.rating, Clinic.open_intervals, Clinic.is_24_7),
+    )
+    q = q.options(load_only(*columns))
 
-    for c in result:
-        hours = c.get("operating_hours") or []
-        c["is_open_now"] = is_open_now(hours)
+    if filter_type == "highest_rated":
+        page = keyset_paginate(q, (Clinic.rating, Clinic.id))
+    else:
+        page = keyset_paginate(q, (Clinic.created_at, Clinic.id))
+
+    result = projected_schema(ClinicSchema, only).dump(page["items"])
+    for c, clinic in zip(result, page["items"]):
+        c["is_open_now"] = is_open_now(clinic.open_intervals, now)
+        c["is_24_7"] = bool(clinic.is_24_7)
+
+    return paginated_response(result, page)
+
+
+# Nearest clinics to a point, closest first
+@bp.route("/nearby", methods=["GET"])
+@conditional("clinics", clock=True)
+@response_cache.cached("clinics")
+def nearby_clinics():
+    lat = request.args.get("lat", type=float)
+    lng = request.args.get("lng", type=float)
+    if lat is None or lng is None or not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        return jsonify({"error": "Valid lat and lng are required"}), 400
+
+    max_radius = current_app.config.get("NEARBY_MAX_RADIUS_KM", 200)
+    radius = request.args.get("radius", default=25.0, type=float)
+    radius = min(max(radius, 0.1), max_radius)
+    limit = page_limit(default=20)
+
+    # Bounding-box range scan on ix_clinics_lat_lng, then exact haversine
+    # distance and ordering over the candidates only
+    min_lat, max_lat, min_lng, max_lng = bounding_box(lat, lng, radius)
+    distance = haversine_sql(Clinic.latitude, Clinic.longitude, lat, lng).label("distance")
+    q = db.session.query(Clinic, distance).filter(
+        Clinic.latitude.between(min_lat, max_lat)
+    )
+    if min_lng is not None:
+        q = q.filter(Clinic.longitude.between(min_lng, max_lng))
+    else:
+        q = q.filter(Clinic.longitude.isnot(None))
 
-        c["is_24_7"] = len(hours) == 7 and all(
-            d.get("open") == "00:00" and d.get("close") == "23:59"
-            for d in hours
-            if "day" in d
-        )
+    status = request.args.get("status")
+    if status:
+        q = q.filter(Clinic.status == status)
 
-    # Apply filter logic
-    if filter_type == "open_now":
-        result = [x for x in result if x["is_open_now"]]
-    elif filter_type == "24_7":
-        result = [x for x in result if x["is_24_7"]]
-    elif filter_type == "highest_rated":
-        result = sorted(result, key=lambda x: x.get("rating", 0), reverse=True)
+    rows = q.filter(distance <= radius).order_by(distance, Clinic.id).limit(limit).all()
 
+    now = datetime.now()
+    result = clinics_schema.dump([clinic for clinic, _ in rows])
+    for c, (clinic, km) in zip(result, rows):
+        c["distance_km"] = round(km, 2)
+        c["is_open_now"] = is_open_now(clinic.open_intervals, now)
+        c["is_24_7"] = bool(clinic.is_24_7)
     return jsonify(result)
 
 
+# Ranked full-text search over name, location, services and specialties
+@bp.route("/search", methods=["GET"])
+@conditional("clinics", clock=True)
+@response_cache.cached("clinics")
+def search_clinics():
+    tsquery = prefix_tsquery(request.args.get("q"))
+    if tsquery is None:
+        return jsonify({"error": "Query parameter q is required"}), 400
+
+    # ts_rank_cd returns real; widen it so the cursor round-trips exactly
+    rank = cast(func.ts_rank_cd(Clinic.search_vector, tsquery), DOUBLE_PRECISION).label("rank")
+    q = db.session.query(Clinic, rank).filter(Clinic.search_vector.op("@@")(tsquery))
+    status = request.args.get("status")
+    if status:
+        q = q.filter(Clinic.status == status)
+
+    # Unlike plain lists, search is paged by default: "q=clinic" matches everything
+    page = keyset_paginate(q, (rank, Clinic.id), limit=page_limit(default=20))
+
+    now = datetime.now()
+    clinics = [clinic for clinic, _ in page["items"]]
+    result = clinics_schema.dump(clinics)
+    for c, (clinic, score) in zip(result, page["items"]):
+        c["rank"] = round(score, 4)
+        c["is_open_now"] = is_open_now(clinic.open_intervals, now)
+        c["is_24_7"] = bool(clinic.is_24_7)
+    return paginated_response(result, page)
+
+
 # Get single clinic by ID
 @bp.route("/<int:clinic_id>", methods=["GET"])
+@conditional("clinics", clock=True)
+@response_cache.cached(lambda clinic_id: f"clinic:{clinic_id}")
 def get_clinic(clinic_id):
     clinic = Clinic.query.get_or_404(clinic_id)
     data = clinic_schema.dump(clinic)
-    hours = data.get("operating_hours") or []  # FIXED
-    data["is_open_now"] = is_open_now(hours)
+    data["is_open_now"] = is_open_now(clinic.open_intervals)
     return jsonify(data)
 
 
+# Appointment analytics from the daily rollup
+@bp.route("/<int:clinic_id>/analytics", methods=["GET"])
+@rbac_required("analytics:read")
+@conditional("appointments")
+def get_clinic_analytics(clinic_id):
+    if not can_access_clinic("analytics:read", clinic_id):
+        return jsonify({"msg": "Not authorized"}), 403
+
+    start, end, granularity = parse_range(request.args)
+    return jsonify(clinic_analytics(clinic_id, start, end, granularity))
+
+
 # Clinic login
 @bp.route("/login", methods=["POST"])
 def clinic_login():
@@ -91,12 +181,14 @@ def clinic_login():
         return jsonify({"message": "Email and password are required"}), 400
 
     # Authenticate against the User table for role="clinic"
-    user = User.query.filter_by(email=email, role="clinic").first()
+    user = User.by_email(email).filter_by(role="clinic").first()
     if not user:
         return jsonify({"message": "Clinic not found. Please log in as a clinic."}), 404
 
     if not user.check_password(password):
         return jsonify({"message": "Incorrect password"}), 401
+    if db.session.is_modified(user):
+        db.session.commit()
 
     # Generate JWT token
     token = create_access_token(identity={"id": user.id, "role": user.role})
@@ -117,6 +209,8 @@ def clinic_login():
 
 # Get all reviews for a specific clinic
 @bp.route("/<int:clinic_id>/reviews", methods=["GET"])
+@conditional("reviews")
+@response_cache.cached(lambda clinic_id: f"reviews:{clinic_id}")
 def get_reviews(clinic_id):
     reviews = Review.query.filter_by(clinic_id=clinic_id).all()
     return jsonify(
@@ -143,6 +237,13 @@ def add_review(clinic_id):
 
     if not rating or not user_id:
         return jsonify({"message": "Rating and user_id are required"}), 400
+    # bool is an int subclass; true/false are not ratings
+    if isinstance(rating, bool) or not isinstance(rating, (int, float)) or not 1 <= rating <= 5:
+        return jsonify({"message": "Rating must be a number between 1 and 5"}), 400
+
+    # Aggregates are updated in the same transaction as the insert
+    if not record_review(db.session, clinic_id, rating):
+        return jsonify({"message": "Clinic not found"}), 404
 
     new_review = Review(
         clinic_id=clinic_id,
@@ -152,6 +253,10 @@ def add_review(clinic_id):
     )
 
     db.session.add(new_review)
+    bump_versions(db.session.connection(), {"clinics"})
+    response_cache.invalidate_on_commit(
+        f"reviews:{clinic_id}", "clinics", f"clinic:{clinic_id}"
+    )
     db.session.commit()
 
     return jsonify({"message": "Review added successfully"}), 201
@@ -171,6 +276,13 @@ def update_clinic_status(clinic_id):
 
     clinic.status = new_status
     clinic.verified = bool(verified)
+    publish(
+        "clinic.status",
+        lambda: {"id": clinic.id, "name": clinic.name,
+                 "status": clinic.status, "verified": clinic.verified},
+        clinic_id=clinic.id,
+    )
+    response_cache.invalidate_on_commit("clinics", f"clinic:{clinic.id}")
 
     db.session.commit()
 
@@ -0,0 +1,56 @@
+# server/routes/events.py
+import json
+from flask import Blueprint, Response, current_app, jsonify
+from extensions import db
+from events import broker
+from authz import current_caller, rbac_required
+
+bp = Blueprint("events", __name__, url_prefix="/events")
+
+
+def _audience(caller):
+    # Same scoping as list_appointments
+    scope = caller.scope("appointments:read")
+    if scope == "any":
+        return lambda e: True
+    if scope == "clinic":
+        return lambda e: e.get("clinic_id") == caller.clinic_id
+    if scope == "own":
+        return lambda e: e.get("patient_id") == caller.id
+    return lambda e: False
+
+
+# Server-Sent Events stream of appointment and clinic-status changes.
+# EventSource can't set headers, so the token may also come as ?jwt=
+@bp.route("/stream", methods=["GET"])
+@rbac_required("appointments:read", locations=["headers", "query_string"])
+def stream():
+    caller = current_caller()
+    if caller.scope("appointments:read") == "clinic" and not caller.clinic_id:
+        return jsonify({"msg": "Clinic not linked to user"}), 400
+
+    accept = _audience(caller)
+    dsn = current_app.config["EVENTS_DSN"]
+    heartbeat = current_app.config.get("EVENT_STREAM_HEARTBEAT", 15)
+    # Hand the DB connection back before the long-lived stream starts
+    db.session.remove()
+
+    sub = broker.subscribe(accept, dsn)
+
+    def generate():
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                message = sub.get(timeout=heartbeat)
+                if message is None:
+                    yield ": ping\n\n"
+                    continue
+                yield f"event: {message['event']}\ndata: {json.dumps(message['data'])}\n\n"
+        finally:
+            broker.unsubscribe(sub)
+
+    return Response(
+        generate(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
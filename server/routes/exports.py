@@ -0,0 +1,68 @@
+# server/routes/exports.py
+import os
+from flask import Blueprint, jsonify, request, send_file, url_for
+from extensions import db
+from exports import DATASETS, FORMATS, export_workers, parquet_available
+from models import ExportJob
+from schemas import ExportJobSchema
+from authz import current_caller, rbac_required
+from utils import keyset_paginate, paginated_response
+
+bp = Blueprint("exports", __name__, url_prefix="/exports")
+job_schema = ExportJobSchema()
+jobs_schema = ExportJobSchema(many=True)
+
+
+@bp.route("/", methods=["POST"])
+@rbac_required("exports:write")
+def create_export():
+    data = request.get_json() or {}
+    dataset = data.get("dataset")
+    fmt = data.get("format", "csv")
+    if dataset not in DATASETS:
+        return jsonify({"msg": f"dataset must be one of: {', '.join(sorted(DATASETS))}"}), 400
+    if fmt not in FORMATS:
+        return jsonify({"msg": f"format must be one of: {', '.join(sorted(FORMATS))}"}), 400
+    if fmt == "parquet" and not parquet_available():
+        return jsonify({"msg": "Parquet exports need the 'pyarrow' package"}), 400
+
+    job = ExportJob(dataset=dataset, format=fmt, requested_by=current_caller().id)
+    db.session.add(job)
+    db.session.commit()
+    export_workers.notify()
+
+    resp = jsonify(job_schema.dump(job))
+    resp.status_code = 202
+    resp.headers["Location"] = url_for("exports.get_export", job_id=job.id)
+    return resp
+
+
+@bp.route("/", methods=["GET"])
+@rbac_required("exports:write")
+def list_exports():
+    page = keyset_paginate(ExportJob.query, (ExportJob.created_at, ExportJob.id))
+    return paginated_response(jobs_schema.dump(page["items"]), page)
+
+
+@bp.route("/<int:job_id>", methods=["GET"])
+@rbac_required("exports:write")
+def get_export(job_id):
+    job = ExportJob.query.get_or_404(job_id)
+    return jsonify(job_schema.dump(job))
+
+
+@bp.route("/<int:job_id>/download", methods=["GET"])
+@rbac_required("exports:write")
+def download_export(job_id):
+    job = ExportJob.query.get_or_404(job_id)
+    if job.status != "done":
+        return jsonify({"msg": f"Export is {job.status}"}), 409
+    if not job.file_path or not os.path.exists(job.file_path):
+        return jsonify({"msg": "Export file is no longer available"}), 410
+    # send_file streams from disk and handles Range/conditional requests
+    return send_file(
+        job.file_path,
+        as_attachment=True,
+        download_name=os.path.basename(job.file_path),
+        conditional=True,
+    )
@@ -1,7 +1,11 @@
-from flask import Blueprint, request, jsonify
+import hmac
+from flask import Blueprint, Response, current_app, request, jsonify
 from extensions import db
 from models import SymptomHistory
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from cache import response_cache
+from metrics import REGISTRY
+from authz import rbac_required
 
 bp = Blueprint("misc", __name__)
 
@@ -9,6 +13,27 @@ bp = Blueprint("misc", __name__)
 def health():
     return jsonify({"status": "ok"})
 
+# Cache keys and hit rates are operational detail, not public
+@bp.route("/cache/stats", methods=["GET"])
+@rbac_required("admin:read")
+def cache_stats():
+    return jsonify(response_cache.stats())
+
+def _render_metrics():
+    return Response(REGISTRY.render(), mimetype="text/plain; version=0.0.4")
+
+_admin_metrics = rbac_required("admin:read")(_render_metrics)
+
+# Per-route latency, query counts and pool state are operational detail too;
+# Prometheus can't log in, so it sends METRICS_TOKEN as a static bearer token
+@bp.route("/metrics", methods=["GET"])
+def metrics():
+    token = current_app.config.get("METRICS_TOKEN")
+    sent = request.headers.get("Authorization", "").encode()
+    if token and hmac.compare_digest(sent, f"Bearer {token}".encode()):
+        return _render_metrics()
+    return _admin_metrics()
+
 @bp.route("/openai/analyze", methods=["POST"])
 @jwt_required(optional=True)
 def analyze():
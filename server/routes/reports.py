@@ -1,8 +1,12 @@
 # server/routes/reports.py
 from flask import Blueprint, jsonify, request
 from extensions import db
-from models import Report, User
+from models import Report, User, Clinic
+from schemas import ReportSchema
 from flask_jwt_extended import jwt_required
+from sqlalchemy.orm import joinedload, load_only
+from datetime import datetime, timedelta
+from utils import keyset_paginate, paginated_response, sparse_fieldset, projected_schema
 
 bp = Blueprint("reports", __name__, url_prefix="/reports")
 
@@ -10,30 +14,39 @@ bp = Blueprint("reports", __name__, url_prefix="/reports")
 @bp.route("/", methods=["GET"])
 @jwt_required()
 def get_reports():
-    reports = Report.query.all()
-    data = []
+    only, columns = sparse_fieldset(
+        ReportSchema, Report, default_exclude=("content",),
+        required=(Report.date, Report.id, Report.user_id, Report.clinic_id),
+    )
+    q = Report.query.options(load_only(*columns))
 
-    for r in reports:
-        try:
-            submitter = User.query.get(r.submitted_by_id) if r.submitted_by_id else None
-            data.append({
-                "id": r.id,
-                "title": r.title or "Untitled",
-                "category": r.category or "General",
-                "date": r.date.isoformat() if r.date else None,
-                "status": r.status or "Pending",
-                "summary": r.summary or "",
-                "content": r.content or "",
-                "submittedBy": {
-                    "id": submitter.id if submitter else None,
-                    "name": submitter.full_name if submitter else "Unknown"
-                }
-            })
-        except Exception as e:
-            print(f"Error processing report {r.id}: {e}")
+    # Related rows come from the same query, never one lookup per report
+    if "submittedBy" in only:
+        q = q.options(joinedload(Report.user).load_only(User.id, User.full_name))
+    if "clinic" in only:
+        q = q.options(joinedload(Report.clinic).load_only(Clinic.id, Clinic.name))
+
+    status = request.args.get("status")
+    if status:
+        q = q.filter(Report.status == status)
+    category = request.args.get("category")
+    if category:
+        q = q.filter(Report.category == category)
+    for arg, op in (("from", "__ge__"), ("to", "__le__")):
+        value = request.args.get(arg)
+        if not value:
             continue
+        try:
+            bound = datetime.fromisoformat(value)
+        except ValueError:
+            return jsonify({"error": f"Invalid '{arg}' date, expected ISO format"}), 400
+        # A bare date as upper bound covers that whole day
+        if arg == "to" and len(value) == 10:
+            bound += timedelta(days=1) - timedelta(microseconds=1)
+        q = q.filter(getattr(Report.date, op)(bound))
 
-    return jsonify(data), 200
+    page = keyset_paginate(q, (Report.date, Report.id))
+    return paginated_response(projected_schema(ReportSchema, only).dump(page["items"]), page)
 
 # Update report status (Pending → Reviewed)
 @bp.route("/<int:report_id>", methods=["PATCH"])
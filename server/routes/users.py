@@ -1,9 +1,11 @@
 # backend/routes/users.py
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import Blueprint, current_app, request, jsonify
+from sqlalchemy import select
+from authz import rbac_required, current_caller, scope_filter
 from extensions import db
 from models import User, Appointment
 from schemas import UserSchema
+from utils import keyset_paginate, paginated_response, stream_format, streamed_response
 import json
 
 bp = Blueprint("users", __name__, url_prefix="/users")
@@ -11,99 +13,57 @@ user_schema = UserSchema()
 users_schema = UserSchema(many=True)
 
 
+def _scoped(permission):
+    # Any user, the patients of the caller's clinic, or the caller alone;
+    # applied in SQL like appointments' scopes
+    if current_caller().scope(permission) == "clinic":
+        patients = select(Appointment.patient_id).where(
+            scope_filter(permission, clinic_column=Appointment.clinic_id)
+        )
+        return User.query.filter(User.id.in_(patients))
+    return User.query.filter(scope_filter(permission, owner_column=User.id))
+
+
 @bp.route("/", methods=["GET"])
-@jwt_required()
+@rbac_required("users:read")
 def list_users():
-    identity = get_jwt_identity()
-    user_id = int(identity) if isinstance(identity, str) else identity.get("id")
-    current = User.query.get(user_id)
-    if not current:
-        return jsonify({"msg": "User not found"}), 404
+    q = _scoped("users:read")
 
     user_ids = request.args.getlist("id", type=int)
-    role_filter = request.args.get("role")
-    clinic_id = request.args.get("clinicId", type=int)
-
-    q = User.query
-
     if user_ids:
         q = q.filter(User.id.in_(user_ids))
-        if role_filter:
-            q = q.filter(User.role == role_filter)
-        if current.role == "clinic":
-            pass  # Let it through
-        elif current.role not in ["admin", "manager"]:
-            return jsonify({"msg": "Not authorized"}), 403
-        users = q.all()
-        return jsonify(users_schema.dump(users)), 200
+    role_filter = request.args.get("role")
+    if role_filter:
+        q = q.filter(User.role == role_filter.lower())
+    clinic_id = request.args.get("clinicId", type=int)
+    if clinic_id:
+        q = q.filter(
+            User.id.in_(select(Appointment.patient_id).where(Appointment.clinic_id == clinic_id))
+        )
+    return _list_response(q)
 
-    if current.role in ["admin", "manager"]:
-        if role_filter:
-            q = q.filter(User.role.ilike(role_filter))
-        if clinic_id and role_filter == "doctor":
-            q = q.join(Appointment, User.id == Appointment.doctor_id).filter(
-                Appointment.clinic_id == clinic_id
-            )
-        elif clinic_id:
-            q = q.join(Appointment, User.id == Appointment.patient_id).filter(
-                Appointment.clinic_id == clinic_id
-            )
-    elif current.role == "clinic":
-        appts = Appointment.query.filter_by(clinic_id=current.clinic_id).all()
-        patient_ids = {a.patient_id for a in appts if a.patient_id}
-        q = q.filter(User.id.in_(patient_ids))
-    elif current.role == "doctor":
-        appts = Appointment.query.filter_by(doctor_id=current.id).all()
-        patient_ids = {a.patient_id for a in appts if a.patient_id}
-        q = q.filter(User.id.in_(patient_ids))
-    elif current.role == "patient":
-        return jsonify([user_schema.dump(current)]), 200
-    else:
-        return jsonify({"msg": "Not authorized"}), 403
 
-    users = q.distinct().all()
-    return jsonify(users_schema.dump(users)), 200
+def _list_response(q):
+    order = (User.created_at, User.id)
+    fmt = stream_format()
+    if fmt:
+        return streamed_response(q, order, users_schema, fmt)
+    page = keyset_paginate(q, order)
+    return paginated_response(users_schema.dump(page["items"]), page)
 
 
 @bp.route("/<int:user_id>", methods=["PATCH"])
-@jwt_required()
+@rbac_required("users:write")
 def update_user(user_id):
-    current_user = get_jwt_identity()
-    user_id_from_token = (
-        current_user.get("id") if isinstance(current_user, dict) else int(current_user)
-    )
-
-    current = User.query.get(user_id_from_token)
-    if not current:
-        return jsonify({"msg": "User not found"}), 404
-
-    # Authorization checks
-    if user_id_from_token != user_id and current.role not in ["admin", "clinic"]:
-        return jsonify({"msg": "Unauthorized - insufficient role"}), 403
-    if current.role == "clinic":
-        if not current.clinic_id:
-            return jsonify({"msg": "Clinic not linked to user"}), 400
-        appt = Appointment.query.filter_by(
-            clinic_id=current.clinic_id, patient_id=user_id
-        ).first()
-        if not appt:
-            return (
-                jsonify(
-                    {
-                        "msg": "Unauthorized - no appointment found for this patient at your clinic"
-                    }
-                ),
-                403,
-            )
+    user = _scoped("users:write").filter(User.id == user_id).first_or_404()
 
     if not request.is_json:
         return jsonify({"msg": "Missing JSON in request"}), 400
 
-    user = User.query.get_or_404(user_id)
     data = request.get_json() or {}
 
-    # Log payload for debugging
-    print("PATCH /users Payload:", data)
+    # Field names only: the values can hold personal details
+    current_app.logger.debug("PATCH /users/%s fields: %s", user_id, sorted(data))
 
     # Update fields
     if "fullName" in data:
@@ -112,6 +72,10 @@ def update_user(user_id):
         user.phone_number = data["phoneNumber"]
     if "saved_clinics" in data:
         user.saved_clinics = data["saved_clinics"]
+    if "blocked" in data:
+        if not current_caller().can("users:block"):
+            return jsonify({"msg": "Only admins can block users"}), 403
+        user.blocked = bool(data["blocked"])
     if "profile" in data:
         if not isinstance(data["profile"], dict):
             return jsonify({"msg": "Profile must be a valid JSON object"}), 400
@@ -127,9 +91,8 @@ def update_user(user_id):
 
     try:
         db.session.commit()
-        print("User updated successfully:", user_id)
         return jsonify(user_schema.dump(user)), 200
     except Exception as e:
         db.session.rollback()
-        print("Database error:", str(e))
+        current_app.logger.exception("Updating user %s failed", user_id)
         return jsonify({"msg": f"Database error: {str(e)}"}), 500
@@ -1,11 +1,13 @@
 # server/schemas.py
 from extensions import ma
-from marshmallow import fields
-from models import User, Clinic, Article, Appointment, Image, SymptomHistory
+from marshmallow import fields, pre_dump
+from loaders import patient_names
+from instrumentation import DumpTimingMixin
+from models import User, Clinic, Article, Appointment, Image, SymptomHistory, Report, ExportJob
 
 
 # User Schema
-class UserSchema(ma.SQLAlchemySchema):
+class UserSchema(DumpTimingMixin, ma.SQLAlchemySchema):
     class Meta:
         model = User
         load_instance = True
@@ -26,7 +28,7 @@ class UserSchema(ma.SQLAlchemySchema):
 
 
 # Clinic Schema
-class ClinicSchema(ma.SQLAlchemySchema):
+class ClinicSchema(DumpTimingMixin, ma.SQLAlchemySchema):
     class Meta:
         model = Clinic
         include_fk = True
@@ -37,8 +39,9 @@ class ClinicSchema(ma.SQLAlchemySchema):
     location = ma.auto_field()
     coordinates = ma.auto_field()
     services = ma.List(ma.String())
-    rating = ma.auto_field()
+    rating = fields.Function(lambda c: round(c.rating or 0.0, 2))
     reviews = ma.auto_field()
+    ratingHistogram = fields.Raw(attribute="rating_histogram", data_key="ratingHistogram")
     phone = ma.auto_field()
     email = ma.auto_field()
     verified = ma.auto_field()
@@ -56,7 +59,7 @@ class ClinicSchema(ma.SQLAlchemySchema):
 
 
 # Article Schema
-class ArticleSchema(ma.SQLAlchemySchema):
+class ArticleSchema(DumpTimingMixin, ma.SQLAlchemySchema):
     class Meta:
         model = Article
         load_instance = True
@@ -76,7 +79,7 @@ class ArticleSchema(ma.SQLAlchemySchema):
 
 
 # Appointment Schema
-class AppointmentSchema(ma.SQLAlchemySchema):
+class AppointmentSchema(DumpTimingMixin, ma.SQLAlchemySchema):
     class Meta:
         model = Appointment
         load_instance = True
@@ -95,20 +98,75 @@ class AppointmentSchema(ma.SQLAlchemySchema):
     notes = ma.auto_field()
     createdAt = fields.DateTime(attribute="created_at", data_key="createdAt")
 
+    @pre_dump(pass_many=True)
+    def prime_patient_names(self, data, many, **kwargs):
+        # Resolve every patient name of a list dump in one IN query
+        patient_names().prime(a.patient_id for a in (data if many else [data]))
+        return data
+
     def get_patient_name(self, obj):
-        user = User.query.get(obj.patient_id)
-        return user.full_name if user else "Unknown"
+        return patient_names().load(obj.patient_id)
+
+
+# Report Schema
+class ReportSchema(DumpTimingMixin, ma.SQLAlchemySchema):
+    class Meta:
+        model = Report
+        load_instance = True
+
+    id = ma.auto_field()
+    title = fields.Function(lambda r: r.title or "Untitled")
+    category = fields.Function(lambda r: r.category or "General")
+    date = ma.auto_field()
+    status = fields.Function(lambda r: r.status or "Pending")
+    summary = fields.Function(lambda r: r.summary or "")
+    content = fields.Function(lambda r: r.content or "")
+    submittedBy = fields.Method("get_submitted_by", data_key="submittedBy")
+    clinic = fields.Method("get_clinic")
+
+    def get_submitted_by(self, obj):
+        submitter = obj.user
+        return {
+            "id": submitter.id if submitter else None,
+            "name": submitter.full_name if submitter else "Unknown",
+        }
+
+    def get_clinic(self, obj):
+        clinic = obj.clinic
+        return {"id": clinic.id, "name": clinic.name} if clinic else None
 
 
 # Image Schema
-class ImageSchema(ma.SQLAlchemyAutoSchema):
+class ImageSchema(DumpTimingMixin, ma.SQLAlchemyAutoSchema):
     class Meta:
         model = Image
         load_instance = True
 
 
 # Symptom History Schema
-class SymptomHistorySchema(ma.SQLAlchemyAutoSchema):
+class SymptomHistorySchema(DumpTimingMixin, ma.SQLAlchemyAutoSchema):
     class Meta:
         model = SymptomHistory
         load_instance = True
+
+
+# Export Job Schema
+class ExportJobSchema(DumpTimingMixin, ma.SQLAlchemySchema):
+    class Meta:
+        model = ExportJob
+        load_instance = True
+
+    id = ma.auto_field()
+    dataset = ma.auto_field()
+    format = ma.auto_field()
+    status = ma.auto_field()
+    rowCount = fields.Integer(attribute="row_count", data_key="rowCount")
+    sizeBytes = fields.Integer(attribute="size_bytes", data_key="sizeBytes")
+    error = ma.auto_field()
+    createdAt = fields.DateTime(attribute="created_at", data_key="createdAt")
+    startedAt = fields.DateTime(attribute="started_at", data_key="startedAt")
+    finishedAt = fields.DateTime(attribute="finished_at", data_key="finishedAt")
+    downloadUrl = fields.Method("get_download_url", data_key="downloadUrl")
+
+    def get_download_url(self, obj):
+        return f"/exports/{obj.id}/download" if obj.status == "done" else None
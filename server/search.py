@@ -0,0 +1,31 @@
+# server/search.py
+import re
+from sqlalchemy import func
+
+SEARCH_CONFIG = "english"
+
+# Weighted document for Clinic.search_vector: name (A), location and
+# services (B), doctor specialties (C). Must stay IMMUTABLE for a generated
+# column.
+CLINIC_SEARCH_DOCUMENT = (
+    "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(location, '')), 'B') || "
+    "setweight(jsonb_to_tsvector('english', coalesce(services, '[]'::jsonb), "
+    "'[\"string\"]'), 'B') || "
+    "setweight(jsonb_to_tsvector('english', jsonb_path_query_array("
+    "coalesce(doctors, '[]'::jsonb), '$[*].specialty'), '[\"string\"]'), 'C')"
+)
+
+_TERM = re.compile(r"\w+", re.UNICODE)
+
+
+def prefix_tsquery(text, max_terms=8):
+    """AND of prefix terms for search-as-you-type, or None if nothing to search.
+
+    Only word characters reach to_tsquery, so user input can never produce
+    a tsquery syntax error.
+    """
+    terms = _TERM.findall((text or "").lower())[:max_terms]
+    if not terms:
+        return None
+    return func.to_tsquery(SEARCH_CONFIG, " & ".join(f"{t}:*" for t in terms))
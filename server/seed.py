@@ -1,10 +1,12 @@
 # server/seed.py
 from app import create_app
 from extensions import db
-from models import User, Clinic, Article, Appointment, Report, Review
+from models import User, Clinic, Article, Appointment, Report, Review, ExportJob
 from datetime import datetime, timedelta, UTC
 import random
 from werkzeug.security import generate_password_hash
+from ratings import rebuild_rating_aggregates
+from analytics import rebuild_clinic_stats
 
 app = create_app()
 
@@ -15,6 +17,7 @@ with app.app_context():
     print("Seeding database...")
 
     # Clear existing data to avoid conflicts
+    db.session.query(ExportJob).delete()
     db.session.query(Review).delete()
     db.session.query(Appointment).delete()
     db.session.query(Report).delete()
@@ -495,6 +498,8 @@ with app.app_context():
         print(
             f"Seeded {len(appointments)} dynamic appointments for {len(patients)} patients."
         )
+    rebuild_rating_aggregates(db.session.connection())
+    rebuild_clinic_stats(db.session.connection())
     db.session.commit()
 
     print("Seeding complete — everything inserted with no duplicates.")
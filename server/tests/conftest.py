@@ -0,0 +1,182 @@
+"""Fixtures for the database-backed suites.
+
+These suites need a disposable Postgres database: set TEST_DATABASE_URL and
+its public schema is dropped and rebuilt from the models (stamped at the
+migration head). Each suite then fills it with generated rows at the
+scale it needs via populate(). Without it they are skipped; the unit tests
+for pure helpers always run.
+"""
+import os
+import sys
+
+import pytest
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+if TEST_DATABASE_URL:
+    # Config reads these at import time
+    os.environ["DATABASE_URL"] = TEST_DATABASE_URL
+    os.environ.setdefault("CACHE_DISABLED", "1")
+    os.environ.setdefault("PASSWORD_HASH_WORKERS", "0")
+    os.environ.setdefault("EXPORT_WORKERS", "0")
+    os.environ.setdefault("IDENTITY_CACHE_DISABLED", "1")
+    os.environ.setdefault("PASSWORD_HASH_METHOD", "pbkdf2:sha256:1000")
+    # Fail any request that grows an N+1
+    os.environ.setdefault("QUERY_WATCH", "raise")
+    os.environ.setdefault("QUERY_WATCH_SLOW_MS", "5000")
+sys.path.insert(0, SERVER_DIR)
+
+# Row counts at scale 1; PLAN_TEST_SCALE multiplies them
+BASE_ROWS = {
+    "clinics": 2_000,
+    "users": 20_000,
+    "appointments": 100_000,
+    "reviews": 20_000,
+    "articles": 5_000,
+    "reports": 5_000,
+}
+
+POPULATE_SQL = [
+    """
+    INSERT INTO clinics (name, location, email, status, rating, reviews, created_at)
+    SELECT 'Clinic ' || i, 'Town ' || (i % 50), 'clinic' || i || '@example.com',
+           (ARRAY['approved', 'pending', 'rejected'])[1 + i % 3], (i % 50) / 10.0, 0,
+           now() - make_interval(mins => i)
+    FROM generate_series(1, :clinics) AS i
+    """,
+    """
+    INSERT INTO users (full_name, email, password_hash, role, clinic_id, blocked, created_at)
+    SELECT 'User ' || i, 'user' || i || '@example.com', :password_hash,
+           CASE WHEN i <= :clinics THEN 'clinic'
+                WHEN i = :clinics + 1 OR i % 500 = 0 THEN 'admin'
+                ELSE 'patient' END,
+           CASE WHEN i <= :clinics THEN i END, false,
+           now() - make_interval(mins => i)
+    FROM generate_series(1, :users) AS i
+    """,
+    """
+    INSERT INTO appointments (patient_id, clinic_id, doctor, service, date, time, status, created_at)
+    SELECT 1 + (i::bigint * 7919) % :users, 1 + i % :clinics, 'Dr. ' || (i % 40),
+           (ARRAY['Consultation', 'Lab test', 'Vaccination'])[1 + i % 3],
+           to_char(date '2025-01-01' + (i % 365), 'YYYY-MM-DD'), '09:00',
+           (ARRAY['Pending', 'Confirmed', 'Completed', 'Cancelled'])[1 + i % 4],
+           now() - make_interval(secs => i)
+    FROM generate_series(1, :appointments) AS i
+    """,
+    """
+    INSERT INTO reviews (clinic_id, user_id, rating, comment, created_at)
+    SELECT 1 + i % :clinics, 1 + (i::bigint * 31) % :users, 1 + i % 5, 'Review ' || i,
+           now() - make_interval(mins => i)
+    FROM generate_series(1, :reviews) AS i
+    """,
+    """
+    INSERT INTO articles (title, category, author, summary, content, published, created_at)
+    SELECT 'Article ' || i, 'Health', 'Author ' || (i % 20), 'Summary', 'Body',
+           i % 10 <> 0, now() - make_interval(mins => i)
+    FROM generate_series(1, :articles) AS i
+    """,
+    """
+    INSERT INTO reports (title, category, summary, content, author, date, status, user_id, clinic_id)
+    SELECT 'Report ' || i, (ARRAY['Performance', 'Incident'])[1 + i % 2], 'Summary', 'Body',
+           'Author', now() - make_interval(hours => i), (ARRAY['Pending', 'Reviewed'])[1 + i % 2],
+           1 + i % :users, 1 + i % :clinics
+    FROM generate_series(1, :reports) AS i
+    """,
+]
+
+TEST_PASSWORD = "correct horse"
+
+
+def populate(rows):
+    """Replace every table's contents with ``rows`` (table -> count) and ANALYZE.
+
+    Ids restart at 1, so users 1..clinics are the clinic accounts of
+    clinics 1..clinics, the next user is an admin and the rest patients.
+    """
+    from flask import current_app
+    from sqlalchemy import text
+    from extensions import db
+    from passwords import hash_password
+
+    # One hash, in the configured method so logins don't rehash, for everyone
+    method = current_app.config["PASSWORD_HASH_METHOD"]
+    params = dict(rows, password_hash=hash_password(TEST_PASSWORD, method))
+    tables = ", ".join(t.name for t in db.metadata.sorted_tables)
+    with db.engine.begin() as conn:
+        conn.execute(text(f"TRUNCATE {tables} RESTART IDENTITY CASCADE"))
+        for sql in POPULATE_SQL:
+            conn.execute(text(sql), params)
+    with db.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("ANALYZE"))
+    db.session.remove()
+
+
+def auth_headers():
+    """Bearer headers for the first user of each role."""
+    from flask_jwt_extended import create_access_token
+    from sqlalchemy import select
+    from extensions import db
+    from models import User
+
+    headers = {}
+    for role in ("admin", "clinic", "patient"):
+        user = db.session.execute(
+            select(User.id, User.clinic_id).where(User.role == role).order_by(User.id).limit(1)
+        ).one()
+        token = create_access_token(
+            identity=str(user.id), additional_claims={"role": role, "clinic_id": user.clinic_id}
+        )
+        headers[role] = {"Authorization": f"Bearer {token}"}
+    db.session.remove()
+    return headers
+
+
+@pytest.fixture(scope="session")
+def app():
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+
+    from flask_migrate import stamp
+    from sqlalchemy import text
+    from app import create_app
+    from extensions import db
+
+    app = create_app()
+    app.config["TESTING"] = True
+    with app.app_context():
+        with db.engine.begin() as conn:
+            conn.execute(text("DROP SCHEMA public CASCADE"))
+            conn.execute(text("CREATE SCHEMA public"))
+        # The first revision alters tables it never created, so the chain
+        # can't build an empty database; the models declare every index
+        db.create_all()
+        stamp(directory=os.path.join(SERVER_DIR, "migrations"))
+        db.session.remove()
+    return app
+
+
+@pytest.fixture()
+def client(app):
+    with app.app_context():
+        yield app.test_client()
+
+
+@pytest.fixture()
+def captured_sql(app):
+    """Collect (statement, parameters) for every query the engine runs."""
+    from sqlalchemy import event
+    from extensions import db
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    with app.app_context():
+        engine = db.engine
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
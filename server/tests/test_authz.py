@@ -0,0 +1,150 @@
+import pytest
+from flask import Flask, g
+
+from authz import (
+    PERMISSIONS, ROLE_MASKS, Caller, compile_permissions, permission_mask, scope_filter,
+)
+from conftest import auth_headers, populate
+from models import Appointment
+
+
+def test_compile_permissions_grants_scoped_bases():
+    bits, masks = compile_permissions(
+        {"a": {"x:read:any", "y:write"}, "b": {"x:read:own"}, "c": set()}
+    )
+    assert sorted(bits) == ["x:read", "x:read:any", "x:read:own", "y:write"]
+    assert sorted(bits.values()) == [1, 2, 4, 8]
+    assert masks["a"] == bits["x:read"] | bits["x:read:any"] | bits["y:write"]
+    assert masks["b"] == bits["x:read"] | bits["x:read:own"]
+    assert masks["c"] == 0
+
+
+@pytest.mark.parametrize("role", sorted(PERMISSIONS))
+def test_every_role_can_use_its_grants(role):
+    caller = Caller(1, role, None, ROLE_MASKS[role])
+    for permission in PERMISSIONS[role]:
+        assert caller.can(permission)
+
+
+def test_unknown_permission_is_an_error():
+    with pytest.raises(ValueError, match="users:fly"):
+        permission_mask("users:read", "users:fly")
+
+
+@pytest.mark.parametrize(
+    "role, scope",
+    [("admin", "any"), ("manager", "any"), ("clinic", "clinic"), ("patient", "own"),
+     ("nurse", None)],
+)
+def test_caller_scope_is_the_widest_grant(role, scope):
+    caller = Caller(1, role, 7, ROLE_MASKS.get(role, 0))
+    assert caller.scope("appointments:read") == scope
+    assert caller.can("appointments:read") == (scope is not None)
+
+
+@pytest.mark.parametrize(
+    "caller, sql",
+    [
+        (Caller(21, "admin", None, ROLE_MASKS["admin"]), "true"),
+        (Caller(1, "clinic", 7, ROLE_MASKS["clinic"]), "appointments.clinic_id = 7"),
+        (Caller(1, "clinic", None, ROLE_MASKS["clinic"]), "false"),
+        (Caller(22, "patient", None, ROLE_MASKS["patient"]), "appointments.patient_id = 22"),
+        (Caller(5, "nurse", None, 0), "false"),
+    ],
+)
+def test_scope_filter(caller, sql):
+    with Flask(__name__).app_context():
+        g.caller = caller
+        criterion = scope_filter(
+            "appointments:read",
+            clinic_column=Appointment.clinic_id,
+            owner_column=Appointment.patient_id,
+        )
+        assert str(criterion.compile(compile_kwargs={"literal_binds": True})) == sql
+
+
+@pytest.fixture(scope="module")
+def http(app):
+    from flask_jwt_extended import create_access_token
+
+    with app.app_context():
+        populate({"clinics": 5, "users": 60, "appointments": 100, "reviews": 0, "articles": 0,
+                  "reports": 0})
+        headers = auth_headers()
+        # A patient of its own, so blocking it doesn't affect other tests
+        token = create_access_token(identity="40", additional_claims={"role": "patient"})
+        headers["victim"] = {"Authorization": f"Bearer {token}"}
+    return app.test_client(), headers
+
+
+def _ids(resp):
+    assert resp.status_code == 200, resp.get_json()
+    return {u["id"] for u in resp.get_json()}
+
+
+def _patients_of(app, clinic_id):
+    from extensions import db
+
+    with app.app_context():
+        rows = db.session.execute(
+            Appointment.__table__.select()
+            .with_only_columns(Appointment.patient_id)
+            .where(Appointment.clinic_id == clinic_id)
+        ).scalars()
+        result = set(rows)
+        db.session.remove()
+    return result
+
+
+def test_users_list_is_scoped_in_sql(app, http):
+    client, headers = http
+    assert len(_ids(client.get("/users/", headers=headers["admin"]))) == 60
+    assert _ids(client.get("/users/", headers=headers["clinic"])) == _patients_of(app, 1)
+    assert _ids(client.get("/users/", headers=headers["patient"])) == {7}
+    # Filters narrow the scope, never widen it
+    assert _ids(client.get("/users/?id=7&id=8", headers=headers["patient"])) == {7}
+    assert client.get("/users/").status_code == 401
+
+
+def test_update_user_outside_scope_is_not_found(app, http):
+    client, headers = http
+    stranger = min(set(range(7, 61)) - _patients_of(app, 1))
+    for role, user_id in (("patient", 8), ("clinic", stranger)):
+        resp = client.patch(f"/users/{user_id}", json={"fullName": "X"}, headers=headers[role])
+        assert resp.status_code == 404
+    resp = client.patch("/users/7", json={"blocked": True}, headers=headers["patient"])
+    assert resp.status_code == 403
+
+
+@pytest.mark.parametrize("cached", [False, True])
+def test_blocked_account_is_refused_with_a_live_token(app, http, monkeypatch, cached):
+    from identity import identity_cache
+
+    client, headers = http
+    monkeypatch.setitem(app.config, "IDENTITY_CACHE_DISABLED", not cached)
+    identity_cache.clear()
+    victim = headers["victim"]
+    assert client.get("/appointments/", headers=victim).status_code == 200
+
+    resp = client.patch("/users/40", json={"blocked": True}, headers=headers["admin"])
+    assert resp.status_code == 200
+    try:
+        for url in ("/appointments/", "/users/", "/events/stream"):
+            resp = client.get(url, headers=victim)
+            assert resp.status_code == 403
+            assert resp.get_json() == {"msg": "Account blocked"}
+    finally:
+        client.patch("/users/40", json={"blocked": False}, headers=headers["admin"])
+    assert client.get("/appointments/", headers=victim).status_code == 200
+
+
+def test_update_user_logs_no_payload(app, http, caplog, capsys):
+    client, headers = http
+    secret = "0712-secret-medical-note"
+    with caplog.at_level("DEBUG"):
+        resp = client.patch("/users/7", json={"profile": {"note": secret}},
+                            headers=headers["patient"])
+    assert resp.status_code == 200
+    assert "profile" in caplog.text
+    assert secret not in caplog.text
+    assert secret not in capsys.readouterr().out
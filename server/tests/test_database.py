@@ -0,0 +1,28 @@
+import pytest
+
+from database import listen_dsn
+
+DIRECT = "postgresql://app:pw@db.internal:5432/afya"
+BOUNCER = "postgresql+psycopg2://app:pw@pgbouncer:6432/afya"
+
+
+def _config(uri, events_url="", pgbouncer=False):
+    return {"SQLALCHEMY_DATABASE_URI": uri, "EVENTS_DATABASE_URL": events_url,
+            "DB_PGBOUNCER": pgbouncer}
+
+
+def test_listener_defaults_to_the_app_database():
+    assert listen_dsn(_config(BOUNCER.replace("pgbouncer:6432", "db.internal:5432"))) == DIRECT
+
+
+def test_listener_uses_its_own_url_behind_pgbouncer():
+    assert listen_dsn(_config(BOUNCER, DIRECT, pgbouncer=True)) == DIRECT
+
+
+def test_pgbouncer_without_a_listener_url_fails_at_startup():
+    with pytest.raises(RuntimeError, match="EVENTS_DATABASE_URL"):
+        listen_dsn(_config(BOUNCER, pgbouncer=True))
+
+
+def test_no_listener_off_postgres():
+    assert listen_dsn(_config("sqlite://")) is None
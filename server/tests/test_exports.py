@@ -0,0 +1,147 @@
+import csv
+import gzip
+
+import pytest
+from psycogreen.gevent import patch_psycopg
+from psycopg2.extensions import set_wait_callback
+
+from conftest import auth_headers, populate
+from extensions import db
+
+
+@pytest.fixture(scope="module")
+def rows(app):
+    with app.app_context():
+        populate({"clinics": 2, "users": 10, "appointments": 30, "reviews": 0, "articles": 0,
+                  "reports": 0})
+    return 30
+
+
+@pytest.fixture(params=["sync", "gevent"])
+def psycopg_mode(app, request):
+    """Connections as a threaded worker or a gevent worker opens them."""
+    if request.param == "gevent":
+        # What gunicorn.conf.py's post_fork does; pooled connections were
+        # opened synchronously, so drop them
+        patch_psycopg()
+    with app.app_context():
+        db.engine.dispose()
+    yield request.param
+    set_wait_callback(None)
+    with app.app_context():
+        db.engine.dispose()
+
+
+def test_csv_export_runs_under_either_worker_class(app, rows, psycopg_mode, tmp_path):
+    from exports import run_job
+    from models import ExportJob
+
+    with app.app_context():
+        job = ExportJob(dataset="appointments", format="csv", requested_by=3)
+        db.session.add(job)
+        db.session.commit()
+        run_job(job.id, str(tmp_path))
+        job = db.session.get(ExportJob, job.id)
+        assert (job.status, job.error) == ("done", None)
+        assert job.row_count == rows
+        with gzip.open(job.file_path, "rt", newline="") as f:
+            exported = list(csv.reader(f))
+        db.session.remove()
+    assert exported[0][:3] == ["id", "patient_id", "clinic_id"]
+    assert len(exported) == rows + 1
+
+
+def test_create_export_records_the_caller(app, rows):
+    from models import ExportJob
+
+    with app.app_context():
+        headers = auth_headers()["admin"]
+    resp = app.test_client().post("/exports/", json={"dataset": "appointments"},
+                                  headers=headers)
+    assert resp.status_code == 202, resp.get_json()
+    with app.app_context():
+        job = db.session.get(ExportJob, resp.get_json()["id"])
+        assert job.requested_by == 3
+        db.session.delete(job)
+        db.session.commit()
+        db.session.remove()
+
+
+def test_parquet_schema_comes_from_the_sql_types():
+    pa = pytest.importorskip("pyarrow")
+    from exports import DATASETS, parquet_schema
+
+    schema = parquet_schema(DATASETS["users"])
+    assert schema.field("id").type == pa.int32()
+    assert schema.field("blocked").type == pa.bool_()
+    assert schema.field("profile").type == pa.string()
+    assert schema.field("created_at").type == pa.timestamp("us")
+
+
+def test_parquet_export_survives_an_all_null_first_batch(app, rows, tmp_path):
+    pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+    from sqlalchemy import text
+
+    from exports import DATASETS, _write_parquet
+
+    path = str(tmp_path / "appointments.parquet")
+    with app.app_context():
+        with db.engine.begin() as conn:
+            conn.execute(text("UPDATE appointments SET notes = NULL"))
+            conn.execute(text("UPDATE appointments SET notes = 'follow up' WHERE id > 10"))
+        assert _write_parquet(DATASETS["appointments"], path, lambda: None, batch_size=10) == rows
+    table = pq.read_table(path)
+    assert table.num_rows == rows
+    notes = table.column("notes").to_pylist()
+    assert notes[:10] == [None] * 10 and set(notes[10:]) == {"follow up"}
+
+
+def _queue(app, **columns):
+    from models import ExportJob
+
+    with app.app_context():
+        job = ExportJob(dataset="appointments", format="csv", requested_by=3, **columns)
+        db.session.add(job)
+        db.session.commit()
+        job_id = job.id
+        db.session.remove()
+    return job_id
+
+
+def _drain(app, stale_after):
+    from exports import claim_next
+
+    claimed = []
+    with app.app_context():
+        while (job_id := claim_next(stale_after)) is not None:
+            claimed.append(job_id)
+        db.session.remove()
+    return claimed
+
+
+def test_a_long_running_job_with_a_fresh_heartbeat_is_not_reclaimed(app, rows):
+    from datetime import datetime, timedelta
+
+    hour_ago = datetime.utcnow() - timedelta(hours=1)
+    alive = _queue(app, status="running", started_at=hour_ago, heartbeat_at=datetime.utcnow())
+    dead = _queue(app, status="running", started_at=hour_ago, heartbeat_at=hour_ago)
+    assert _drain(app, stale_after=300) == [dead]
+    assert alive not in _drain(app, stale_after=300)
+
+
+def test_workers_beat_while_exporting(app, rows, psycopg_mode, tmp_path):
+    from exports import run_job
+    from models import ExportJob
+
+    job_id = _queue(app)
+    with app.app_context():
+        db.session.execute(
+            ExportJob.__table__.update().where(ExportJob.id == job_id).values(status="running")
+        )
+        db.session.commit()
+        run_job(job_id, str(tmp_path), heartbeat_interval=0)
+        job = db.session.get(ExportJob, job_id)
+        assert job.status == "done"
+        assert job.heartbeat_at is not None
+        db.session.remove()
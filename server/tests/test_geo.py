@@ -0,0 +1,75 @@
+import math
+
+import pytest
+
+from geo import EARTH_RADIUS_KM, bounding_box, coordinates_to_lat_lng
+
+NAIROBI = (-1.2921, 36.8219)
+
+
+@pytest.mark.parametrize(
+    "coordinates",
+    [
+        {"lat": -1.2921, "lng": 36.8219},
+        [-1.2921, 36.8219],
+        (-1.2921, 36.8219),
+        {"lat": "-1.2921", "lng": "36.8219"},
+        ["-1.2921", "36.8219"],
+        {"lat": -1.2921, "lng": 36.8219, "label": "CBD"},
+    ],
+)
+def test_coordinates_shapes(coordinates):
+    assert coordinates_to_lat_lng(coordinates) == NAIROBI
+
+
+@pytest.mark.parametrize(
+    "coordinates",
+    [
+        None,
+        {},
+        [],
+        [-1.29],
+        [-1.29, 36.82, 0],
+        "-1.29,36.82",
+        {"lat": -1.29},
+        {"lat": None, "lng": 36.82},
+        {"lat": "north", "lng": 36.82},
+        {"lat": True, "lng": 36.82},
+        [False, 36.82],
+        {"lat": 0, "lng": 0},
+        [0.0, 0.0],
+        {"lat": 90.5, "lng": 36.82},
+        [-1.29, -180.01],
+        {"lat": "nan", "lng": 36.82},
+        {"lat": [1], "lng": 36.82},
+    ],
+)
+def test_unusable_coordinates(coordinates):
+    assert coordinates_to_lat_lng(coordinates) == (None, None)
+
+
+def test_bounding_box_encloses_the_radius():
+    lat, lng = NAIROBI
+    min_lat, max_lat, min_lng, max_lng = bounding_box(lat, lng, 25)
+    dlat = math.degrees(25 / EARTH_RADIUS_KM)
+    assert (min_lat, max_lat) == pytest.approx((lat - dlat, lat + dlat))
+    # Near the equator a degree of longitude is about as long as one of latitude
+    assert max_lng - lng == pytest.approx(dlat, rel=1e-3)
+    assert lng - min_lng == pytest.approx(max_lng - lng)
+
+
+def test_bounding_box_widens_in_longitude_away_from_the_equator():
+    _, _, min_lng, max_lng = bounding_box(60.0, 10.0, 100)
+    dlat = math.degrees(100 / EARTH_RADIUS_KM)
+    assert max_lng - 10.0 == pytest.approx(dlat / math.cos(math.radians(60.0)))
+
+
+def test_bounding_box_across_the_antimeridian_drops_longitude():
+    assert bounding_box(-17.7, 179.9, 50)[2:] == (None, None)
+    assert bounding_box(-17.7, -179.9, 50)[2:] == (None, None)
+
+
+def test_bounding_box_at_a_pole_is_clamped():
+    min_lat, max_lat, min_lng, max_lng = bounding_box(89.9, 0.0, 50)
+    assert max_lat == 90 and min_lat < 89.9
+    assert (min_lng, max_lng) == (None, None)
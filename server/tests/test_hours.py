@@ -0,0 +1,109 @@
+from datetime import datetime
+
+import pytest
+
+from hours import (
+    MINUTES_PER_DAY,
+    MINUTES_PER_WEEK,
+    compile_operating_hours,
+    is_always_open,
+    is_open_now,
+    minute_of_week,
+)
+
+# 2025-06-02 is a Monday
+MONDAY = datetime(2025, 6, 2)
+
+
+def at(day, hour, minute=0):
+    return MONDAY.replace(day=2 + day, hour=hour, minute=minute)
+
+
+def weekdays(open_, close):
+    return [
+        {"day": d, "open": open_, "close": close}
+        for d in ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday")
+    ]
+
+
+def test_minute_of_week():
+    assert minute_of_week(at(0, 0)) == 0
+    assert minute_of_week(at(2, 10, 30)) == 2 * MINUTES_PER_DAY + 630
+    assert minute_of_week(at(6, 23, 59)) == MINUTES_PER_WEEK - 1
+
+
+def test_compile_weekday_hours():
+    assert compile_operating_hours(weekdays("08:00", "17:00")) == [
+        [d * MINUTES_PER_DAY + 480, d * MINUTES_PER_DAY + 1020] for d in range(5)
+    ]
+
+
+def test_compile_skips_closed_and_malformed_days():
+    hours = [
+        {"day": "Monday", "open": "08:00", "close": "17:00"},
+        {"day": "Tuesday", "open": "08:00", "close": "17:00", "closed": True},
+        {"day": "Funday", "open": "08:00", "close": "17:00"},
+        {"day": "Wednesday", "open": "25:00", "close": "17:00"},
+        {"day": "Thursday", "open": None, "close": None},
+        {"day": "Friday"},
+        "Saturday",
+    ]
+    assert compile_operating_hours(hours) == [[480, 1020]]
+
+
+@pytest.mark.parametrize("hours", [None, [], "not a list of days"])
+def test_compile_empty(hours):
+    assert compile_operating_hours(hours) == []
+
+
+def test_overnight_hours_run_into_the_next_day():
+    hours = [{"day": "Friday", "open": "22:00", "close": "06:00"}]
+    intervals = compile_operating_hours(hours)
+    assert intervals == [[4 * MINUTES_PER_DAY + 1320, 5 * MINUTES_PER_DAY + 360]]
+    assert is_open_now(intervals, at(5, 3))
+    assert not is_open_now(intervals, at(5, 6))
+
+
+def test_sunday_overnight_wraps_to_monday():
+    intervals = compile_operating_hours([{"day": "Sunday", "open": "20:00", "close": "02:00"}])
+    assert intervals == [[0, 120], [6 * MINUTES_PER_DAY + 1200, MINUTES_PER_WEEK]]
+    assert is_open_now(intervals, at(0, 1, 59))
+    assert is_open_now(intervals, at(6, 23, 59))
+    assert not is_open_now(intervals, at(0, 2))
+
+
+def test_around_the_clock_is_always_open():
+    days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+    hours = [{"day": d, "open": "00:00", "close": "23:59"} for d in days]
+    intervals = compile_operating_hours(hours)
+    assert intervals == [[0, MINUTES_PER_WEEK]]
+    assert is_always_open(intervals)
+    assert is_open_now(intervals, at(3, 12))
+    assert is_open_now(intervals, at(6, 23, 59))
+
+
+def test_not_always_open_with_a_gap():
+    intervals = compile_operating_hours(weekdays("00:00", "23:59"))
+    assert not is_always_open(intervals)
+    # Monday to Friday merge into one interval ending at Saturday 00:00
+    assert intervals == [[0, 5 * MINUTES_PER_DAY]]
+
+
+@pytest.mark.parametrize(
+    "when, expected",
+    [
+        (at(0, 7, 59), False),
+        (at(0, 8), True),
+        (at(2, 12), True),
+        (at(4, 16, 59), True),
+        (at(4, 17), False),
+        (at(5, 12), False),
+    ],
+)
+def test_is_open_now_boundaries(when, expected):
+    assert is_open_now(compile_operating_hours(weekdays("08:00", "17:00")), when) is expected
+
+
+@pytest.mark.parametrize("intervals", [None, []])
+def test_is_open_now_without_hours(intervals):
+    assert is_open_now(intervals, at(0, 12)) is False
@@ -0,0 +1,178 @@
+"""Migration smoke test.
+
+Downgrades the test database to the last revision that predates the
+performance work, with rows in it, then upgrades back to head. Every
+revision's upgrade, downgrade and backfill runs. The result must match
+the models and hold the values the application computes on write.
+"""
+import ast
+import json
+import os
+
+import pytest
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from sqlalchemy import inspect, text
+
+from conftest import SERVER_DIR, populate
+from extensions import db
+from geo import coordinates_to_lat_lng
+from hours import compile_operating_hours, is_always_open
+
+MIGRATIONS = os.path.join(SERVER_DIR, "migrations")
+BASE_REVISION = "c842ab6f6a38"
+
+HOURS = [
+    [{"day": "Monday", "open": "08:00", "close": "17:00", "closed": False}],
+    [
+        {"day": d, "open": "00:00", "close": "23:59"}
+        for d in ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+    ],
+    [{"day": "Sunday", "open": "20:00", "close": "02:00"}],
+    [],
+    [{"day": "Friday", "open": "22:00", "close": "06:00"}],
+    [{"day": "Monday", "open": "late"}],
+]
+# Every shape coordinates_to_lat_lng handles, as stored in JSONB
+COORDINATES = [
+    {"lat": -1.2921, "lng": 36.8219},
+    {"lat": 0, "lng": 0},
+    {"lat": 95, "lng": 36.8},
+    {},
+    [-4.0435, 39.6682],
+    {"lat": "-0.0917", "lng": "34.7680"},
+]
+
+
+NULL_SORT_KEYS = [
+    ("clinics", "created_at", 2),
+    ("users", "created_at", 9),
+    ("appointments", "created_at", 5),
+    ("articles", "created_at", 1),
+    ("reports", "date", 1),
+]
+
+
+def _head():
+    from alembic.script import ScriptDirectory
+    from flask_migrate import Migrate
+
+    config = Migrate(directory=MIGRATIONS).get_config()
+    return ScriptDirectory.from_config(config).get_current_head()
+
+
+def _revision(conn):
+    return MigrationContext.configure(conn).get_current_revision()
+
+
+@pytest.fixture(scope="module")
+def migrated(app):
+    from flask_migrate import downgrade, upgrade
+
+    with app.app_context():
+        populate(
+            {"clinics": len(HOURS), "users": 10, "appointments": 40, "reviews": 20, "articles": 2,
+             "reports": 2}
+        )
+        with db.engine.begin() as conn:
+            for clinic_id, (hours, coordinates) in enumerate(zip(HOURS, COORDINATES), start=1):
+                conn.execute(
+                    text(
+                        "UPDATE clinics SET operating_hours = CAST(:hours AS jsonb), "
+                        "coordinates = CAST(:coordinates AS jsonb) WHERE id = :id"
+                    ),
+                    {"hours": json.dumps(hours), "coordinates": json.dumps(coordinates),
+                     "id": clinic_id},
+                )
+        db.session.remove()
+
+        downgrade(directory=MIGRATIONS, revision=BASE_REVISION)
+        with db.engine.begin() as conn:
+            at_base = _revision(conn), {c["name"] for c in inspect(conn).get_columns("clinics")}
+            # Sort keys the base schema still allows to be NULL
+            for table, column, row_id in NULL_SORT_KEYS:
+                conn.execute(text(f"UPDATE {table} SET {column} = NULL WHERE id = {row_id}"))
+        upgrade(directory=MIGRATIONS)
+        db.session.remove()
+        yield at_base
+
+
+def test_migrations_do_not_import_the_app():
+    # A migration must keep doing what it did when it was written
+    app_modules = {"routes"} | {
+        name[:-3] for name in os.listdir(SERVER_DIR) if name.endswith(".py")
+    }
+    versions = os.path.join(MIGRATIONS, "versions")
+    for name in sorted(os.listdir(versions)):
+        if not name.endswith(".py"):
+            continue
+        with open(os.path.join(versions, name)) as f:
+            tree = ast.parse(f.read())
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                modules = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom):
+                modules = [node.module or ""]
+            else:
+                continue
+            for module in modules:
+                assert module.partition(".")[0] not in app_modules, (name, module)
+
+
+def test_downgrade_reaches_the_base_schema(migrated):
+    revision, columns = migrated
+    assert revision == BASE_REVISION
+    assert not {"open_intervals", "is_24_7", "latitude", "longitude", "rating_sum"} & columns
+
+
+def test_upgrade_reaches_head_and_matches_models(app, migrated):
+    with app.app_context(), db.engine.connect() as conn:
+        assert _revision(conn) == _head()
+        assert compare_metadata(MigrationContext.configure(conn), db.metadata) == []
+
+
+def test_backfills_match_the_write_path(app, migrated):
+    with app.app_context(), db.engine.connect() as conn:
+        rows = conn.execute(
+            text(
+                "SELECT operating_hours, open_intervals, is_24_7, coordinates, latitude, longitude "
+                "FROM clinics ORDER BY id"
+            )
+        ).all()
+    assert len(rows) == len(HOURS)
+    for hours, intervals, is_24_7, coordinates, lat, lng in rows:
+        assert intervals == compile_operating_hours(hours)
+        assert is_24_7 == is_always_open(intervals)
+        assert (lat, lng) == coordinates_to_lat_lng(coordinates)
+
+
+def test_rating_and_analytics_backfills(app, migrated):
+    with app.app_context(), db.engine.connect() as conn:
+        stale = conn.execute(
+            text(
+                """
+                SELECT c.id FROM clinics c
+                LEFT JOIN (SELECT clinic_id, count(*) AS n, sum(rating) AS total
+                           FROM reviews GROUP BY clinic_id) r ON r.clinic_id = c.id
+                WHERE c.reviews <> coalesce(r.n, 0)
+                   OR c.rating_sum <> coalesce(r.total, 0)
+                """
+            )
+        ).all()
+        appointments = conn.execute(text("SELECT count(*) FROM appointments")).scalar()
+        rolled_up = conn.execute(
+            text("SELECT coalesce(sum(count), 0) FROM clinic_daily_stats WHERE dimension = 'status'")
+        ).scalar()
+    assert stale == []
+    assert rolled_up == appointments
+
+
+def test_sort_keys_are_backfilled_to_the_oldest_row(app, migrated):
+    with app.app_context(), db.engine.connect() as conn:
+        for table, column, row_id in NULL_SORT_KEYS:
+            value, oldest = conn.execute(
+                text(f"SELECT {column}, (SELECT min({column}) FROM {table}) "
+                     f"FROM {table} WHERE id = {row_id}")
+            ).one()
+            assert value == oldest, table
+        assert conn.execute(text("SELECT count(*) FROM clinics WHERE rating IS NULL")).scalar() == 0
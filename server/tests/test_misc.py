@@ -0,0 +1,52 @@
+import pytest
+
+from conftest import auth_headers, populate
+
+
+@pytest.fixture(scope="module")
+def http(app):
+    with app.app_context():
+        populate({"clinics": 2, "users": 10, "appointments": 0, "reviews": 0, "articles": 0,
+                  "reports": 0})
+        headers = auth_headers()
+    return app.test_client(), headers
+
+
+@pytest.mark.parametrize(
+    "role, status", [(None, 401), ("patient", 403), ("clinic", 403), ("admin", 200)]
+)
+def test_cache_stats_is_admin_only(http, role, status):
+    client, headers = http
+    resp = client.get("/cache/stats", headers=headers[role] if role else {})
+    assert resp.status_code == status
+    if status == 200:
+        assert "hit_ratio" in resp.get_json()
+
+
+@pytest.mark.parametrize(
+    "role, status", [(None, 401), ("patient", 403), ("clinic", 403), ("admin", 200)]
+)
+def test_metrics_needs_admin(http, role, status):
+    client, headers = http
+    resp = client.get("/metrics", headers=headers[role] if role else {})
+    assert resp.status_code == status
+
+
+def test_metrics_accepts_the_scrape_token(app, http, monkeypatch):
+    client, _ = http
+    # Without METRICS_TOKEN the header is read as a (malformed) JWT
+    assert client.get("/metrics", headers={"Authorization": "Bearer s3cret"}).status_code == 422
+
+    monkeypatch.setitem(app.config, "METRICS_TOKEN", "s3cret")
+    resp = client.get("/metrics", headers={"Authorization": "Bearer s3cret"})
+    assert resp.status_code == 200
+    assert resp.mimetype == "text/plain"
+    assert client.get("/metrics", headers={"Authorization": "Bearer s3cre"}).status_code == 422
+
+
+def test_server_timing_is_opt_in(app, http, monkeypatch):
+    client, _ = http
+    assert "Server-Timing" not in client.get("/health").headers
+
+    monkeypatch.setitem(app.config, "SERVER_TIMING", True)
+    assert "total;dur=" in client.get("/health").headers["Server-Timing"]
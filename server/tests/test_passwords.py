@@ -0,0 +1,60 @@
+import pytest
+
+import passwords
+from passwords import PasswordHasher, hash_password, hash_prefix, method_prefix
+
+BCRYPT_10 = "$2b$10$" + "N9qo8uLOickgx2ZMRZoMye" + "IjZAgcfl7p92ldGxad68LJZdL17lhWy"
+
+
+@pytest.mark.parametrize(
+    "method", ["scrypt", "scrypt:16384:8:1", "pbkdf2:sha256:1000", "pbkdf2:sha512:2000"]
+)
+def test_method_prefix_matches_the_stored_hash(method):
+    assert method_prefix(method) == hash_prefix(hash_password("pw", method))
+
+
+@pytest.mark.parametrize(
+    "method, prefix",
+    [("bcrypt", "bcrypt:12"), ("bcrypt:10", "bcrypt:10"),
+     ("pbkdf2", f"pbkdf2:sha256:{passwords.DEFAULT_PBKDF2_ITERATIONS}")],
+)
+def test_method_prefix_fills_in_defaults(method, prefix):
+    assert method_prefix(method) == prefix
+
+
+def _hasher(method, workers=0):
+    hasher = PasswordHasher()
+    hasher.method = method
+    hasher.workers = workers
+    hasher._prefix = method_prefix(method)
+    return hasher
+
+
+def test_needs_rehash_parses_instead_of_hashing(monkeypatch):
+    monkeypatch.setattr(passwords, "hash_password", None)
+    assert hash_prefix(BCRYPT_10) == "bcrypt:10"
+    assert not _hasher("bcrypt:10").needs_rehash(BCRYPT_10)
+    assert _hasher("bcrypt").needs_rehash(BCRYPT_10)
+    assert _hasher("pbkdf2:sha256:1000").needs_rehash(BCRYPT_10)
+    assert not _hasher("scrypt").needs_rehash("scrypt:32768:8:1$salt$hash")
+    assert _hasher("scrypt").needs_rehash("pbkdf2:sha256:1000$salt$hash")
+
+
+@pytest.mark.parametrize("green", [True, False])
+def test_pool_kind_follows_the_worker(monkeypatch, green):
+    monkeypatch.setattr(passwords, "_green_threads", lambda: green)
+    hasher = _hasher("pbkdf2:sha256:1000", workers=1)
+    pool = hasher.start()
+    try:
+        if green:
+            from gevent.threadpool import ThreadPoolExecutor
+
+            assert isinstance(pool, ThreadPoolExecutor)
+        else:
+            assert pool._mp_context.get_start_method() == "spawn"
+        assert hasher.start() is pool
+        pwhash = hasher.hash("secret")
+        assert hasher.verify(pwhash, "secret")
+        assert not hasher.verify(pwhash, "other")
+    finally:
+        pool.shutdown()
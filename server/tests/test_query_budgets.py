@@ -0,0 +1,154 @@
+"""Per-route SQL query budgets.
+
+Every route is called against the same generated dataset at two scales:
+10 and 1,000 appointments per clinic, with the other tables growing
+alike. A route must run the same number of statements at both scales, and
+no more than its budget. A per-row lookup makes the count grow with the
+data and fails here. Adding a route without a budget fails
+test_every_route_has_a_budget.
+"""
+import pytest
+from sqlalchemy import event
+
+from conftest import TEST_PASSWORD, auth_headers, populate
+from extensions import db
+
+CLINICS = 20
+SCALES = {"small": 10, "large": 1_000}  # appointments per clinic
+
+# (method, url, role, json body, budget). Reads come first and writes touch
+# distinct rows, so every case sees the same data at both scales. Ids refer
+# to rows made by conftest.populate: users 1..20 run clinics 1..20, user 21
+# is the admin and user 22 the first patient. The suite runs with the
+# identity cache disabled, so every authenticated case pays the users
+# lookup behind rbac_required's block check; served from cache it is free
+CASES = [
+    ("GET", "/", None, None, 0),
+    ("GET", "/health", None, None, 0),
+    ("GET", "/metrics", "admin", None, 1),
+    ("GET", "/cache/stats", "admin", None, 1),
+    ("GET", "/admin/summary", "admin", None, 3),
+    ("GET", "/appointments/", "admin", None, 4),
+    ("GET", "/appointments/", "clinic", None, 4),
+    ("GET", "/appointments/", "patient", None, 4),
+    ("GET", "/appointments/20", "clinic", None, 4),
+    ("GET", "/articles/", None, None, 2),
+    ("GET", "/articles/5", None, None, 2),
+    ("GET", "/auth/profile", "patient", None, 1),
+    ("GET", "/clinics/", None, None, 2),
+    ("GET", "/clinics/?filter=highest_rated", None, None, 2),
+    ("GET", "/clinics/3", None, None, 2),
+    ("GET", "/clinics/1/analytics", "clinic", None, 3),
+    ("GET", "/clinics/3/reviews", None, None, 2),
+    ("GET", "/clinics/nearby?lat=-1.29&lng=36.82", None, None, 2),
+    ("GET", "/clinics/search?q=clinic", None, None, 2),
+    ("GET", "/events/stream", "clinic", None, 1),
+    ("GET", "/exports/", "admin", None, 2),
+    ("GET", "/reports/", "admin", None, 1),
+    ("GET", "/users/", "admin", None, 2),
+    ("GET", "/users/", "clinic", None, 2),
+    ("GET", "/users/", "patient", None, 2),
+    ("POST", "/auth/login", None, {"email": "user30@example.com", "password": TEST_PASSWORD}, 1),
+    ("POST", "/clinics/login", None, {"email": "user1@example.com", "password": TEST_PASSWORD}, 1),
+    ("POST", "/openai/analyze", None, {"description": "cough"}, 0),
+    (
+        "POST", "/auth/register", None,
+        {"full_name": "New Patient", "email": "new@example.com", "password": "pw123456"}, 4,
+    ),
+    ("POST", "/appointments/", "patient", {"clinicId": 1, "date": "2025-06-01", "time": "10:00"}, 8),
+    ("PATCH", "/appointments/20", "clinic", {"status": "Confirmed"}, 8),
+    ("POST", "/articles/", "admin", {"title": "New", "content": "Body"}, 4),
+    ("PATCH", "/articles/1", "admin", {"title": "Renamed"}, 5),
+    ("DELETE", "/articles/2", "admin", None, 4),
+    ("POST", "/clinics/4/reviews", None, {"rating": 4, "user_id": 22}, 4),
+    ("PATCH", "/clinics/5/status", "admin", {"status": "approved"}, 5),
+    ("POST", "/exports/", "admin", {"dataset": "appointments"}, 3),
+    ("GET", "/exports/1", "admin", None, 2),
+    ("GET", "/exports/1/download", "admin", None, 2),
+    ("PATCH", "/reports/1", "admin", {"status": "Reviewed"}, 1),
+    ("POST", "/symptomHistory", "patient", {"symptoms": "cough", "result": {}}, 2),
+    ("PATCH", "/users/22", "patient", {"fullName": "Renamed Patient"}, 5),
+]
+
+# Routes with nothing to count
+UNBUDGETED = {("GET", "/static/<path:filename>")}
+
+
+def _case_id(case):
+    method, url, role = case[:3]
+    return f"{method} {url} ({role or 'anon'})"
+
+
+def _count_queries(engine, client, headers, method, url, body):
+    count = 0
+
+    def record(*args):
+        nonlocal count
+        count += 1
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        # TESTING propagates view errors (QueryWatchError included); keep
+        # them on the failing case instead of erroring the whole module
+        resp = client.open(url, method=method, headers=headers, json=body)
+        resp.close()
+        return resp.status_code, count
+    except Exception as e:
+        return f"{type(e).__name__}: {e}", count
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+@pytest.fixture(scope="module")
+def measured(app):
+    """{case id: {scale: (status or error, query count)}}"""
+    results = {}
+    client = app.test_client()
+    for scale, per_clinic in SCALES.items():
+        with app.app_context():
+            populate(
+                {
+                    "clinics": CLINICS,
+                    "users": CLINICS * per_clinic // 2,
+                    "appointments": CLINICS * per_clinic,
+                    "reviews": CLINICS * per_clinic // 2,
+                    "articles": per_clinic,
+                    "reports": per_clinic,
+                }
+            )
+            headers = auth_headers()
+            engine = db.engine
+        # Requests run outside that context so each gets a fresh ``g``
+        for case in CASES:
+            method, url, role, body, _ = case
+            status, count = _count_queries(
+                engine, client, headers[role] if role else {}, method, url, body
+            )
+            results.setdefault(_case_id(case), {})[scale] = (status, count)
+    return results
+
+
+@pytest.mark.parametrize("case", CASES, ids=_case_id)
+def test_query_budget(measured, case):
+    budget = case[4]
+    by_scale = measured[_case_id(case)]
+    for scale, (status, _) in by_scale.items():
+        assert isinstance(status, int) and status < 500, f"{scale}: {status}"
+    counts = {scale: count for scale, (_, count) in by_scale.items()}
+    assert len(set(counts.values())) == 1, f"query count grows with data: {counts}"
+    assert counts["small"] <= budget, f"{counts['small']} queries, budget is {budget}"
+
+
+def test_every_route_has_a_budget(app):
+    routes = {
+        (method, rule.rule)
+        for rule in app.url_map.iter_rules()
+        for method in rule.methods - {"HEAD", "OPTIONS"}
+    }
+    adapter = app.url_map.bind("localhost")
+    covered = set()
+    for method, url, *_ in CASES:
+        rule, _ = adapter.match(url.split("?")[0], method=method, return_rule=True)
+        covered.add((method, rule.rule))
+    assert routes - covered - UNBUDGETED == set()
+
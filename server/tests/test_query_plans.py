@@ -0,0 +1,92 @@
+"""Query-plan regression tests.
+
+Each case issues a real request against the scaled test database, captures
+the SQL it ran and EXPLAINs every SELECT. A sequential scan over a table
+larger than PLAN_SEQ_SCAN_MAX_ROWS fails the test, so a dropped or unusable
+index shows up here rather than in production latency.
+"""
+import json
+import os
+
+import pytest
+from sqlalchemy import text
+
+from conftest import BASE_ROWS, auth_headers, populate
+from extensions import db
+
+SEQ_SCAN_MAX_ROWS = int(os.getenv("PLAN_SEQ_SCAN_MAX_ROWS", 1000))
+
+# (role, method, url, json body). Ids refer to rows made by conftest.populate;
+# /admin/summary is left out because it aggregates whole tables by design.
+# Whole-collection lists are unpaged without ?limit=, so they are checked
+# the way a paging client calls them
+CASES = [
+    ("admin", "get", "/appointments/?limit=100", None),
+    ("admin", "get", "/appointments/?patientId=42", None),
+    ("clinic", "get", "/appointments/", None),
+    ("clinic", "get", "/appointments/7", None),
+    ("patient", "get", "/appointments/", None),
+    ("admin", "get", "/users/?role=admin", None),
+    ("admin", "get", "/users/?clinicId=3", None),
+    ("clinic", "get", "/users/", None),
+    (None, "get", "/clinics/?status=approved&limit=100", None),
+    (None, "get", "/clinics/?filter=highest_rated&limit=100", None),
+    (None, "get", "/clinics/3", None),
+    (None, "get", "/clinics/3/reviews", None),
+    (None, "get", "/articles/?limit=100", None),
+    (None, "post", "/auth/login", {"email": "USER77@example.com", "password": "wrong"}),
+    (None, "post", "/clinics/login", {"email": "Clinic3@Example.com", "password": "wrong"}),
+    ("clinic", "get", "/clinics/1/analytics?from=2025-01-01&to=2025-12-31", None),
+]
+
+
+@pytest.fixture(scope="module")
+def tokens(app):
+    scale = float(os.getenv("PLAN_TEST_SCALE", 1))
+    with app.app_context():
+        populate({table: int(n * scale) for table, n in BASE_ROWS.items()})
+        return auth_headers()
+
+
+def _plan_nodes(plan):
+    yield plan
+    for child in plan.get("Plans", ()):
+        yield from _plan_nodes(child)
+
+
+def _table_rows(conn):
+    rows = conn.execute(
+        text("SELECT relname, reltuples FROM pg_class WHERE relkind = 'r' AND relnamespace = 'public'::regnamespace")
+    )
+    return {name: n for name, n in rows}
+
+
+def explain(statement, parameters):
+    with db.engine.connect() as conn:
+        raw = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters).scalar()
+        sizes = _table_rows(conn)
+    plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]
+    return plan, sizes
+
+
+def large_seq_scans(statement, parameters):
+    plan, sizes = explain(statement, parameters)
+    return [
+        (node["Relation Name"], int(sizes.get(node["Relation Name"], 0)))
+        for node in _plan_nodes(plan)
+        if node["Node Type"] == "Seq Scan"
+        and sizes.get(node["Relation Name"], 0) > SEQ_SCAN_MAX_ROWS
+    ]
+
+
+@pytest.mark.parametrize("role,method,url,body", CASES, ids=[f"{m.upper()} {u} ({r or 'anon'})" for r, m, u, _ in CASES])
+def test_route_queries_use_indexes(client, tokens, captured_sql, role, method, url, body):
+    headers = tokens[role] if role else {}
+    resp = getattr(client, method)(url, headers=headers, json=body)
+    assert resp.status_code < 500, resp.get_data(as_text=True)
+
+    selects = [(s, p) for s, p in captured_sql if s.lstrip().upper().startswith(("SELECT", "WITH"))]
+    assert selects, "route ran no SELECT statements"
+    for statement, parameters in selects:
+        scans = large_seq_scans(statement, parameters)
+        assert not scans, f"seq scan over {scans} in:\n{statement}"
@@ -0,0 +1,64 @@
+import pytest
+
+from conftest import populate
+from ratings import star_bucket
+
+HALF_STARS = [1, 1.5, 2, 2.5, 3, 3.5, 4, 4.5, 5, 2.49, 4.51]
+
+
+@pytest.mark.parametrize(
+    "rating, star",
+    [
+        (1, "1"), (1.49, "1"), (1.5, "2"), (2.5, "3"), (3.5, "4"), (4.5, "5"),
+        (4.49, "4"), (5, "5"), (0.2, "1"), (7, "5"),
+    ],
+)
+def test_star_bucket_rounds_half_up(rating, star):
+    assert star_bucket(rating) == star
+
+
+@pytest.fixture(scope="module")
+def clinic(app):
+    with app.app_context():
+        populate({"clinics": 2, "users": 10, "appointments": 0, "reviews": 0, "articles": 0,
+                  "reports": 0})
+    return 1
+
+
+def _aggregates(app, clinic_id):
+    from extensions import db
+    from models import Clinic
+
+    with app.app_context():
+        row = db.session.get(Clinic, clinic_id)
+        result = row.reviews, row.rating_sum, row.rating, dict(row.rating_histogram)
+        db.session.remove()
+    return result
+
+
+def test_incremental_histogram_matches_rebuild(app, clinic):
+    from extensions import db
+    from ratings import rebuild_rating_aggregates
+
+    client = app.test_client()
+    for rating in HALF_STARS:
+        resp = client.post(f"/clinics/{clinic}/reviews", json={"rating": rating, "user_id": 5})
+        assert resp.status_code == 201, resp.get_json()
+
+    incremental = _aggregates(app, clinic)
+    assert incremental[0] == len(HALF_STARS)
+    assert incremental[3] == {"1": 1, "2": 3, "3": 2, "4": 2, "5": 3}
+
+    with app.app_context():
+        with db.engine.begin() as conn:
+            assert rebuild_rating_aggregates(conn, clinic) == 1
+    rebuilt = _aggregates(app, clinic)
+    assert rebuilt[0] == incremental[0]
+    assert rebuilt[1:3] == pytest.approx(incremental[1:3])
+    assert rebuilt[3] == incremental[3]
+
+
+@pytest.mark.parametrize("rating", [True, False, "5", 0.5, 5.5, None])
+def test_invalid_ratings_are_rejected(app, clinic, rating):
+    resp = app.test_client().post(f"/clinics/{clinic}/reviews", json={"rating": rating, "user_id": 5})
+    assert resp.status_code == 400
@@ -0,0 +1,61 @@
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from search import prefix_tsquery
+
+
+def query_text(expr):
+    compiled = expr.compile(dialect=postgresql.dialect())
+    config, terms = (compiled.params[k] for k in sorted(compiled.params))
+    return config, terms
+
+
+@pytest.mark.parametrize("text", [None, "", "   ", "!!!", "&|:*()'"])
+def test_nothing_to_search(text):
+    assert prefix_tsquery(text) is None
+
+
+@pytest.mark.parametrize(
+    "text, terms",
+    [
+        ("Nairobi", "nairobi:*"),
+        ("  nairobi   WELLNESS ", "nairobi:* & wellness:*"),
+        ("dental & (x-ray | lab)", "dental:* & x:* & ray:* & lab:*"),
+        ("o'neil:*", "o:* & neil:*"),
+        ("Kisumu-2", "kisumu:* & 2:*"),
+        ("Machakos Ñairobi", "machakos:* & ñairobi:*"),
+    ],
+)
+def test_operators_are_stripped(text, terms):
+    assert query_text(prefix_tsquery(text)) == ("english", terms)
+
+
+def test_term_count_is_capped():
+    _, terms = query_text(prefix_tsquery(" ".join(f"t{i}" for i in range(20)), max_terms=3))
+    assert terms == "t0:* & t1:* & t2:*"
+
+
+@pytest.fixture(scope="module")
+def client(app):
+    from conftest import populate
+
+    with app.app_context():
+        populate({"clinics": 45, "users": 50, "appointments": 0, "reviews": 0, "articles": 0,
+                  "reports": 0})
+    return app.test_client()
+
+
+def test_search_is_paged_by_default(client):
+    first = client.get("/clinics/search?q=clinic")
+    assert first.status_code == 200
+    assert len(first.get_json()) == 20
+    cursor = first.headers["X-Next-Cursor"]
+
+    second = client.get(f"/clinics/search?q=clinic&cursor={cursor}")
+    ids = {c["id"] for c in first.get_json()}
+    assert len(second.get_json()) == 20
+    assert ids.isdisjoint(c["id"] for c in second.get_json())
+
+    everything = client.get("/clinics/search?q=clinic&limit=100")
+    assert len(everything.get_json()) == 45
+    assert "X-Next-Cursor" not in everything.headers
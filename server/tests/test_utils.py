@@ -0,0 +1,71 @@
+import base64
+import json
+from datetime import datetime
+
+import pytest
+from flask import Flask
+
+from models import Appointment
+from utils import InvalidCursor, decode_cursor, encode_cursor, page_limit
+
+COLUMNS = [Appointment.created_at, Appointment.id]
+
+
+def raw_cursor(payload):
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def test_cursor_round_trip():
+    values = [datetime(2025, 6, 2, 9, 30, 15, 123456), 42]
+    cursor = encode_cursor(values)
+    assert "=" not in cursor
+    assert decode_cursor(cursor, COLUMNS) == values
+
+
+def test_cursor_keeps_none_and_floats():
+    from models import Clinic
+
+    assert decode_cursor(encode_cursor([None, 7]), COLUMNS) == [None, 7]
+    assert decode_cursor(encode_cursor([4.25, 7]), [Clinic.rating, Clinic.id]) == [4.25, 7]
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not base64 at all!",
+        raw_cursor({"created_at": "2025-06-02T09:30:00", "id": 1}),
+        raw_cursor(["2025-06-02T09:30:00"]),
+        raw_cursor(["2025-06-02T09:30:00", 1, 2]),
+        raw_cursor(["yesterday", 1]),
+        raw_cursor([12345, 1]),
+        base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+    ],
+)
+def test_tampered_cursor_is_rejected(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor, COLUMNS)
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.config["MAX_PAGE_LIMIT"] = 500
+    return app
+
+
+@pytest.mark.parametrize(
+    "query, default, expected",
+    [
+        ("", None, None),
+        ("", 20, 20),
+        ("?limit=50", None, 50),
+        ("?_limit=50", None, 50),
+        ("?limit=0", None, None),
+        ("?limit=-5", 20, 20),
+        ("?limit=abc", None, None),
+        ("?limit=100000", None, 500),
+    ],
+)
+def test_page_limit(app, query, default, expected):
+    with app.test_request_context(f"/clinics/{query}"):
+        assert page_limit(default) == expected
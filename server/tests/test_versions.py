@@ -0,0 +1,134 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import versions
+from conftest import auth_headers, populate
+
+
+@pytest.fixture(scope="module")
+def http(app):
+    with app.app_context():
+        populate({"clinics": 5, "users": 10, "appointments": 20, "reviews": 5, "articles": 5,
+                  "reports": 1})
+        headers = auth_headers()
+    # Requests run outside that context so each gets a fresh ``g``
+    return app.test_client(), headers
+
+
+def _token(app, **kwargs):
+    from flask_jwt_extended import create_access_token
+
+    with app.app_context():
+        return create_access_token(identity="22", additional_claims={"role": "patient"}, **kwargs)
+
+
+@pytest.mark.parametrize("url", ["/articles/", "/clinics/", "/clinics/3", "/clinics/3/reviews"])
+def test_public_get_ignores_a_stale_token(app, http, url):
+    client, _ = http
+    expired = _token(app, expires_delta=timedelta(seconds=-60))
+    for token in (expired, "not.a.jwt"):
+        resp = client.get(url, headers={"Authorization": f"Bearer {token}"})
+        assert resp.status_code == 200, resp.get_json()
+        assert resp.headers["Cache-Control"] == "no-cache"
+
+
+def test_protected_get_still_rejects_a_stale_token(app, http):
+    client, _ = http
+    expired = _token(app, expires_delta=timedelta(seconds=-60))
+    resp = client.get("/appointments/", headers={"Authorization": f"Bearer {expired}"})
+    assert resp.status_code == 401
+
+
+def test_open_status_etag_expires_with_the_minute(http, monkeypatch):
+    client, _ = http
+    now = datetime.utcnow().replace(second=30, microsecond=0)
+
+    class Clock(datetime):
+        @classmethod
+        def utcnow(cls):
+            return now
+
+    monkeypatch.setattr(versions, "datetime", Clock)
+    first = client.get("/clinics/3")
+    etag = first.headers["ETag"]
+    assert client.get("/clinics/3", headers={"If-None-Match": etag}).status_code == 304
+
+    now += timedelta(minutes=1)
+    later = client.get("/clinics/3", headers={"If-None-Match": etag})
+    assert later.status_code == 200
+    assert later.headers["ETag"] != etag
+
+
+def test_etag_without_clock_survives_the_minute(http, monkeypatch):
+    client, _ = http
+    etag = client.get("/articles/").headers["ETag"]
+    later = datetime.utcnow() + timedelta(minutes=5)
+
+    class Clock(datetime):
+        @classmethod
+        def utcnow(cls):
+            return later
+
+    monkeypatch.setattr(versions, "datetime", Clock)
+    assert client.get("/articles/", headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_negotiated_format_has_its_own_etag(http):
+    client, headers = http
+    ndjson = {**headers["admin"], "Accept": "application/x-ndjson"}
+    as_json = client.get("/appointments/", headers=headers["admin"])
+    as_ndjson = client.get("/appointments/", headers=ndjson)
+    assert as_ndjson.mimetype == "application/x-ndjson"
+    for resp in (as_json, as_ndjson):
+        assert "Accept" in resp.headers["Vary"]
+    assert as_json.headers["ETag"] != as_ndjson.headers["ETag"]
+
+    # A JSON validator must not revalidate the NDJSON representation
+    revalidated = client.get(
+        "/appointments/", headers={**ndjson, "If-None-Match": as_json.headers["ETag"]}
+    )
+    assert revalidated.status_code == 200
+    assert revalidated.mimetype == "application/x-ndjson"
+    same = client.get("/appointments/", headers={**ndjson, "If-None-Match": as_ndjson.headers["ETag"]})
+    assert same.status_code == 304
+    assert "Accept" in same.headers["Vary"]
+
+
+def _stamp(conn, name):
+    from sqlalchemy import text
+
+    return conn.execute(
+        text("SELECT version, updated_at FROM collection_versions WHERE name = :n"), {"n": name}
+    ).one()
+
+
+def test_updated_at_is_the_write_time_and_never_goes_back(app, http):
+    from sqlalchemy import text
+
+    from extensions import db
+
+    with app.app_context():
+        with db.engine.begin() as conn:
+            started = conn.execute(text("SELECT timezone('utc', now())")).scalar()
+            conn.execute(text("SELECT pg_sleep(0.2)"))
+            versions.bump_versions(conn, {"articles"})
+            _, stamped = _stamp(conn, "articles")
+        # Not the transaction's start time
+        assert stamped >= started + timedelta(seconds=0.2)
+
+        # A writer that read the clock before a newer stamp was stored (it
+        # started earlier, committed later) must not move it backwards
+        future = stamped + timedelta(hours=1)
+        with db.engine.begin() as conn:
+            conn.execute(
+                text("UPDATE collection_versions SET updated_at = :t WHERE name = 'articles'"),
+                {"t": future},
+            )
+            version, _ = _stamp(conn, "articles")
+            versions.bump_versions(conn, {"articles"})
+            assert _stamp(conn, "articles") == (version + 1, future)
+            conn.execute(
+                text("UPDATE collection_versions SET updated_at = :t WHERE name = 'articles'"),
+                {"t": stamped},
+            )
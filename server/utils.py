@@ -1,43 +1,12 @@
-from functools import wraps
-from flask import jsonify, current_app
-from flask_jwt_extended import verify_jwt_in_request, get_jwt
+import base64
+import json
+from datetime import datetime
+from functools import lru_cache
+from urllib.parse import urlencode
+from flask import Response, jsonify, current_app, request, stream_with_context
+from sqlalchemy import inspect, tuple_
 from extensions import db
 
-PERMISSIONS = {
-    "admin": {
-        "users:read",
-        "users:write",
-        "clinics:read",
-        "clinics:write",
-        "appointments:write",
-        "articles:write",
-        "images:write",
-    },
-    "manager": {"clinics:read", "clinics:write", "appointments:write", "images:write"},
-    "clinic": {"clinics:read", "appointments:write"},
-    "patient": {"clinics:read", "appointments:write"},
-}
-
-
-def rbac_required(permission):
-    def decorator(fn):
-        @wraps(fn)
-        def wrapper(*args, **kwargs):
-            verify_jwt_in_request(optional=False)
-            claims = get_jwt()
-            role = claims.get("role")
-            if not role:
-                return jsonify({"msg": "Missing role"}), 403
-            allowed = PERMISSIONS.get(role, set())
-            if permission not in allowed:
-                return jsonify({"msg": "Forbidden"}), 403
-            return fn(*args, **kwargs)
-
-        return wrapper
-
-    return decorator
-
-
 def paginate_query(query, page, per_page):
     try:
         page = max(1, int(page or 1))
@@ -52,3 +21,214 @@ def paginate_query(query, page, per_page):
         "page": pagination.page,
         "per_page": pagination.per_page,
     }
+
+
+class QueryParamError(ValueError):
+    pass
+
+
+class InvalidCursor(QueryParamError):
+    pass
+
+
+class InvalidFields(QueryParamError):
+    pass
+
+
+def encode_cursor(values):
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor, columns):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise InvalidCursor("Malformed cursor")
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise InvalidCursor("Malformed cursor")
+    decoded = []
+    for col, value in zip(columns, values):
+        if value is not None and isinstance(col.type, db.DateTime):
+            try:
+                value = datetime.fromisoformat(value)
+            except (TypeError, ValueError):
+                raise InvalidCursor("Malformed cursor")
+        decoded.append(value)
+    return decoded
+
+
+def page_limit(default=None):
+    """Read ?limit= (or the legacy ?_limit=) and clamp it to MAX_PAGE_LIMIT.
+
+    Returns ``default`` when no limit is given, which may be None (no limit).
+    """
+    cap = current_app.config.get("MAX_PAGE_LIMIT", 500)
+    limit = request.args.get("limit", type=int) or request.args.get("_limit", type=int)
+    if not limit or limit < 1:
+        limit = default
+    return min(limit, cap) if limit else None
+
+
+def keyset_paginate(query, columns, limit=None, cursor=None, with_count=None):
+    """Seek-method pagination over ``columns`` in descending order.
+
+    ``columns`` must end with a unique column (usually the primary key) so
+    the ordering is total, and must all be NOT NULL: a NULL never satisfies
+    the cursor's row comparison, so its rows would be skipped. The opaque cursor carries the sort values of the
+    last row returned, and the next page is a single index range scan, so
+    cost does not grow with how deep the client has paged. The total count
+    is only computed when asked for (``?count=true``).
+
+    Paging is opt-in: without ?limit= or ?cursor= the whole collection is
+    returned, because the current client list pages don't follow cursors.
+    """
+    columns = list(columns)
+    if cursor is None:
+        cursor = request.args.get("cursor")
+    default = current_app.config.get("DEFAULT_PAGE_LIMIT", 100) if cursor else None
+    limit = limit or page_limit(default)
+    if with_count is None:
+        with_count = request.args.get("count", "").lower() in ("1", "true", "yes")
+
+    total = query.order_by(None).count() if with_count else None
+
+    if cursor:
+        query = query.filter(tuple_(*columns) < tuple_(*decode_cursor(cursor, columns)))
+    query = query.order_by(*[c.desc() for c in columns])
+    if limit is None:
+        return {"items": query.all(), "next": None, "total": total, "limit": None}
+    rows = query.limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([_column_value(last, c) for c in columns])
+
+    return {"items": rows, "next": next_cursor, "total": total, "limit": limit}
+
+
+def _column_value(row, column):
+    if hasattr(row, "_mapping"):
+        if column in row._mapping:
+            return row._mapping[column]
+        row = row[0]
+    return getattr(row, column.key)
+
+
+def paginated_response(data, page, status=200):
+    """JSON array response with the page cursor and count in headers.
+
+    The body stays a plain list so existing clients keep working; the next
+    page is advertised through ``X-Next-Cursor`` and a ``Link`` header.
+    """
+    resp = jsonify(data)
+    resp.status_code = status
+    if page["next"]:
+        resp.headers["X-Next-Cursor"] = page["next"]
+        args = request.args.to_dict()
+        args.pop("_limit", None)
+        args.update(cursor=page["next"], limit=page["limit"])
+        resp.headers["Link"] = f'<{request.base_url}?{urlencode(args)}>; rel="next"'
+    if page["total"] is not None:
+        resp.headers["X-Total-Count"] = str(page["total"])
+    return resp
+
+
+def sparse_fieldset(schema_cls, model, default_exclude=(), required=()):
+    """Resolve ``?fields=`` into schema field names and columns to load.
+
+    Fields are named by their JSON keys (e.g. ``readTime``). Without
+    ``?fields=`` everything except ``default_exclude`` is returned, so list
+    views can leave large text columns out by default. The returned columns
+    are meant for ``load_only`` so unrequested columns are never SELECTed;
+    ``required`` columns (cursor keys, etc.) are always loaded.
+    """
+    schema_fields = _schema_fields(schema_cls)
+    requested = request.args.get("fields")
+    if requested:
+        keys = {k.strip() for k in requested.split(",") if k.strip()}
+        unknown = keys - schema_fields.keys()
+        if unknown:
+            raise InvalidFields(f"Unknown fields: {', '.join(sorted(unknown))}")
+    else:
+        keys = set(schema_fields) - set(default_exclude)
+    keys.add("id")
+
+    column_attrs = inspect(model).column_attrs
+    only = tuple(sorted(schema_fields[k][0] for k in keys))
+    columns = {schema_fields[k][1] for k in keys if schema_fields[k][1] in column_attrs}
+    columns.update(c.key for c in required)
+    return only, [getattr(model, c) for c in sorted(columns)]
+
+
+@lru_cache(maxsize=None)
+def _schema_fields(schema_cls):
+    # data_key -> (schema field name, model attribute)
+    schema = schema_cls()
+    return {
+        (f.data_key or name): (name, f.attribute or name)
+        for name, f in schema.dump_fields.items()
+    }
+
+
+@lru_cache(maxsize=256)
+def projected_schema(schema_cls, only, many=True):
+    """Cached schema instance restricted to ``only``."""
+    return schema_cls(many=many, only=only)
+
+
+NDJSON = "application/x-ndjson"
+
+
+def stream_format():
+    """'ndjson' for Accept: application/x-ndjson, 'array' for ?stream=true."""
+    if request.accept_mimetypes.best_match(["application/json", NDJSON]) == NDJSON:
+        return "ndjson"
+    if request.args.get("stream", "").lower() in ("1", "true", "yes"):
+        return "array"
+    return None
+
+
+def streamed_response(query, columns, schema, fmt, chunk_size=None):
+    """Stream every row of ``query`` as NDJSON or a chunked JSON array.
+
+    Rows come off a server-side cursor (``yield_per``) and are dumped one
+    chunk at a time, so peak memory is bounded by the chunk size instead
+    of the result size, and the first bytes go out before the query is
+    exhausted. Schemas with batch hooks (e.g. patient-name priming) run
+    once per chunk.
+    """
+    chunk_size = chunk_size or current_app.config.get("STREAM_CHUNK_SIZE", 500)
+    query = query.order_by(*[c.desc() for c in columns])
+    dumps = current_app.json.dumps
+
+    def chunks():
+        batch = []
+        for obj in query.yield_per(chunk_size):
+            batch.append(obj)
+            if len(batch) == chunk_size:
+                yield schema.dump(batch)
+                batch = []
+        if batch:
+            yield schema.dump(batch)
+
+    def generate_ndjson():
+        for rows in chunks():
+            yield "".join(dumps(row) + "\n" for row in rows)
+
+    def generate_array():
+        yield "["
+        first = True
+        for rows in chunks():
+            body = ",".join(dumps(row) for row in rows)
+            yield body if first else "," + body
+            first = False
+        yield "]"
+
+    if fmt == "ndjson":
+        return Response(stream_with_context(generate_ndjson()), mimetype=NDJSON)
+    return Response(stream_with_context(generate_array()), mimetype="application/json")
@@ -0,0 +1,153 @@
+# server/versions.py
+import hashlib
+from datetime import datetime, timedelta
+from functools import wraps
+from flask import request, make_response, g
+from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+from flask_jwt_extended.exceptions import JWTExtendedException
+from jwt import InvalidTokenError
+from sqlalchemy import event, func, select
+from sqlalchemy.dialects.postgresql import insert
+from extensions import db
+from models import Appointment, Article, Clinic, CollectionVersion, Review, User
+from utils import stream_format
+
+# Collection stamped when rows of each model are written
+TRACKED_MODELS = {
+    Clinic: "clinics",
+    Appointment: "appointments",
+    Article: "articles",
+    Review: "reviews",
+    User: "users",
+}
+
+
+def _utcnow():
+    # Wall clock at the statement, not now(): that is the transaction start
+    return func.timezone("utc", func.clock_timestamp())
+
+
+def bump_versions(connection, names):
+    """Increment the stamps for ``names`` on ``connection``'s transaction.
+
+    Every writer to a collection upserts the same collection_versions row,
+    so concurrent writers to one collection are serialized on its row lock
+    from the flush until they commit. ``updated_at`` never moves backwards:
+    a writer whose clock reading is older than the stored one (it started
+    earlier but committed later) keeps the stored value.
+    """
+    if not names:
+        return
+    table = CollectionVersion.__table__
+    stmt = insert(table).values(
+        [{"name": n, "version": 1, "updated_at": _utcnow()} for n in sorted(names)]
+    )
+    connection.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[table.c.name],
+            set_={
+                "version": table.c.version + 1,
+                "updated_at": func.greatest(table.c.updated_at, stmt.excluded.updated_at),
+            },
+        )
+    )
+
+
+@event.listens_for(db.session, "after_flush")
+def _stamp_flushed_collections(session, flush_context):
+    names = {
+        TRACKED_MODELS[type(obj)]
+        for obj in (*session.new, *session.dirty, *session.deleted)
+        if type(obj) in TRACKED_MODELS
+    }
+    bump_versions(session.connection(), names)
+
+
+def current_versions(names):
+    table = CollectionVersion.__table__
+    rows = db.session.execute(
+        select(table.c.name, table.c.version, table.c.updated_at).where(
+            table.c.name.in_(names)
+        )
+    ).all()
+    return {name: (version, updated_at) for name, version, updated_at in rows}
+
+
+def _etag_identity():
+    """Caller identity for the ETag; a bad or expired token counts as anonymous.
+
+    Protected views verify the token before this runs, so a token that
+    fails here can only be on a public GET, which must still answer.
+    """
+    try:
+        verify_jwt_in_request(optional=True)
+    except (JWTExtendedException, InvalidTokenError):
+        return None
+    return get_jwt_identity()
+
+
+def conditional(*collections, clock=False, streams=False):
+    """Answer conditional GETs from collection version stamps.
+
+    The ETag hashes the stamps of ``collections`` together with the full
+    request path and caller identity, so a matching If-None-Match (or a
+    fresh If-Modified-Since) gets a 304 after a single primary-key lookup,
+    before the view runs any ORM query or serialization.
+
+    ``clock`` is for views whose body depends on the time of day (open
+    now): the current minute joins the stamp, so ETags and response cache
+    entries expire when it ends even if no row changed.
+
+    ``streams`` is for views that also answer as NDJSON or a chunked array
+    (see utils.stream_format): the negotiated format joins the stamp and
+    responses vary on Accept, so one format is never revalidated or served
+    from cache as the other.
+    """
+
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            versions = current_versions(collections)
+            identity = _etag_identity()
+
+            stamp = "|".join(f"{n}:{versions.get(n, (0, None))[0]}" for n in collections)
+            stamps = [ts for _, ts in versions.values() if ts is not None]
+            if clock:
+                minute = datetime.utcnow().replace(second=0, microsecond=0)
+                stamp += f"|clock:{minute:%Y%m%d%H%M}"
+                stamps.append(minute)
+            if streams:
+                stamp += f"|format:{stream_format() or 'json'}"
+            g.collection_stamp = stamp
+            key = f"{stamp}|{request.full_path}|{identity}"
+            etag = hashlib.sha1(key.encode()).hexdigest()
+            updated_at = max(stamps) if stamps else None
+
+            if request.if_none_match:
+                fresh = request.if_none_match.contains(etag)
+            else:
+                since = request.if_modified_since
+                fresh = bool(since and updated_at and updated_at < since.replace(tzinfo=None))
+            if fresh:
+                resp = make_response("", 304)
+            else:
+                resp = make_response(fn(*args, **kwargs))
+                if resp.status_code != 200:
+                    return resp
+
+            resp.set_etag(etag)
+            resp.vary.add("Authorization")
+            if streams:
+                resp.vary.add("Accept")
+            # Last-Modified has second precision: round up, and only send it
+            # once that second is over so a later write can't share it
+            if updated_at:
+                last_modified = updated_at.replace(microsecond=0) + timedelta(seconds=1)
+                if last_modified <= datetime.utcnow():
+                    resp.last_modified = last_modified
+            resp.headers["Cache-Control"] = "private, no-cache" if identity else "no-cache"
+            return resp
+
+        return wrapper
+
+    return decorator